@@ -0,0 +1,41 @@
+import argparse
+import asyncio
+
+from backend.app.domain.manuscript_manager import ManuscriptManager
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compress the stored manuscripts, or decompress them"
+    )
+    parser.add_argument(
+        "project_ids", nargs="*", type=int, help="Projects to migrate, all by default"
+    )
+    parser.add_argument(
+        "--decompress",
+        action="store_true",
+        help="Store every file uncompressed again",
+    )
+    args = parser.parse_args()
+
+    manager = ManuscriptManager()
+    if args.project_ids:
+        migrated = {}
+        for project_id in args.project_ids:
+            migrated.update(
+                asyncio.run(
+                    manager.compress_manuscripts(project_id, decompress=args.decompress)
+                )
+            )
+    else:
+        migrated = asyncio.run(manager.compress_manuscripts(decompress=args.decompress))
+
+    for project_id, totals in migrated.items():
+        print(
+            f"Project {project_id}: {totals['rewritten']}/{totals['files']} files "
+            f"rewritten, {totals['size_before']} -> {totals['size_after']} bytes"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -2,9 +2,28 @@ from typing import AsyncGenerator
 
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 
-DATABASE_URL = "sqlite+aiosqlite:///./schemas.db"
+from backend.app.data.db.query_log import QueryLogger, configure_query_logger
+from backend.app.data.db.sqlite_profiles import get_sqlite_profile
+from backend.app.settings import get_settings
+
+settings = get_settings()
+
+DATABASE_URL = settings.database_url
+sqlite_profile = get_sqlite_profile(settings.database_profile)
+
+engine = create_async_engine(
+    DATABASE_URL,
+    echo=settings.database_echo,
+    **sqlite_profile.engine_options(DATABASE_URL),
+)
+
+if settings.query_log_enabled:
+    QueryLogger(
+        sample_rate=settings.query_log_sample_rate,
+        slow_query_ms=settings.query_log_slow_ms,
+        logger=configure_query_logger(settings.query_log_file),
+    ).install(engine.sync_engine)
 
-engine = create_async_engine(DATABASE_URL, echo=True)
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 
@@ -0,0 +1,108 @@
+import hashlib
+import json
+import logging
+import random
+import re
+import sys
+import time
+from typing import Callable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+QUERY_LOGGER_NAME = "eleuteria.query"
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_statement(statement: str) -> str:
+    """
+    Reduces a SQL statement to its shape: literals become placeholders and
+    IN lists of any length collapse into a single "(?...)" token.
+    """
+    normalized = _STRING_LITERAL.sub("?", statement)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _PLACEHOLDER_LIST.sub("(?...)", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+def statement_fingerprint(statement: str) -> str:
+    normalized = normalize_statement(statement)
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:12]
+
+
+class QueryLogger:
+    """
+    Structured SQL statement log hooked on the engine cursor events.
+
+    Each record is a JSON line with the statement fingerprint, duration and row
+    count. Statements slower than `slow_query_ms` are always logged as
+    warnings, the rest only for a `sample_rate` fraction of executions, so the
+    log can stay enabled in production.
+
+    The row count is the number of affected rows for INSERT, UPDATE and DELETE.
+    SELECT rows are not fetched yet when the statement finishes executing, so
+    it is reported as null for them.
+    """
+
+    def __init__(
+        self,
+        sample_rate: float = 1.0,
+        slow_query_ms: float = 100.0,
+        logger: Optional[logging.Logger] = None,
+        random_source: Callable[[], float] = random.random,
+    ):
+        self.sample_rate = sample_rate
+        self.slow_query_ms = slow_query_ms
+        self.logger = logger or logging.getLogger(QUERY_LOGGER_NAME)
+        self.random_source = random_source
+
+    def install(self, sync_engine: Engine):
+        event.listen(sync_engine, "before_cursor_execute", self.before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", self.after_cursor_execute)
+
+    def before_cursor_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ):
+        conn.info["query_log_started_at"] = time.perf_counter()
+
+    def after_cursor_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ):
+        started_at = conn.info.pop("query_log_started_at")
+        duration_ms = (time.perf_counter() - started_at) * 1000
+
+        slow = duration_ms >= self.slow_query_ms
+        if not slow and self.random_source() >= self.sample_rate:
+            return
+
+        row_count = cursor.rowcount if cursor.rowcount >= 0 else None
+        record = {
+            "fingerprint": statement_fingerprint(statement),
+            "statement": normalize_statement(statement),
+            "duration_ms": round(duration_ms, 3),
+            "row_count": row_count,
+            "executemany": executemany,
+            "slow": slow,
+        }
+        self.logger.log(
+            logging.WARNING if slow else logging.INFO,
+            json.dumps(record),
+        )
+
+
+def configure_query_logger(log_file: Optional[str] = None) -> logging.Logger:
+    logger = logging.getLogger(QUERY_LOGGER_NAME)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    if not logger.handlers:
+        if log_file:
+            handler = logging.FileHandler(log_file, encoding="utf-8")
+        else:
+            handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+    return logger
@@ -0,0 +1,75 @@
+from typing import Optional
+
+from pydantic import BaseModel
+from sqlalchemy.engine import make_url
+
+
+class SQLiteProfile(BaseModel):
+    """
+    Connection tuning applied to every SQLite connection opened by the engine.
+
+    Pragmas left as None keep the SQLite default. Pool settings are ignored for
+    in-memory databases, which always share a single connection.
+    """
+
+    journal_mode: Optional[str] = None
+    synchronous: Optional[str] = None
+    mmap_size: Optional[int] = None
+    cache_size: Optional[int] = None
+    busy_timeout: Optional[int] = None
+    pool_size: Optional[int] = None
+    max_overflow: Optional[int] = None
+    pool_timeout: Optional[float] = None
+    pool_recycle: Optional[int] = None
+
+    def pragmas(self) -> list[str]:
+        statements = ["PRAGMA foreign_keys=ON"]
+        for pragma in (
+            "journal_mode",
+            "synchronous",
+            "mmap_size",
+            "cache_size",
+            "busy_timeout",
+        ):
+            value = getattr(self, pragma)
+            if value is not None:
+                statements.append(f"PRAGMA {pragma}={value}")
+        return statements
+
+    def engine_options(self, database_url: str) -> dict:
+        if make_url(database_url).database in (None, "", ":memory:"):
+            return {}
+
+        options = {}
+        for option in ("pool_size", "max_overflow", "pool_timeout", "pool_recycle"):
+            value = getattr(self, option)
+            if value is not None:
+                options[option] = value
+        return options
+
+
+SQLITE_PROFILES = {
+    # Plain SQLite defaults, only foreign keys enabled
+    "compat": SQLiteProfile(),
+    # WAL lets readers keep going while the autosave writes
+    "tuned": SQLiteProfile(
+        journal_mode="WAL",
+        synchronous="NORMAL",
+        mmap_size=256 * 1024 * 1024,
+        cache_size=-64000,  # negative values are KiB, so ~64 MB
+        busy_timeout=5000,
+        pool_size=5,
+        max_overflow=10,
+        pool_timeout=30,
+        pool_recycle=3600,
+    ),
+}
+
+
+def get_sqlite_profile(name: str) -> SQLiteProfile:
+    if name not in SQLITE_PROFILES:
+        raise ValueError(
+            f"Unknown database profile '{name}', "
+            f"expected one of: {', '.join(SQLITE_PROFILES)}"
+        )
+    return SQLITE_PROFILES[name]
@@ -41,6 +41,11 @@ class BaseProject(Base):
         "ProjectList", back_populates="projects", passive_deletes=True
     )
 
+    # Read-only aggregate relationships, used to eager load a whole project
+    world = relationship("World", uselist=False, viewonly=True)
+    characters = relationship("Character", order_by="Character.id", viewonly=True)
+    plots = relationship("Plot", order_by="Plot.id", viewonly=True)
+
     __mapper_args__ = {"polymorphic_identity": "base", "polymorphic_on": type}
 
 
@@ -1,4 +1,5 @@
 from sqlalchemy import Column, Integer, String, Text, ForeignKey
+from sqlalchemy.orm import relationship
 
 from backend.app.data.entities.project_entities import Base
 from backend.app.data.helpers.json_list_encoder_helper import JSONEncodedList
@@ -17,6 +18,13 @@ class Plot(Base):
     characterReferencesIDs = Column(JSONEncodedList)
     projectID = Column(Integer, ForeignKey("base_projects.id"))
 
+    steps = relationship(
+        "PlotStep",
+        primaryjoin="Plot.id == PlotStep.plotID",
+        order_by="PlotStep.id",
+        viewonly=True,
+    )
+
 
 # ───── PlotStep ─────
 class PlotStep(Base):
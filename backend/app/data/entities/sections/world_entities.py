@@ -1,4 +1,5 @@
 from sqlalchemy import Column, Integer, ForeignKey, String, Text
+from sqlalchemy.orm import relationship
 
 from backend.app.data.entities.project_entities import Base
 
@@ -9,6 +10,13 @@ class World(Base):
     id = Column(Integer, primary_key=True)
     projectID = Column(Integer, ForeignKey("base_projects.id", ondelete="CASCADE"))
 
+    elements = relationship(
+        "WorldElement",
+        primaryjoin="World.id == WorldElement.worldId",
+        order_by="WorldElement.id",
+        viewonly=True,
+    )
+
 
 # ───── WorldElement ─────
 class WorldElement(Base):
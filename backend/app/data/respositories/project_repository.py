@@ -6,7 +6,7 @@ from typing import Sequence
 
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import with_polymorphic
+from sqlalchemy.orm import with_polymorphic, selectinload
 
 from backend.app.data.entities.project_entities import (
     BaseProject,
@@ -15,6 +15,8 @@ from backend.app.data.entities.project_entities import (
     NonFictionProject,
     ThesisProject,
 )
+from backend.app.data.entities.sections.plot_entities import Plot
+from backend.app.data.entities.sections.world_entities import World
 
 
 class ProjectRepository:
@@ -53,6 +55,28 @@ class ProjectRepository:
         )
         return result.scalar_one_or_none()
 
+    async def get_project_aggregate(self, project_id: int):
+        """
+        Loads a project together with its world, world elements, characters,
+        plots and plot steps.
+
+        Every collection is fetched with a single SELECT ... IN query, so the
+        number of round trips stays the same no matter how big the project is.
+        """
+        project_polymorphic = with_polymorphic(
+            BaseProject, [FictionProject, NonFictionProject, ThesisProject]
+        )
+        result = await self.session.execute(
+            select(project_polymorphic)
+            .where(BaseProject.id == project_id)
+            .options(
+                selectinload(project_polymorphic.world).selectinload(World.elements),
+                selectinload(project_polymorphic.characters),
+                selectinload(project_polymorphic.plots).selectinload(Plot.steps),
+            )
+        )
+        return result.scalar_one_or_none()
+
     async def update_project(self, project_to_update: BaseProject):
         project_to_update.updated_at = datetime.now()
         await self.session.commit()
@@ -1,5 +1,5 @@
 from sqlalchemy import select
-from typing import Sequence, Any
+from typing import Sequence, Any, Iterable
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -29,6 +29,17 @@ class CharacterRepository:
         )
         return result.scalar_one_or_none()
 
+    async def get_characters_by_ids(
+        self, character_ids: Iterable[int]
+    ) -> Sequence[Character]:
+        character_ids = list(character_ids)
+        if not character_ids:
+            return []
+        result = await self.session.execute(
+            select(Character).where(Character.id.in_(character_ids))
+        )
+        return result.scalars().all()
+
     async def update_character(self, character_to_update: Character):
         await self.session.commit()
         await self.session.refresh(character_to_update)
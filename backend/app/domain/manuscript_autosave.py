@@ -0,0 +1,151 @@
+import asyncio
+import os
+import weakref
+from dataclasses import dataclass, replace
+from typing import Awaitable, Callable, Optional
+
+# Writes the latest content queued for a key, see AutosaveQueue.submit()
+Write = Callable[[], Awaitable[dict]]
+
+
+@dataclass
+class PendingWrite:
+    write: Write
+    queued_at: float
+    saves: int = 0
+    timer: Optional[asyncio.TimerHandle] = None
+
+
+def _matches(key: str, prefix: Optional[str]) -> bool:
+    if prefix is None:
+        return True
+    return key == prefix or key.startswith(prefix.rstrip(os.sep) + os.sep)
+
+
+class AutosaveQueue:
+    """
+    Write-behind queue coalescing the saves of the same file.
+
+    The editor autosaves a scene several times a second while the author
+    types, and every write is a staged file, a rename and the metadata, index
+    and history updates. A save queued here only replaces the pending write
+    of its key, which runs `delay` seconds after the last save of the key,
+    and at most `max_delay` seconds after the first one, so a steady stream
+    of saves still reaches the disk. flush() runs pending writes right away
+    and waits for them, it is called at shutdown so no queued save is lost.
+
+    Writes of the same key run one at a time, in the order they were queued.
+    A failed write stays pending, unless a newer save replaced it, and runs
+    again on the next save or flush() of its key.
+    """
+
+    def __init__(self, delay: float, max_delay: float):
+        self.delay = delay
+        self.max_delay = max_delay
+        self._pending: dict[str, PendingWrite] = {}
+        self._writing: dict[asyncio.Task, str] = {}
+        # One lock per key being written, dropped once no write holds it
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = (
+            weakref.WeakValueDictionary()
+        )
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._pending
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def submit(self, key: str, write: Write) -> dict:
+        """
+        Queues write as the latest content of key, replacing the pending one.
+
+        Returns:
+            dict: coalesced, the number of earlier saves this one replaced,
+                  and flush_in, the seconds before it is written
+        """
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = self._pending[key] = PendingWrite(write, now)
+        else:
+            pending.write = write
+            if pending.timer is not None:
+                pending.timer.cancel()
+        pending.saves += 1
+
+        deadline = min(now + self.delay, pending.queued_at + self.max_delay)
+        pending.timer = loop.call_at(deadline, self._start, key)
+        return {"coalesced": pending.saves - 1, "flush_in": max(0.0, deadline - now)}
+
+    def _start(self, key: str) -> Optional[asyncio.Task]:
+        pending = self._pending.pop(key, None)
+        if pending is None:
+            return None
+        if pending.timer is not None:
+            pending.timer.cancel()
+
+        task = asyncio.get_running_loop().create_task(self._write(key, pending))
+        self._writing[task] = key
+        task.add_done_callback(self._done)
+        return task
+
+    def _done(self, task: asyncio.Task):
+        self._writing.pop(task, None)
+        if not task.cancelled():
+            # Retrieved here for the writes started by a timer, the failed
+            # ones are pending again (see _write) and reported by flush()
+            task.exception()
+
+    async def _write(self, key: str, pending: PendingWrite) -> dict:
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            try:
+                return await pending.write()
+            except Exception:
+                current = asyncio.current_task()
+                newer = key in self._pending or any(
+                    task is not current and writing == key
+                    for task, writing in self._writing.items()
+                )
+                if not newer:
+                    self._pending[key] = replace(pending, timer=None)
+                raise
+
+    async def flush(self, prefix: Optional[str] = None) -> list[tuple[str, object]]:
+        """
+        Runs the pending writes of prefix, a key or a directory of keys, or
+        of every key when None, and waits for them and for the writes of
+        these keys already running.
+
+        Returns:
+            list: (key, result) pairs, the result is the exception raised by
+                  the write when it failed
+        """
+        for key in [key for key in self._pending if _matches(key, prefix)]:
+            self._start(key)
+        tasks = [task for task, key in self._writing.items() if _matches(key, prefix)]
+        if not tasks:
+            return []
+        keys = [self._writing[task] for task in tasks]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        return list(zip(keys, results))
+
+    async def discard(self, prefix: Optional[str] = None) -> int:
+        """
+        Drops the pending writes of prefix (see flush()), when the file is
+        saved another way or deleted, and waits for the writes of these keys
+        already running, so they can't overwrite what comes next.
+
+        Returns:
+            int: Number of pending writes dropped
+        """
+        keys = [key for key in self._pending if _matches(key, prefix)]
+        for key in keys:
+            pending = self._pending.pop(key)
+            if pending.timer is not None:
+                pending.timer.cancel()
+        tasks = [task for task, key in self._writing.items() if _matches(key, prefix)]
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        return len(keys)
@@ -0,0 +1,223 @@
+import gzip
+import os
+import struct
+from typing import Optional
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+# Compressed files start with this signature, a codec byte and the size of the
+# original content. The signature can't start a UTF-8 text ("\x89" is a
+# continuation byte), so a stored text file is never mistaken for one.
+MAGIC = b"\x89ELZ\r\n\x1a\n"
+HEADER = struct.Struct("<8scQ")
+CODEC_IDS = {"gzip": b"g", "zstd": b"z"}
+CODEC_NAMES = {codec_id: name for name, codec_id in CODEC_IDS.items()}
+
+BLOCK_SIZE = 1024 * 1024
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+
+def zstd_available() -> bool:
+    return zstandard is not None
+
+
+def choose_codec(size: int, min_size: int, zstd_min_size: int) -> Optional[str]:
+    """
+    Codec of a file of the given size: none below min_size, where the header
+    and the codec framing eat the savings, gzip up to zstd_min_size and zstd
+    above, where its faster compression and decompression pay off. Falls back
+    to gzip when the zstandard package is not installed.
+    """
+    if size < min_size:
+        return None
+    if size >= zstd_min_size and zstd_available():
+        return "zstd"
+    return "gzip"
+
+
+def _compressor(codec: str, target, size: int):
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).stream_writer(
+            target, size=size, closefd=False
+        )
+    return gzip.GzipFile(fileobj=target, mode="wb", compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def compress_file(source: str, target: str, codec: str) -> int:
+    """
+    Writes the compressed form of source to target.
+
+    Returns:
+        int: Size of target
+
+    Raises:
+        ValueError: If the codec is unknown or not installed
+    """
+    if codec not in CODEC_IDS:
+        raise ValueError(f"Unknown compression codec: {codec}")
+    if codec == "zstd" and not zstd_available():
+        raise ValueError("zstd compression requires the zstandard package")
+
+    size = os.path.getsize(source)
+    with open(source, "rb") as src, open(target, "wb") as dst:
+        dst.write(HEADER.pack(MAGIC, CODEC_IDS[codec], size))
+        with _compressor(codec, dst, size) as writer:
+            while block := src.read(BLOCK_SIZE):
+                writer.write(block)
+        return dst.tell()
+
+
+def read_header(f) -> Optional[tuple[str, int]]:
+    """Codec and original size of a compressed file, None for a plain file."""
+    header = f.read(HEADER.size)
+    if len(header) < HEADER.size:
+        return None
+    magic, codec_id, size = HEADER.unpack(header)
+    if magic != MAGIC or codec_id not in CODEC_NAMES:
+        return None
+    return CODEC_NAMES[codec_id], size
+
+
+class StoredFile:
+    """
+    Binary reader of the content of a stored file, decompressed on the fly
+    when the file is compressed.
+
+    Decompressing streams can't go backwards, so seek() only moves forward on
+    compressed files.
+    """
+
+    def __init__(self, path: str):
+        self._raw = open(path, "rb")
+        try:
+            header = read_header(self._raw)
+            if header is None:
+                self.codec = None
+                self.size = os.fstat(self._raw.fileno()).st_size
+                self._raw.seek(0)
+                self._stream = self._raw
+            else:
+                self.codec, self.size = header
+                if self.codec == "zstd":
+                    if zstandard is None:
+                        raise OSError(
+                            f"{path} is zstd compressed and the zstandard "
+                            "package is not installed"
+                        )
+                    self._stream = zstandard.ZstdDecompressor().stream_reader(
+                        self._raw, closefd=False
+                    )
+                else:
+                    self._stream = gzip.GzipFile(fileobj=self._raw, mode="rb")
+        except BaseException:
+            self._raw.close()
+            raise
+        self._position = 0
+
+    @property
+    def compressed(self) -> bool:
+        return self.codec is not None
+
+    def fileno(self) -> int:
+        return self._raw.fileno()
+
+    def tell(self) -> int:
+        return self._position
+
+    def read(self, size: int = -1) -> bytes:
+        if not self.compressed:
+            data = self._raw.read(size)
+        elif size < 0:
+            data = b"".join(iter(lambda: self._stream.read(BLOCK_SIZE), b""))
+        else:
+            # Decompressors may return short reads before the end
+            blocks = []
+            remaining = size
+            while remaining > 0:
+                block = self._stream.read(remaining)
+                if not block:
+                    break
+                blocks.append(block)
+                remaining -= len(block)
+            data = b"".join(blocks)
+        self._position += len(data)
+        return data
+
+    def seek(self, offset: int) -> int:
+        if not self.compressed:
+            self._position = self._raw.seek(offset)
+            return self._position
+        if offset < self._position:
+            raise OSError("Compressed files can only be read forward")
+        while self._position < offset:
+            if not self.read(min(BLOCK_SIZE, offset - self._position)):
+                break
+        return self._position
+
+    def close(self):
+        try:
+            if self._stream is not self._raw:
+                self._stream.close()
+        finally:
+            self._raw.close()
+
+    def __enter__(self) -> "StoredFile":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def open_stored(path: str) -> StoredFile:
+    return StoredFile(path)
+
+
+def stored_header(path: str) -> Optional[tuple[str, int]]:
+    """Codec and original size of a stored file, None when it is not compressed."""
+    with open(path, "rb") as f:
+        return read_header(f)
+
+
+def stored_size(path: str) -> int:
+    """Size of the content of a stored file, before compression."""
+    with open(path, "rb") as f:
+        header = read_header(f)
+        return os.fstat(f.fileno()).st_size if header is None else header[1]
+
+
+def is_compressed(path: str) -> bool:
+    return stored_header(path) is not None
+
+
+def normalize_newlines(text: str) -> str:
+    """Universal newlines, like a file opened in text mode."""
+    return text.replace("\r\n", "\n").replace("\r", "\n")
+
+
+def read_stored_text(path: str) -> str:
+    """
+    The UTF-8 text of a stored file, with universal newlines like a file
+    opened in text mode.
+
+    Raises:
+        UnicodeDecodeError: If the file is not UTF-8 text
+    """
+    with open_stored(path) as f:
+        return normalize_newlines(f.read().decode("utf-8"))
+
+
+def decompress_file(source: str, target: str) -> int:
+    """
+    Writes the content of a stored file to target, uncompressed.
+
+    Returns:
+        int: Size of target
+    """
+    with open_stored(source) as src, open(target, "wb") as dst:
+        while block := src.read(BLOCK_SIZE):
+            dst.write(block)
+        return dst.tell()
@@ -0,0 +1,108 @@
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+T = TypeVar("T")
+
+
+class FileSystemExecutor:
+    """
+    Bounded thread pool for the blocking filesystem work of ManuscriptManager.
+
+    Moves, deletes, directory creation, stats and small reads run here instead
+    of on the event loop or in the default executor, so a slow disk delays
+    other filesystem work only, never the other requests. The pool records
+    how many calls wait for a free thread and how long they wait, which tells
+    when max_workers is too low for the disk.
+    """
+
+    def __init__(self, max_workers: int, thread_name_prefix: str = "manuscript-fs"):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=thread_name_prefix
+        )
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        with self._lock:
+            self._queued = 0
+            self._running = 0
+            self._max_queued = 0
+            self._calls = 0
+            self._wait_ms = 0.0
+            self._max_wait_ms = 0.0
+            self._run_ms = 0.0
+
+    async def run(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """Runs func in the pool, with the caller's context like asyncio.to_thread()."""
+        submitted_at = time.perf_counter()
+        # "queued" until a thread picks the call, "abandoned" if the caller
+        # was cancelled before that
+        state = ["queued"]
+        with self._lock:
+            self._queued += 1
+            self._max_queued = max(self._max_queued, self._queued)
+
+        def call():
+            started_at = time.perf_counter()
+            with self._lock:
+                if state[0] == "abandoned":
+                    return None
+                state[0] = "running"
+                wait_ms = (started_at - submitted_at) * 1000
+                self._queued -= 1
+                self._running += 1
+                self._calls += 1
+                self._wait_ms += wait_ms
+                self._max_wait_ms = max(self._max_wait_ms, wait_ms)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._run_ms += (time.perf_counter() - started_at) * 1000
+
+        context = contextvars.copy_context()
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                self._executor, functools.partial(context.run, call)
+            )
+        finally:
+            with self._lock:
+                if state[0] == "queued":
+                    state[0] = "abandoned"
+                    self._queued -= 1
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            dict: Containing:
+                - workers (int): Size of the pool
+                - queued (int): Calls waiting for a thread right now
+                - running (int): Calls running right now
+                - max_queued (int): Highest queue depth seen
+                - calls (int): Calls started
+                - avg_wait_ms / max_wait_ms (float): Time calls waited for a thread
+                - avg_run_ms (float): Time calls ran
+        """
+        with self._lock:
+            calls = self._calls
+            return {
+                "workers": self.max_workers,
+                "queued": self._queued,
+                "running": self._running,
+                "max_queued": self._max_queued,
+                "calls": calls,
+                "avg_wait_ms": self._wait_ms / calls if calls else 0.0,
+                "max_wait_ms": self._max_wait_ms,
+                "avg_run_ms": self._run_ms / calls if calls else 0.0,
+            }
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,169 @@
+import os
+import re
+import sqlite3
+import threading
+from typing import Optional
+
+from backend.app.domain.manuscript_compression import read_stored_text
+from backend.app.domain.manuscript_index import INDEX_FILENAME
+
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_END = "</mark>"
+# Tokens of context around the matches in a snippet
+SNIPPET_TOKENS = 16
+
+
+def fts_query(text: str, prefix: bool) -> str:
+    """
+    Turns free text into an FTS5 query matching every word, each as a prefix
+    when prefix is set. Punctuation is dropped, so user input can never be
+    parsed as FTS5 syntax.
+    """
+    words = re.findall(r"\w+", text)
+    return " ".join(f'"{word}"*' if prefix else f'"{word}"' for word in words)
+
+
+def read_text(path: str) -> Optional[str]:
+    """The UTF-8 text of a file, None for binary files."""
+    try:
+        return read_stored_text(path)
+    except UnicodeDecodeError:
+        return None
+
+
+class ManuscriptFullTextIndex:
+    """
+    SQLite FTS5 index of the manuscript contents, with ranked (bm25) queries,
+    prefix matching and highlighted snippets.
+
+    Documents are numbered by the manuscript_documents table, so replacing or
+    deleting the content of one file is a lookup by rowid instead of a scan of
+    the full-text table.
+    """
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            path, timeout=5, isolation_level=None, check_same_thread=False
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS manuscript_documents ("
+            "id INTEGER PRIMARY KEY, project_id TEXT NOT NULL, path TEXT NOT NULL, "
+            "UNIQUE (project_id, path))"
+        )
+        self._connection.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS manuscript_fts USING fts5("
+            "content, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+
+    def _transaction(self, statements):
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                result = statements(self._connection)
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+        return result
+
+    def update(self, project_id, path: str, content: Optional[str]):
+        """Replaces the indexed content of a file, None removes it."""
+        if content is None:
+            self.remove(project_id, path)
+            return
+
+        def replace(connection: sqlite3.Connection):
+            connection.execute(
+                "INSERT OR IGNORE INTO manuscript_documents (project_id, path) "
+                "VALUES (?, ?)",
+                (str(project_id), path),
+            )
+            document_id = connection.execute(
+                "SELECT id FROM manuscript_documents WHERE project_id = ? AND path = ?",
+                (str(project_id), path),
+            ).fetchone()[0]
+            connection.execute(
+                "DELETE FROM manuscript_fts WHERE rowid = ?", (document_id,)
+            )
+            connection.execute(
+                "INSERT INTO manuscript_fts (rowid, content) VALUES (?, ?)",
+                (document_id, content),
+            )
+
+        self._transaction(replace)
+
+    def remove(self, project_id, path: str) -> int:
+        """Removes a file, or every file below a directory ("." for all)."""
+
+        def delete(connection: sqlite3.Connection) -> int:
+            if path == ".":
+                rows = connection.execute(
+                    "SELECT id FROM manuscript_documents WHERE project_id = ?",
+                    (str(project_id),),
+                ).fetchall()
+            else:
+                escaped = (
+                    path.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+                )
+                rows = connection.execute(
+                    "SELECT id FROM manuscript_documents WHERE project_id = ? "
+                    "AND (path = ? OR path LIKE ? ESCAPE '\\')",
+                    (str(project_id), path, f"{escaped}/%"),
+                ).fetchall()
+            ids = [(row[0],) for row in rows]
+            connection.executemany("DELETE FROM manuscript_fts WHERE rowid = ?", ids)
+            connection.executemany("DELETE FROM manuscript_documents WHERE id = ?", ids)
+            return len(ids)
+
+        return self._transaction(delete)
+
+    def search(self, project_id, query: str, limit: int) -> list[dict]:
+        """
+        Runs an FTS5 query over the files of a project, best matches first.
+
+        Returns:
+            list: Dicts with the file path, its bm25 rank (lower is better)
+                  and a snippet with the matches highlighted
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT d.path, bm25(manuscript_fts), "
+                "snippet(manuscript_fts, 0, ?, ?, '…', ?) "
+                "FROM manuscript_fts JOIN manuscript_documents d "
+                "ON d.id = manuscript_fts.rowid "
+                "WHERE manuscript_fts MATCH ? AND d.project_id = ? "
+                "ORDER BY bm25(manuscript_fts) LIMIT ?",
+                (
+                    HIGHLIGHT_START,
+                    HIGHLIGHT_END,
+                    SNIPPET_TOKENS,
+                    query,
+                    str(project_id),
+                    limit,
+                ),
+            ).fetchall()
+        return [
+            {"path": path, "rank": rank, "snippet": snippet}
+            for path, rank, snippet in rows
+        ]
+
+    def close(self):
+        self._connection.close()
+
+
+_indexes: dict[str, ManuscriptFullTextIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_manuscript_fts(upload_dir: str) -> ManuscriptFullTextIndex:
+    """The full-text index of the manuscripts under upload_dir, opened once per process."""
+    path = os.path.abspath(os.path.join(upload_dir, INDEX_FILENAME))
+    with _indexes_lock:
+        index = _indexes.get(path)
+        if index is None:
+            if not os.path.exists(upload_dir):
+                os.makedirs(upload_dir)
+            index = _indexes[path] = ManuscriptFullTextIndex(path)
+        return index
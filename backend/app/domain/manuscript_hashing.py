@@ -0,0 +1,62 @@
+import hashlib
+import os
+from collections import OrderedDict
+from typing import Optional
+
+from backend.app.domain.manuscript_compression import open_stored
+
+HASH_BUFFER_SIZE = 1024 * 1024
+
+
+def file_sha256(path: str) -> str:
+    """Hash of the content of a stored file, the same compressed or not."""
+    digest = hashlib.sha256()
+    with open_stored(path) as f:
+        while block := f.read(HASH_BUFFER_SIZE):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class FileHashCache:
+    """
+    LRU cache of SHA-256 digests of stored manuscript files.
+
+    Entries are keyed by the file size and modification time, so a file
+    changed behind the cache's back is simply hashed again.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[tuple[int, int], str]] = OrderedDict()
+
+    @staticmethod
+    def _stat_key(path: str) -> tuple[int, int]:
+        stat = os.stat(path)
+        return stat.st_size, stat.st_mtime_ns
+
+    def get(self, path: str) -> str:
+        key = self._stat_key(path)
+        cached = self._entries.get(path)
+        if cached is not None and cached[0] == key:
+            self._entries.move_to_end(path)
+            return cached[1]
+
+        digest = file_sha256(path)
+        self._store(path, key, digest)
+        return digest
+
+    def put(self, path: str, digest: str):
+        self._store(path, self._stat_key(path), digest)
+
+    def peek(self, path: str) -> Optional[str]:
+        cached = self._entries.get(path)
+        return cached[1] if cached else None
+
+    def _store(self, path: str, key: tuple[int, int], digest: str):
+        self._entries[path] = (key, digest)
+        self._entries.move_to_end(path)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
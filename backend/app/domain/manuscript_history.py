@@ -0,0 +1,330 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Optional
+
+from backend.app.domain.manuscript_index import INDEX_FILENAME
+
+# Content-defined chunking, see split_chunks()
+CHUNK_MIN_SIZE = 1024
+CHUNK_MAX_SIZE = 64 * 1024
+BOUNDARY_MASK = 0x7
+DIGEST_SIZE = hashlib.sha256().digest_size
+
+
+def split_chunks(data: bytes) -> list[bytes]:
+    """
+    Splits content in content-defined chunks. A chunk ends after a line whose
+    CRC-32 has the BOUNDARY_MASK bits clear, once it holds CHUNK_MIN_SIZE
+    bytes, and is cut at CHUNK_MAX_SIZE when no line ends before. Boundaries
+    only depend on the lines before them, so an edit changes the chunk it
+    falls in, and the next one when it moves their boundary, and every other
+    chunk is shared with the previous revision.
+    """
+    chunks = []
+    start = position = 0
+    while position < len(data):
+        end = data.find(b"\n", position, start + CHUNK_MAX_SIZE)
+        if end == -1:
+            end = min(len(data), start + CHUNK_MAX_SIZE)
+            chunks.append(data[start:end])
+            start = position = end
+            continue
+        end += 1
+        boundary = not zlib.crc32(data[position:end]) & BOUNDARY_MASK
+        if boundary and end - start >= CHUNK_MIN_SIZE:
+            chunks.append(data[start:end])
+            start = end
+        position = end
+    if start < len(data):
+        chunks.append(data[start:])
+    return chunks
+
+
+class ManuscriptHistory:
+    """
+    Content-addressed history of every saved revision of the manuscript files.
+
+    A revision is the list of the SHA-256 digests of its chunks (see
+    split_chunks()). Chunks are stored once per project, zlib compressed and
+    reference counted, in SQLite, so saving a long scene after a one word edit
+    stores one new chunk. The new chunks and the revision are written in one
+    transaction, made durable by a single commit instead of an fsync of every
+    chunk. prune() applies the retention policy and collect_garbage() deletes
+    the chunks no revision uses anymore.
+    """
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            path, timeout=5, isolation_level=None, check_same_thread=False
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS history_revisions ("
+            "id INTEGER PRIMARY KEY, project_id TEXT NOT NULL, path TEXT NOT NULL, "
+            "content_hash TEXT NOT NULL, size INTEGER NOT NULL, "
+            "created_at REAL NOT NULL, chunks BLOB NOT NULL)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS history_revisions_path "
+            "ON history_revisions (project_id, path, id)"
+        )
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS history_chunks ("
+            "project_id TEXT NOT NULL, digest BLOB NOT NULL, "
+            "stored_size INTEGER NOT NULL, refs INTEGER NOT NULL, "
+            "data BLOB NOT NULL, PRIMARY KEY (project_id, digest)) WITHOUT ROWID"
+        )
+
+    def _transaction(self, statements):
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                result = statements(self._connection)
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+        return result
+
+    def _read_chunk(self, project_id, digest: bytes) -> bytes:
+        """
+        Raises:
+            OSError: If the chunk is missing or corrupt
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT data FROM history_chunks WHERE project_id = ? AND digest = ?",
+                (str(project_id), digest),
+            ).fetchone()
+        if row is None:
+            raise OSError(f"Missing history chunk {digest.hex()}")
+        try:
+            chunk = zlib.decompress(row[0])
+        except zlib.error as e:
+            raise OSError(f"Corrupt history chunk {digest.hex()}: {e}")
+        if hashlib.sha256(chunk).digest() != digest:
+            raise OSError(f"Corrupt history chunk {digest.hex()}")
+        return chunk
+
+    @staticmethod
+    def _revision(row) -> dict:
+        return {
+            "id": row[0],
+            "path": row[1],
+            "content_hash": row[2],
+            "size": row[3],
+            "created_at": row[4],
+        }
+
+    def record(
+        self,
+        project_id,
+        path: str,
+        content: bytes,
+        content_hash: str,
+        timestamp: Optional[float] = None,
+    ) -> Optional[dict]:
+        """
+        Records a revision of a file, unless it has the content of the last one.
+
+        New chunks are written in the transaction of the revision, so a
+        revision never points at a missing chunk.
+
+        Returns:
+            dict: The revision (id, path, content_hash, size, created_at),
+                  None when nothing was recorded
+        """
+        created_at = time.time() if timestamp is None else timestamp
+        pieces = split_chunks(content)
+        chunk_digests = [hashlib.sha256(chunk).digest() for chunk in pieces]
+        chunks = dict(zip(chunk_digests, pieces))
+        digests = b"".join(chunk_digests)
+
+        def write(connection: sqlite3.Connection) -> Optional[dict]:
+            latest = connection.execute(
+                "SELECT content_hash FROM history_revisions "
+                "WHERE project_id = ? AND path = ? ORDER BY id DESC LIMIT 1",
+                (str(project_id), path),
+            ).fetchone()
+            if latest is not None and latest[0] == content_hash:
+                return None
+
+            for digest, chunk in chunks.items():
+                known = connection.execute(
+                    "SELECT 1 FROM history_chunks WHERE project_id = ? AND digest = ?",
+                    (str(project_id), digest),
+                ).fetchone()
+                if known is None:
+                    data = zlib.compress(chunk)
+                    connection.execute(
+                        "INSERT INTO history_chunks "
+                        "(project_id, digest, stored_size, refs, data) "
+                        "VALUES (?, ?, ?, 0, ?)",
+                        (str(project_id), digest, len(data), data),
+                    )
+            connection.executemany(
+                "UPDATE history_chunks SET refs = refs + 1 "
+                "WHERE project_id = ? AND digest = ?",
+                [(str(project_id), digest) for digest in chunk_digests],
+            )
+            cursor = connection.execute(
+                "INSERT INTO history_revisions "
+                "(project_id, path, content_hash, size, created_at, chunks) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    str(project_id),
+                    path,
+                    content_hash,
+                    len(content),
+                    created_at,
+                    digests,
+                ),
+            )
+            return self._revision(
+                (cursor.lastrowid, path, content_hash, len(content), created_at)
+            )
+
+        return self._transaction(write)
+
+    def revisions(self, project_id, path: str) -> list[dict]:
+        """The revisions of a file, newest first."""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT id, path, content_hash, size, created_at FROM history_revisions "
+                "WHERE project_id = ? AND path = ? ORDER BY id DESC",
+                (str(project_id), path),
+            ).fetchall()
+        return [self._revision(row) for row in rows]
+
+    def get(self, project_id, revision_id: int) -> Optional[dict]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT id, path, content_hash, size, created_at FROM history_revisions "
+                "WHERE project_id = ? AND id = ?",
+                (str(project_id), revision_id),
+            ).fetchone()
+        return self._revision(row) if row else None
+
+    def read(self, project_id, revision_id: int) -> Optional[bytes]:
+        """
+        The content of a revision, None when there is no such revision.
+
+        Raises:
+            OSError: If a chunk is missing or corrupt
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT chunks FROM history_revisions WHERE project_id = ? AND id = ?",
+                (str(project_id), revision_id),
+            ).fetchone()
+        if row is None:
+            return None
+
+        return b"".join(
+            self._read_chunk(project_id, row[0][i : i + DIGEST_SIZE])
+            for i in range(0, len(row[0]), DIGEST_SIZE)
+        )
+
+    @staticmethod
+    def _release(connection: sqlite3.Connection, rows: list) -> int:
+        for revision_id, project_id, chunks in rows:
+            connection.executemany(
+                "UPDATE history_chunks SET refs = refs - 1 "
+                "WHERE project_id = ? AND digest = ?",
+                [
+                    (project_id, chunks[i : i + DIGEST_SIZE])
+                    for i in range(0, len(chunks), DIGEST_SIZE)
+                ],
+            )
+            connection.execute(
+                "DELETE FROM history_revisions WHERE id = ?", (revision_id,)
+            )
+        return len(rows)
+
+    def prune(self, keep: int, max_age: float, now: Optional[float] = None) -> int:
+        """
+        Applies the retention policy: a revision is dropped once its file has
+        `keep` newer revisions, or once it is older than max_age seconds. The
+        last revision of every file is always kept, deleted files included, so
+        they can still be restored.
+
+        Returns:
+            int: Number of revisions dropped
+        """
+        cutoff = (time.time() if now is None else now) - max_age
+
+        def drop(connection: sqlite3.Connection) -> int:
+            rows = connection.execute(
+                "SELECT id, project_id, chunks FROM ("
+                "SELECT id, project_id, chunks, created_at, ROW_NUMBER() OVER ("
+                "PARTITION BY project_id, path ORDER BY id DESC) AS newer "
+                "FROM history_revisions) "
+                "WHERE newer > 1 AND (newer > ? OR created_at < ?)",
+                (keep, cutoff),
+            ).fetchall()
+            return self._release(connection, rows)
+
+        return self._transaction(drop)
+
+    def collect_garbage(self) -> int:
+        """
+        Deletes the chunks no revision references anymore.
+
+        Returns:
+            int: Number of chunks deleted
+        """
+
+        def collect(connection: sqlite3.Connection) -> int:
+            return connection.execute(
+                "DELETE FROM history_chunks WHERE refs <= 0"
+            ).rowcount
+
+        return self._transaction(collect)
+
+    def usage(self, project_id) -> dict:
+        """
+        Returns:
+            dict: Number of revisions and chunks of a project, with the size
+                  of the revisions and the size their chunks take on disk
+        """
+        with self._lock:
+            revisions, size = self._connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM history_revisions "
+                "WHERE project_id = ?",
+                (str(project_id),),
+            ).fetchone()
+            chunks, stored_size = self._connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(stored_size), 0) FROM history_chunks "
+                "WHERE project_id = ?",
+                (str(project_id),),
+            ).fetchone()
+        return {
+            "revisions": revisions,
+            "size": size,
+            "chunks": chunks,
+            "stored_size": stored_size,
+        }
+
+    def close(self):
+        self._connection.close()
+
+
+_histories: dict[str, ManuscriptHistory] = {}
+_histories_lock = threading.Lock()
+
+
+def get_manuscript_history(upload_dir: str) -> ManuscriptHistory:
+    """The revision history of the manuscripts under upload_dir, opened once per process."""
+    path = os.path.abspath(os.path.join(upload_dir, INDEX_FILENAME))
+    with _histories_lock:
+        history = _histories.get(path)
+        if history is None:
+            if not os.path.exists(upload_dir):
+                os.makedirs(upload_dir)
+            history = _histories[path] = ManuscriptHistory(path)
+        return history
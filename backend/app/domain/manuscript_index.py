@@ -0,0 +1,236 @@
+import codecs
+import os
+import posixpath
+import sqlite3
+import threading
+from typing import Optional
+
+from backend.app.domain.manuscript_compression import open_stored
+from backend.app.domain.manuscript_hashing import HASH_BUFFER_SIZE
+
+INDEX_FILENAME = ".manuscript_index.db"
+
+
+def count_words(path: str) -> int:
+    """
+    Counts the words of a stored UTF-8 file, a block at a time. Words are runs
+    of non whitespace characters, as word processors count them. Files that
+    are not UTF-8 text (images, .docx, ...) have no words.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    words = 0
+    in_word = False
+    with open_stored(path) as f:
+        try:
+            while block := f.read(HASH_BUFFER_SIZE):
+                text = decoder.decode(block)
+                if not text:
+                    continue
+                words += len(text.split())
+                # A word cut by the block boundary was counted twice
+                if in_word and not text[0].isspace():
+                    words -= 1
+                in_word = not text[-1].isspace()
+            decoder.decode(b"", final=True)
+        except UnicodeDecodeError:
+            return 0
+    return words
+
+
+def index_path(relative_path: str, filename: str = "") -> str:
+    """Normalized path of a file relative to its project root, "." for the root."""
+    path = posixpath.normpath(
+        posixpath.join(relative_path.replace(os.sep, "/").lstrip("/"), filename)
+    )
+    return "." if path in ("", "/") else path
+
+
+class ManuscriptIndex:
+    """
+    Per-file metadata of the stored manuscripts (size, timestamps, content hash
+    and word count), kept in a SQLite database next to the manuscripts.
+
+    Every save updates only the row of the saved file, in a single statement,
+    so concurrent saves in the same directory cannot overwrite each other the
+    way the read-modify-write of metadata.json did.
+    """
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            path, timeout=5, isolation_level=None, check_same_thread=False
+        )
+        self._connection.row_factory = sqlite3.Row
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        # size is the size of the content and disk_size the size of the file,
+        # they differ for compressed files
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS manuscript_files ("
+            "project_id TEXT NOT NULL, path TEXT NOT NULL, directory TEXT NOT NULL, "
+            "name TEXT NOT NULL, size INTEGER NOT NULL, disk_size INTEGER NOT NULL, "
+            "created_at REAL NOT NULL, modified_at REAL NOT NULL, "
+            "mtime_ns INTEGER NOT NULL, content_hash TEXT NOT NULL, "
+            "word_count INTEGER NOT NULL, PRIMARY KEY (project_id, path))"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS manuscript_files_directory "
+            "ON manuscript_files (project_id, directory)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS manuscript_files_content_hash "
+            "ON manuscript_files (content_hash)"
+        )
+
+    @staticmethod
+    def _entry(row: sqlite3.Row) -> dict:
+        return {
+            "name": row["name"],
+            "path": row["path"],
+            "size": row["size"],
+            "created_at": row["created_at"],
+            "modified_at": row["modified_at"],
+            "content_hash": row["content_hash"],
+            "word_count": row["word_count"],
+        }
+
+    def record(
+        self,
+        project_id,
+        path: str,
+        stat: os.stat_result,
+        content_hash: str,
+        word_count: int,
+        size: Optional[int] = None,
+    ) -> dict:
+        """
+        Records the metadata of a file, size is the size of its content when
+        it is stored compressed, stat.st_size by default.
+        """
+        directory, name = posixpath.split(path)
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO manuscript_files (project_id, path, "
+                "directory, name, size, disk_size, created_at, modified_at, "
+                "mtime_ns, content_hash, word_count) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    str(project_id),
+                    path,
+                    directory or ".",
+                    name,
+                    stat.st_size if size is None else size,
+                    stat.st_size,
+                    stat.st_ctime,
+                    stat.st_mtime,
+                    stat.st_mtime_ns,
+                    content_hash,
+                    word_count,
+                ),
+            )
+        return self.get(project_id, path)
+
+    def get(self, project_id, path: str) -> Optional[dict]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT * FROM manuscript_files WHERE project_id = ? AND path = ?",
+                (str(project_id), path),
+            ).fetchone()
+        return self._entry(row) if row else None
+
+    def current_hash(
+        self, project_id, path: str, stat: os.stat_result
+    ) -> Optional[str]:
+        """The indexed content hash, if the file did not change since it was indexed."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT content_hash FROM manuscript_files "
+                "WHERE project_id = ? AND path = ? AND disk_size = ? AND mtime_ns = ?",
+                (str(project_id), path, stat.st_size, stat.st_mtime_ns),
+            ).fetchone()
+        return row[0] if row else None
+
+    def cached_word_count(self, content_hash: str) -> Optional[int]:
+        """The word count of any indexed file with this content, if there is one."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT word_count FROM manuscript_files WHERE content_hash = ? LIMIT 1",
+                (content_hash,),
+            ).fetchone()
+        return row[0] if row else None
+
+    def content_sizes(self, project_id) -> dict[str, tuple[int, float, int]]:
+        """
+        The size on disk and modification time each file of a project was
+        indexed with, and the size of its content, by path.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT path, disk_size, modified_at, size FROM manuscript_files "
+                "WHERE project_id = ?",
+                (str(project_id),),
+            ).fetchall()
+        return {row[0]: (row[1], row[2], row[3]) for row in rows}
+
+    def project_paths(self, project_id) -> set[str]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT path FROM manuscript_files WHERE project_id = ?",
+                (str(project_id),),
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def forget(self, project_id, paths) -> int:
+        """Removes exactly these files from the index, unlike remove()."""
+        with self._lock:
+            cursor = self._connection.executemany(
+                "DELETE FROM manuscript_files WHERE project_id = ? AND path = ?",
+                [(str(project_id), path) for path in paths],
+            )
+        return cursor.rowcount
+
+    def directory_files(self, project_id, directory: str) -> list[dict]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT * FROM manuscript_files "
+                "WHERE project_id = ? AND directory = ? ORDER BY name",
+                (str(project_id), directory),
+            ).fetchall()
+        return [self._entry(row) for row in rows]
+
+    def remove(self, project_id, path: str) -> int:
+        """Removes a file, or every file below a directory, from the index."""
+        with self._lock:
+            if path == ".":
+                cursor = self._connection.execute(
+                    "DELETE FROM manuscript_files WHERE project_id = ?",
+                    (str(project_id),),
+                )
+            else:
+                escaped = (
+                    path.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+                )
+                cursor = self._connection.execute(
+                    "DELETE FROM manuscript_files WHERE project_id = ? "
+                    "AND (path = ? OR path LIKE ? ESCAPE '\\')",
+                    (str(project_id), path, f"{escaped}/%"),
+                )
+        return cursor.rowcount
+
+    def close(self):
+        self._connection.close()
+
+
+_indexes: dict[str, ManuscriptIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_manuscript_index(upload_dir: str) -> ManuscriptIndex:
+    """The index of the manuscripts stored under upload_dir, opened once per process."""
+    path = os.path.abspath(os.path.join(upload_dir, INDEX_FILENAME))
+    with _indexes_lock:
+        index = _indexes.get(path)
+        if index is None:
+            if not os.path.exists(upload_dir):
+                os.makedirs(upload_dir)
+            index = _indexes[path] = ManuscriptIndex(path)
+        return index
@@ -0,0 +1,108 @@
+import os
+from typing import Optional
+
+# Files of the manuscripts directory that are not scenes
+IGNORED_FILES = {"metadata.json"}
+
+
+def _join(relative_path: str, name: str) -> str:
+    return f"{relative_path}/{name}" if relative_path else name
+
+
+def _sorted_entries(path: str) -> list[os.DirEntry]:
+    with os.scandir(path) as iterator:
+        return sorted(iterator, key=lambda entry: entry.name)
+
+
+def _scene(entry: os.DirEntry, relative_path: str) -> Optional[dict]:
+    """The scene of a directory entry, None for directories and skipped files."""
+    if entry.name.startswith(".") or entry.name in IGNORED_FILES:
+        return None
+    try:
+        if entry.is_dir():
+            return None
+        # DirEntry caches the stat result, each file is stat'ed once
+        stat = entry.stat()
+    except OSError:
+        # Removed while listing
+        return None
+    return {
+        "title": entry.name,
+        "path": _join(relative_path, entry.name),
+        "content": "",
+        "size": stat.st_size,
+        "modified_at": stat.st_mtime,
+    }
+
+
+def _direct_scenes(entries: list[os.DirEntry], relative_path: str) -> list[dict]:
+    scenes = (_scene(entry, relative_path) for entry in entries)
+    return [scene for scene in scenes if scene is not None]
+
+
+def list_scenes(directory_path: str, relative_path: str) -> list[dict]:
+    """
+    Lists the scenes of one chapter directory, like walk_chapters() does:
+    its files sorted by name, files of its subdirectories are not scenes.
+
+    Raises:
+        OSError: If the directory itself cannot be read
+    """
+    return _direct_scenes(_sorted_entries(directory_path), relative_path)
+
+
+def walk_chapters(project_path: str) -> list[dict]:
+    """
+    Lists the chapters (top level directories) of a project with their
+    scenes, the files directly in them, reading each chapter once with
+    os.scandir().
+
+    Hidden directories are never opened, hidden files and metadata.json are
+    skipped, and files at the project root or in subdirectories of a chapter
+    are not listed. A chapter that can't be read is listed without scenes.
+
+    Raises:
+        OSError: If the project directory itself cannot be read
+    """
+    chapters = []
+    for entry in _sorted_entries(project_path):
+        if entry.name.startswith(".") or not entry.is_dir():
+            continue
+
+        chapter = {"title": entry.name, "path": entry.name, "scenes": []}
+        if not entry.is_symlink():
+            try:
+                chapter["scenes"] = list_scenes(entry.path, entry.name)
+            except OSError:
+                # Unreadable chapters are listed empty, as os.walk() did
+                pass
+        chapters.append(chapter)
+    return chapters
+
+
+def _collect_files(entries: list[os.DirEntry], relative_path: str, files: list):
+    files.extend(_direct_scenes(entries, relative_path))
+    for entry in entries:
+        try:
+            if entry.name.startswith(".") or not entry.is_dir() or entry.is_symlink():
+                continue
+            subentries = _sorted_entries(entry.path)
+        except OSError:
+            # Unreadable subdirectories are skipped
+            continue
+        _collect_files(subentries, _join(relative_path, entry.name), files)
+
+
+def walk_files(directory_path: str, relative_path: str = "") -> list[dict]:
+    """
+    Lists every stored file under a directory, at any depth, with the fields
+    of a scene: depth first, files before subdirectories, both sorted by
+    name. Used to index or rewrite all the files of a project, the listing
+    only shows the scenes of walk_chapters().
+
+    Raises:
+        OSError: If the directory itself cannot be read
+    """
+    files = []
+    _collect_files(_sorted_entries(directory_path), relative_path, files)
+    return files
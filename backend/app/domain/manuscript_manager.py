@@ -1,23 +1,230 @@
+import asyncio
+import difflib
+import hashlib
 import json
 import os
+import re
 import shutil
 import tempfile
+import time
 import uuid
-import aiofiles
+import weakref
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import AsyncIterator, Awaitable, Callable, Optional
 
 from fastapi import HTTPException, UploadFile
-from backend.app.schemas.sections.manuscript_schemas import SaveStartRequest
+from backend.app.domain.manuscript_autosave import AutosaveQueue
+from backend.app.domain.manuscript_compression import (
+    HEADER as COMPRESSED_HEADER,
+    choose_codec,
+    compress_file,
+    decompress_file,
+    is_compressed,
+    normalize_newlines,
+    open_stored,
+    read_stored_text,
+    stored_header,
+    stored_size,
+)
+from backend.app.domain.manuscript_fs_executor import FileSystemExecutor
+from backend.app.domain.manuscript_fts import (
+    ManuscriptFullTextIndex,
+    fts_query,
+    get_manuscript_fts,
+    read_text,
+)
+from backend.app.domain.manuscript_hashing import FileHashCache, file_sha256
+from backend.app.domain.manuscript_history import (
+    ManuscriptHistory,
+    get_manuscript_history,
+)
+from backend.app.domain.manuscript_index import (
+    ManuscriptIndex,
+    count_words,
+    get_manuscript_index,
+    index_path,
+)
+from backend.app.domain.manuscript_listing import (
+    list_scenes,
+    walk_chapters,
+    walk_files,
+)
+from backend.app.domain.manuscript_patch import apply_operations, apply_unified_diff
+from backend.app.domain.manuscript_reading import read_byte_window, read_line_window
+from backend.app.domain.manuscript_search import compile_search_pattern, search_file
+from backend.app.domain.manuscript_sessions import create_session_store
+from backend.app.domain.manuscript_tree_cache import ManuscriptTreeCache
+from backend.app.domain.manuscript_upload_files import (
+    OpenUploadFile,
+    UploadFileHandles,
+    add_received_range,
+    check_fsync_policy,
+    commit_upload_file,
+    copy_to_offset,
+    missing_ranges,
+    positional_write,
+    received_end,
+)
+from backend.app.domain.manuscript_word_history import (
+    DAY,
+    RESOLUTIONS,
+    WordCountHistory,
+    get_word_history,
+)
+from backend.app.schemas.sections.manuscript_schemas import (
+    SaveCheckRequest,
+    SavePatchRequest,
+    SaveStartRequest,
+)
+from backend.app.settings import get_settings
+
+settings = get_settings()
+
+# Temporary upload files are named "{filename}.{session_id}.part" and staged
+# in this directory of the project, on the same filesystem as the final files
+STAGING_DIRNAME = ".staging"
+PART_FILE_PATTERN = re.compile(
+    r"\.([0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})\.part$"
+)
+
+
+def copy_buffer_size(size: Optional[int], minimum: int, maximum: int) -> int:
+    """
+    Picks the copy buffer for a chunk: the whole chunk when it fits between the
+    bounds, so most chunks are copied with a single read/write pair.
+    """
+    if size is None:
+        return maximum
+    return max(minimum, min(size, maximum))
+
+
+def _path_type(path: str) -> Optional[str]:
+    """ "file", "directory", "other", or None when nothing exists at path."""
+    if not os.path.exists(path):
+        return None
+    if os.path.isfile(path):
+        return "file"
+    if os.path.isdir(path):
+        return "directory"
+    return "other"
+
+
+def _bytes_left(total_size: Optional[int], start: int) -> Optional[int]:
+    return None if total_size is None else total_size - start
+
+
+def _truncate_file(path: str, size: int):
+    try:
+        os.truncate(path, size)
+    except FileNotFoundError:
+        pass
+
+
+def _remove_file(path: str) -> bool:
+    try:
+        os.remove(path)
+        return True
+    except OSError:
+        return False
 
 
 class ManuscriptManager:
     UPLOAD_DIR = "manuscripts/"
     os.makedirs(UPLOAD_DIR, exist_ok=True)
-    sessions = {}
+    sessions = create_session_store(
+        settings.upload_session_store, settings.upload_session_db
+    )
+    fs_executor = FileSystemExecutor(settings.manuscript_fs_workers)
+    upload_files = UploadFileHandles(fs_executor)
+    file_hashes = FileHashCache()
+    tree_cache = ManuscriptTreeCache()
+    # One lock per patched file, by real path, dropped by the weak references
+    # once no patch holds or waits for it
+    patch_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = (
+        weakref.WeakValueDictionary()
+    )
+    # Saves of the same file within autosave.delay seconds are written once
+    autosave = AutosaveQueue(
+        settings.manuscript_autosave_delay, settings.manuscript_autosave_max_delay
+    )
+
+    COPY_BUFFER_MIN = 64 * 1024
+    COPY_BUFFER_MAX = 1024 * 1024
+    # Seconds an upload session temp file stays open without receiving chunks
+    UPLOAD_IDLE_TIMEOUT = 60
+    # Files read ahead of the client by the bulk content endpoint
+    BULK_READ_CONCURRENCY = 8
+    search_executor = ThreadPoolExecutor(
+        max_workers=4, thread_name_prefix="manuscript-search"
+    )
+    # Seconds without activity before an upload session and its temp file are dropped
+    SESSION_TTL = settings.upload_session_ttl
+    FSYNC_POLICY = check_fsync_policy(settings.manuscript_fsync)
+    # Saved files are compressed when enabled, see _compress_staged_file()
+    COMPRESSION = settings.manuscript_compression
+    COMPRESSION_MIN_SIZE = settings.manuscript_compression_min_size
+    ZSTD_MIN_SIZE = settings.manuscript_zstd_min_size
+    # Largest body accepted by save_manuscript_file()
+    SMALL_SAVE_MAX_SIZE = settings.manuscript_small_save_max_size
+    # Every saved revision is kept in the history, see ManuscriptHistory.prune()
+    HISTORY = settings.manuscript_history
+    HISTORY_KEEP = settings.manuscript_history_keep
+    HISTORY_MAX_AGE = settings.manuscript_history_max_age_days * DAY
+    SESSION_CLEANUP_INTERVAL = 15 * 60
 
     def __init__(self):
         pass
 
-    def start_manuscript_save_session(self, request: SaveStartRequest) -> str:
+    @property
+    def metadata_index(self) -> ManuscriptIndex:
+        return get_manuscript_index(self.UPLOAD_DIR)
+
+    @property
+    def full_text_index(self) -> ManuscriptFullTextIndex:
+        return get_manuscript_fts(self.UPLOAD_DIR)
+
+    @property
+    def word_history(self) -> WordCountHistory:
+        return get_word_history(self.UPLOAD_DIR)
+
+    @property
+    def history(self) -> ManuscriptHistory:
+        return get_manuscript_history(self.UPLOAD_DIR)
+
+    def _save_target(self, project_id: int, relative_path: str, filename: str) -> dict:
+        project_path = os.path.join(self.UPLOAD_DIR, str(project_id))
+
+        # Make sure relative_path doesn't start with /
+        relative_path = relative_path.lstrip("/")
+        if not relative_path:
+            relative_path = "."
+
+        return {
+            "project_id": project_id,
+            "project_path": project_path,
+            "relative_path": relative_path,
+            "filename": filename,
+        }
+
+    @staticmethod
+    def _final_path(session_data: dict) -> str:
+        return str(
+            os.path.join(
+                session_data["project_path"],
+                session_data["relative_path"],
+                session_data["filename"],
+            )
+        )
+
+    def _ensure_directories(self, project_path: str, full_dir: str):
+        if not os.path.isdir(full_dir):
+            os.makedirs(full_dir, exist_ok=True)
+            self.tree_cache.invalidate(project_path)
+        os.makedirs(os.path.join(project_path, STAGING_DIRNAME), exist_ok=True)
+
+    async def start_manuscript_save_session(self, request: SaveStartRequest) -> str:
         """
         Initiates a new manuscript file save session for chunked upload.
 
@@ -30,6 +237,12 @@ class ManuscriptManager:
                 - project_id: Identifier for the project where the file will be saved
                 - relative_path: Relative path within the project directory
                 - filename: Name of the file to be uploaded
+                - total_size: Optional final size in bytes. When given, the
+                  temporary file is preallocated and finish verifies that
+                  every byte was received
+                - content_hash: Optional SHA-256 of the content. finish
+                  checks it against the uploaded bytes, and skips the write
+                  when it matches the stored file
 
         Returns:
             str: Unique session identifier (UUID) that must be used for later
@@ -39,21 +252,27 @@ class ManuscriptManager:
             OSError: If directory creation fails due to permissions or disk space issues
 
         Note:
-            - Creates the target directory structure if it doesn't exist
+            - Creates the target directory structure and the project staging
+              directory if they don't exist
             - Normalizes the relative_path by removing leading slashes
             - Uses "." as relative_path if empty (root of project directory)
             - Generates a temporary file with format: "{filename}.{session_id}.part"
-            - Stores session data in memory for later retrieval during chunk operations
+              in the project staging directory, on the same filesystem as the
+              final file so finish is a rename
+            - Stores session data in the configured session store (in memory or
+              a SQLite table shared by every worker) for later chunk operations.
+              Sessions inactive for SESSION_TTL seconds are expired by
+              cleanup_expired_sessions()
             - The session must be completed with finish_manuscript_save_session()
 
         Directory Structure:
             ```
             manuscripts/
-            ├── {project_id}/
-            │   ├── {relative_path}/
-            │   │   └── {filename}  # Final location
-            └── temp/
-                └── {filename}.{session_id}.part  # Temporary file
+            └── {project_id}/
+                ├── {relative_path}/
+                │   └── {filename}  # Final location
+                └── .staging/
+                    └── {filename}.{session_id}.part  # Temporary file
             ```
 
         Example:
@@ -63,34 +282,43 @@ class ManuscriptManager:
                 relative_path="documents/drafts",
                 filename="chapter1.docx"
             )
-            session_id = manager.start_manuscript_save_session(request)
+            session_id = await manager.start_manuscript_save_session(request)
             # session_id: "a1b2c3d4-e5f6-7890-abcd-ef1234567890"
             ```
         """
-        project_path = os.path.join(self.UPLOAD_DIR, str(request.project_id))
+        target = self._save_target(
+            request.project_id, request.relative_path, request.filename
+        )
         session_id = str(uuid.uuid4())
 
-        # Make sure relative_path doesn't start with /
-        relative_path = request.relative_path.lstrip("/")
-        if not relative_path:
-            relative_path = "."
-
-        full_dir = os.path.join(project_path, relative_path)
-        os.makedirs(full_dir, exist_ok=True)
+        full_dir = os.path.join(target["project_path"], target["relative_path"])
+        await self.fs_executor.run(
+            self._ensure_directories, target["project_path"], full_dir
+        )
 
-        temp_dir = tempfile.gettempdir()
-        temp_path = os.path.join(temp_dir, f"{request.filename}.{session_id}.part")
+        temp_path = os.path.join(
+            target["project_path"],
+            STAGING_DIRNAME,
+            f"{request.filename}.{session_id}.part",
+        )
 
-        self.sessions[session_id] = {
-            "project_path": project_path,
-            "relative_path": relative_path,
-            "filename": request.filename,
-            "temp_path": temp_path,
-        }
+        await self.fs_executor.run(
+            self.sessions.__setitem__,
+            session_id,
+            {
+                **target,
+                "temp_path": temp_path,
+                "total_size": request.total_size,
+                "content_hash": request.content_hash,
+                "received": [],
+            },
+        )
 
         return session_id
 
-    async def save_manuscript_chunk(self, session_id: str, file: UploadFile):
+    async def save_manuscript_chunk(
+        self, session_id: str, file: UploadFile, offset: Optional[int] = None
+    ):
         """
         Saves a chunk (fragment) of a manuscript file to a temporary file.
 
@@ -103,10 +331,14 @@ class ManuscriptManager:
                              started with start_manuscript_save_session()
             file (UploadFile): FastAPI UploadFile object containing the file
                               fragment to be saved
+            offset (Optional[int]): Byte position of the chunk in the final file.
+                              When omitted the chunk is appended after the last
+                              received byte, so chunks must arrive in order
 
         Raises:
             HTTPException:
                 - 404: If the session_id doesn't exist in active sessions
+                - 416: If the chunk falls outside the declared total_size
                 - 500: If an I/O error occurs while writing to the temporary file
 
         Returns:
@@ -114,10 +346,16 @@ class ManuscriptManager:
                   content to the temporary file associated with the session
 
         Note:
-            - The file is written in binary append mode ("ab") to concatenate
-              all received chunks
-            - Each chunk is processed in 32KB fragments to optimize memory usage
-            - The temporary file is created in the system's temporary directory
+            - Chunks with an offset are written with positional writes, so they
+              can be sent in parallel, in any order, and retried one by one.
+              The received byte ranges are tracked in the session
+            - The temporary file is opened on the first chunk and kept open for
+              the next ones. Files idle for more than UPLOAD_IDLE_TIMEOUT
+              seconds are closed, by the next chunk of any session or by
+              run_session_cleanup(), and reopened on demand
+            - The whole chunk is copied in a single worker thread call, with a
+              buffer sized to the chunk (between COPY_BUFFER_MIN and
+              COPY_BUFFER_MAX)
             - This method must be called after start_manuscript_save_session()
               and before finish_manuscript_save_session()
 
@@ -126,58 +364,328 @@ class ManuscriptManager:
             # First start the session
             session_id = manager.start_manuscript_save_session(request)
 
-            # Then save each chunk
-            await manager.save_manuscript_chunk(session_id, chunk_file)
+            # Then save each chunk, in any order when offsets are given
+            await manager.save_manuscript_chunk(session_id, second_chunk, 1048576)
+            await manager.save_manuscript_chunk(session_id, first_chunk, 0)
 
             # Finally complete the session
             await manager.finish_manuscript_save_session(session_id)
             ```
         """
-        if session_id not in self.sessions:
-            raise HTTPException(status_code=404, detail="Invalid session ID")
+        buffer_size = copy_buffer_size(
+            file.size, self.COPY_BUFFER_MIN, self.COPY_BUFFER_MAX
+        )
+
+        async def write(
+            upload_file: OpenUploadFile, start: int, limit: Optional[int]
+        ) -> int:
+            if limit is not None and file.size is not None and file.size > limit:
+                raise ValueError(f"More than {limit} bytes to write")
+            return await self.fs_executor.run(
+                copy_to_offset, file.file, upload_file.fd, start, buffer_size, limit
+            )
+
+        await self._write_chunk(session_id, offset, write)
+
+    async def save_manuscript_chunk_stream(
+        self,
+        session_id: str,
+        stream: AsyncIterator[bytes],
+        offset: Optional[int] = None,
+    ):
+        """
+        Saves a chunk received as a raw request body to the session temporary file.
+
+        Unlike save_manuscript_chunk(), the body is not parsed as multipart nor
+        spooled to an UploadFile first: the incoming pieces are buffered up to
+        COPY_BUFFER_MAX bytes and written straight to the open temporary file.
+
+        Args:
+            session_id (str): Session previously started with
+                start_manuscript_save_session()
+            stream (AsyncIterator[bytes]): Body of the request, e.g. request.stream()
+            offset (Optional[int]): Byte position of the chunk, appended when omitted
+
+        Raises:
+            HTTPException:
+                - 404: If the session_id doesn't exist in active sessions
+                - 416: If the chunk falls outside the declared total_size
+                - 500: If an I/O error occurs while writing to the temporary file
+        """
+
+        async def write(
+            upload_file: OpenUploadFile, start: int, limit: Optional[int]
+        ) -> int:
+            written = 0
+            pending = bytearray()
+            async for piece in stream:
+                pending += piece
+                if limit is not None and written + len(pending) > limit:
+                    raise ValueError(f"More than {limit} bytes to write")
+                if len(pending) >= self.COPY_BUFFER_MAX:
+                    await self.fs_executor.run(
+                        positional_write,
+                        upload_file.fd,
+                        bytes(pending),
+                        start + written,
+                    )
+                    written += len(pending)
+                    pending.clear()
+            if pending:
+                await self.fs_executor.run(
+                    positional_write, upload_file.fd, bytes(pending), start + written
+                )
+                written += len(pending)
+            return written
+
+        await self._write_chunk(session_id, offset, write)
 
-        temp_path = self.sessions[session_id]["temp_path"]
+    async def _write_chunk(
+        self,
+        session_id: str,
+        offset: Optional[int],
+        write: Callable[[OpenUploadFile, int, Optional[int]], Awaitable[int]],
+    ):
+        """
+        Runs `write` at the chunk position and records the received byte range.
+        Chunks without offset are appended one at a time.
+
+        `write` gets the number of bytes left before the declared total_size
+        and raises ValueError, before writing past it, when the chunk is larger.
+        """
+        session = await self._get_session(session_id)
+        total_size = session.get("total_size")
+
+        if offset is not None and (
+            offset < 0 or (total_size is not None and offset > total_size)
+        ):
+            raise HTTPException(
+                status_code=416, detail=f"Chunk offset out of range: {offset}"
+            )
+
+        await self.upload_files.close_idle(self.UPLOAD_IDLE_TIMEOUT)
 
         try:
-            # Leer el archivo recibido en chunks y escribir en el temporal
-            async with aiofiles.open(temp_path, "ab") as f:
-                while chunk := await file.read(1024 * 32):  # 32 KB por chunk
-                    await f.write(chunk)
+            async with self.upload_files.open(
+                session_id, session["temp_path"], total_size
+            ) as upload_file:
+                if offset is None:
+                    async with upload_file.append_lock:
+                        current = await self._open_session(session_id, upload_file)
+                        start = received_end(current["received"])
+                        written = await write(
+                            upload_file, start, _bytes_left(total_size, start)
+                        )
+                        await self._record_chunk(session_id, start, written)
+                else:
+                    await self._open_session(session_id, upload_file)
+                    written = await write(
+                        upload_file, offset, _bytes_left(total_size, offset)
+                    )
+                    await self._record_chunk(session_id, offset, written)
+        except ValueError:
+            raise HTTPException(
+                status_code=416,
+                detail=f"Chunk exceeds the declared file size of {total_size} bytes",
+            )
+        except KeyError:
+            # The session expired or finished while the chunk was written
+            raise HTTPException(status_code=404, detail="Invalid session ID")
         except OSError as e:
             raise HTTPException(
                 status_code=500, detail=f"Error writing to temporary file: {str(e)}"
             )
 
+    async def _open_session(self, session_id: str, upload_file: OpenUploadFile) -> dict:
+        """
+        The data of a session whose chunk got its file, checked again as the
+        session may have finished, expired or had its file closed meanwhile.
+
+        Raises:
+            KeyError: If the session is no longer open
+        """
+        session = await self.fs_executor.run(self.sessions.get, session_id)
+        if session is None:
+            # Closed once this chunk is done with it
+            await self.upload_files.close(session_id)
+        if session is None or upload_file.closing:
+            raise KeyError(session_id)
+        return session
+
+    async def _get_session(self, session_id: str) -> dict:
+        """
+        The data of an upload session, read from the session store in
+        fs_executor: a SQLite store may wait for the lock of another worker.
+
+        Raises:
+            HTTPException (404): If the session_id doesn't exist in active sessions
+        """
+        session = await self.fs_executor.run(self.sessions.get, session_id)
+        if session is None:
+            raise HTTPException(status_code=404, detail="Invalid session ID")
+        return session
+
+    async def _record_chunk(self, session_id: str, start: int, written: int):
+        """
+        Adds the written range to the session, as one atomic update of the
+        session store so chunks handled by other workers are not lost.
+        """
+
+        def record(session: dict):
+            total_size = session.get("total_size")
+            if total_size is not None and start + written > total_size:
+                raise HTTPException(
+                    status_code=416,
+                    detail=f"Chunk exceeds the declared file size of {total_size} bytes",
+                )
+            if written:
+                session["received"] = add_received_range(
+                    session["received"], start, start + written
+                )
+
+        await self.fs_executor.run(self.sessions.modify, session_id, record)
+
+    async def get_manuscript_save_status(self, session_id: str) -> dict:
+        """
+        Returns the progress of an upload session so a client can resume it.
+
+        Returns:
+            dict: A dictionary containing:
+                - session_id (str): The session identifier
+                - total_size (Optional[int]): Declared size of the final file
+                - received (list): Received [start, end) byte ranges
+                - missing (list): [start, end) byte ranges still to be sent
+
+        Raises:
+            HTTPException (404): If the session_id doesn't exist in active sessions
+        """
+        session = await self._get_session(session_id)
+
+        return {
+            "session_id": session_id,
+            "total_size": session.get("total_size"),
+            "received": session["received"],
+            "missing": missing_ranges(session["received"], session.get("total_size")),
+        }
+
+    async def cleanup_expired_sessions(self) -> dict:
+        """
+        Drops abandoned upload sessions and their temporary files.
+
+        Sessions without activity for SESSION_TTL seconds are removed from the
+        store, their open file is closed and their `.part` file deleted. Then
+        `.part` files of the staging directories that belong to no known
+        session (e.g. left by a crashed worker) are deleted once they are
+        older than SESSION_TTL.
+
+        Returns:
+            dict: A dictionary containing:
+                - expired_sessions (int): Number of sessions removed
+                - removed_files (int): Number of temporary files deleted
+        """
+        expired = await self.fs_executor.run(self.sessions.expire, self.SESSION_TTL)
+
+        removed_files = 0
+        for session_id, data in expired.items():
+            await self.upload_files.close(session_id)
+            if await self.fs_executor.run(_remove_file, data["temp_path"]):
+                removed_files += 1
+
+        for temp_dir in await self.fs_executor.run(self._staging_dirs):
+            removed_files += await self.fs_executor.run(
+                self._remove_orphaned_part_files, temp_dir
+            )
+
+        return {"expired_sessions": len(expired), "removed_files": removed_files}
+
+    async def run_session_cleanup(self):
+        """
+        Runs cleanup_expired_sessions(), closes the files of uploads idle for
+        more than UPLOAD_IDLE_TIMEOUT seconds, compacts the word count history
+        and collects the revision history every SESSION_CLEANUP_INTERVAL
+        seconds. Without it, an abandoned upload would keep its file open
+        until its session expires.
+        """
+        while True:
+            await self.cleanup_expired_sessions()
+            await self.upload_files.close_idle(self.UPLOAD_IDLE_TIMEOUT)
+            await self.fs_executor.run(self.word_history.compact)
+            await self.collect_history()
+            await asyncio.sleep(self.SESSION_CLEANUP_INTERVAL)
+
+    def _staging_dirs(self) -> list[str]:
+        try:
+            projects = self._project_ids()
+        except OSError:
+            projects = []
+        # Earlier versions staged uploads in the system temporary directory
+        return [
+            *(
+                os.path.join(self.UPLOAD_DIR, project, STAGING_DIRNAME)
+                for project in projects
+            ),
+            tempfile.gettempdir(),
+        ]
+
+    def _remove_orphaned_part_files(self, temp_dir: str) -> int:
+        deadline = time.time() - self.SESSION_TTL
+        removed = 0
+        try:
+            entries = list(os.scandir(temp_dir))
+        except OSError:
+            return 0
+
+        for entry in entries:
+            match = PART_FILE_PATTERN.search(entry.name)
+            if match is None or match.group(1) in self.sessions:
+                continue
+            try:
+                if not entry.is_file() or entry.stat().st_mtime >= deadline:
+                    continue
+            except OSError:
+                continue
+            if _remove_file(entry.path):
+                removed += 1
+        return removed
+
     @staticmethod
     async def _move_temp_file_to_final_destination(session_data: dict) -> str:
         """
-        Moves the temporary file to its final destination.
+        Moves the temporary file to its final destination with an atomic
+        rename (see commit_upload_file), durable according to FSYNC_POLICY.
 
         Returns:
             str: The final file path
         """
-        final_path = os.path.join(
-            session_data["project_path"],
-            session_data["relative_path"],
-            session_data["filename"],
+        return await ManuscriptManager.fs_executor.run(
+            ManuscriptManager._move_temp_file, session_data
         )
 
+    @staticmethod
+    def _move_temp_file(session_data: dict) -> str:
+        final_path = ManuscriptManager._final_path(session_data)
+
         """
         Creates the destination directory if it doesn't exist.
         """
         os.makedirs(str(os.path.dirname(final_path)), exist_ok=True)
 
         temp_path = session_data["temp_path"]
+        staged_path = temp_path
 
         try:
-            shutil.move(temp_path, str(final_path))
+            staged_path = ManuscriptManager._compress_staged_file(temp_path)
+            commit_upload_file(
+                staged_path, str(final_path), ManuscriptManager.FSYNC_POLICY
+            )
             return str(final_path)
         except OSError as e:
-            if os.path.exists(temp_path):
-                try:
-                    os.remove(temp_path)
-                except OSError:
-                    pass
+            for path in {temp_path, staged_path}:
+                if os.path.exists(path):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
 
             raise HTTPException(
                 status_code=500,
@@ -185,179 +693,814 @@ class ManuscriptManager:
             )
 
     @staticmethod
-    async def _update_file_metadata(session_data: dict, final_path: str) -> dict:
+    def _compress_staged_file(temp_path: str) -> str:
         """
-        Updates the metadata.json file with file information.
+        Compresses an uploaded file when COMPRESSION is on, with the codec
+        choose_codec() picks for its size. Files that don't get smaller, like
+        images or .docx archives, are stored as they are.
 
         Returns:
-            dict: Dictionary containing metadata and metadata_path
+            str: The staged file to commit, compressed or temp_path itself
         """
-
-        # Actualizar metadata en la carpeta específica donde se guardó el archivo
-        folder_path = os.path.join(
-            session_data["project_path"], session_data["relative_path"]
+        if not ManuscriptManager.COMPRESSION:
+            return temp_path
+        size = os.path.getsize(temp_path)
+        codec = choose_codec(
+            size,
+            ManuscriptManager.COMPRESSION_MIN_SIZE,
+            ManuscriptManager.ZSTD_MIN_SIZE,
         )
-        metadata_path = os.path.join(str(folder_path), "metadata.json")
-        metadata = {}
+        if codec is None:
+            return temp_path
 
-        if os.path.exists(metadata_path):
-            try:
-                async with aiofiles.open(metadata_path, "r") as f:
-                    content = await f.read()
-                    metadata = json.loads(content)
-            except (json.JSONDecodeError, OSError):
-                metadata = {}  # Si hay error leyendo, empezar con metadata vacío
-
-        dir_name = os.path.basename(session_data["relative_path"].rstrip("/")) or "root"
-
-        # update metadata times
-        metadata[dir_name] = {
-            "created_at": os.path.getctime(final_path),
-            "modified_at": os.path.getmtime(final_path),
+        # Keeps the .part suffix, so cleanup_expired_sessions() finds leftovers
+        head, tail = os.path.split(temp_path)
+        compressed_path = os.path.join(head, f"{codec}.{tail}")
+        try:
+            if compress_file(temp_path, compressed_path, codec) >= size:
+                os.remove(compressed_path)
+                return temp_path
+        except BaseException:
+            _remove_file(compressed_path)
+            raise
+        os.remove(temp_path)
+        return compressed_path
+
+    @staticmethod
+    def _file_metadata(entry: dict) -> dict:
+        return {
+            "created_at": entry["created_at"],
+            "modified_at": entry["modified_at"],
+            "size": entry["size"],
+            "content_hash": entry["content_hash"],
+            "word_count": entry["word_count"],
         }
 
-        try:
-            async with aiofiles.open(metadata_path, "w") as f:
-                await f.write(json.dumps(metadata, indent=2))
-        except OSError as e:
-            # If not able to write metadata...
-            print(f"Warning: Could not update metadata: {str(e)}")
+    def _index_file(self, project_id, path: str, full_path: str, rescan: bool) -> dict:
+        """
+        Records a stored file in the metadata index. Unless rescan is set, the
+        file is only read again when it changed since it was last indexed.
 
-        return {"metadata": metadata[dir_name], "metadata_path": metadata_path}
+        Word counts are cached by content hash: the words are only counted when
+        no indexed file has the same content, so reverting a file, copying it or
+        rescanning an unchanged tree costs a hash instead of a count.
+        """
+        stat = os.stat(full_path)
+        if not rescan and self.metadata_index.current_hash(project_id, path, stat):
+            return self.metadata_index.get(project_id, path)
+
+        content_hash = file_sha256(full_path)
+        word_count = self.metadata_index.cached_word_count(content_hash)
+        if word_count is None:
+            word_count = count_words(full_path)
+        size = stored_size(full_path)
+        stat = os.stat(full_path)
+        self.file_hashes.put(full_path, content_hash)
+        return self.metadata_index.record(
+            project_id, path, stat, content_hash, word_count, size
+        )
 
-    async def finish_manuscript_save_session(self, session_id: str):
+    def _set_content_sizes(self, project_id, project_path: str, scenes: list[dict]):
         """
-        Completes a manuscript file save session by finalizing the upload process.
+        Replaces the size on disk of the compressed scenes of a listing with
+        the size of their content. It comes from the metadata index when the
+        file did not change since it was indexed, the files missing from the
+        index are opened to read their header.
+        """
+        indexed = self.metadata_index.content_sizes(project_id)
+        for scene in scenes:
+            disk_size, modified_at, size = indexed.get(scene["path"], (None,) * 3)
+            if (disk_size, modified_at) == (scene["size"], scene["modified_at"]):
+                scene["size"] = size
+            elif scene["size"] >= COMPRESSED_HEADER.size:
+                try:
+                    scene["size"] = stored_size(
+                        os.path.join(project_path, scene["path"])
+                    )
+                except OSError:
+                    pass
 
-        This method moves the temporary file to its final destination, updates metadata,
-        and cleans up the session. It's the final step in the chunked file upload process
-        and ensures data integrity by handling file operations and metadata management.
+    def _list_chapters(self, project_id, project_path: str) -> list[dict]:
+        chapters = walk_chapters(project_path)
+        self._set_content_sizes(
+            project_id,
+            project_path,
+            [scene for chapter in chapters for scene in chapter["scenes"]],
+        )
+        return chapters
 
-        Args:
-            session_id (str): Unique session identifier previously created by
-                             start_manuscript_save_session()
+    def _index_file_content(self, project_id, path: str, full_path: str):
+        """Replaces the content of a stored file in the full-text index."""
+        try:
+            content = read_text(full_path)
+        except OSError:
+            content = None
+        self.full_text_index.update(project_id, path, content)
+
+    def _record_revision(
+        self, project_id, path: str, full_path: str, content_hash: str
+    ):
+        """Records the content of a stored file as a new revision in the history."""
+        with open_stored(full_path) as f:
+            content = f.read()
+        self.history.record(project_id, path, content, content_hash)
+
+    async def _update_file_metadata(self, session_data: dict, final_path: str) -> dict:
+        """
+        Records the saved file (size, timestamps, hash and word count) in the
+        metadata index. Only the row of this file is written, metadata.json is
+        generated on demand by get_directory_metadata().
 
         Returns:
-            dict: A dictionary containing:
-                - saved (str): Full path where the file was saved
-                - metadata (dict): File metadata with creation and modification times
-                - metadata_location (str): Path to the metadata.json file
+            dict: Dictionary containing metadata and metadata_path
+        """
+        path = index_path(session_data["relative_path"], session_data["filename"])
+        entry = await self.fs_executor.run(
+            self._index_file, session_data["project_id"], path, final_path, True
+        )
+        return {
+            "metadata": self._file_metadata(entry),
+            "metadata_path": self._metadata_path(session_data),
+        }
 
-        Raises:
-            HTTPException:
-                - 404: If the session_id doesn't exist in active sessions
-                - 500: If file move operation fails or other I/O errors occur
+    async def _read_file_metadata(self, session_data: dict, final_path: str) -> dict:
+        """
+        Reads the metadata of an already stored file, indexing it if it is missing
+        from the index or changed since it was indexed.
 
-        Process Flow:
-            1. Validates session existence
-            2. Constructs final file path
-            3. Ensures destination directory exists
-            4. Moves a temporary file to the final location
-            5. Updates/creates metadata.json file
-            6. Cleans up session data
-            7. Returns operation results
+        Returns:
+            dict: Dictionary containing metadata and metadata_path
+        """
+        path = index_path(session_data["relative_path"], session_data["filename"])
+        entry = await self.fs_executor.run(
+            self._index_file, session_data["project_id"], path, final_path, False
+        )
+        return {
+            "metadata": self._file_metadata(entry),
+            "metadata_path": self._metadata_path(session_data),
+        }
 
-        Metadata Structure:
-            ```JSON
-            {
-                "directory_name": {
-                    "created_at": 1640995200.0,
-                    "modified_at": 1640995200.0
-                }
-            }
-            ```
+    @staticmethod
+    def _metadata_path(session_data: dict) -> str:
+        folder_path = os.path.join(
+            session_data["project_path"], session_data["relative_path"]
+        )
+        return os.path.join(str(folder_path), "metadata.json")
 
-        Error Handling:
-            - Automatically cleans up temporary files on move failure
-            - Continues execution even if metadata writing fails (with warning)
-            - Uses shutil.move() to handle cross-device file moves
-            - Gracefully handles corrupted or missing metadata files
+    async def _stored_hash(self, session_data: dict, final_path: str) -> str:
+        """Hash of the stored file, from the metadata index when it is current."""
+        if "project_id" in session_data:
+            path = index_path(session_data["relative_path"], session_data["filename"])
 
-        Note:
-            - The session is automatically deleted after successful completion
-            - Metadata is stored per directory, not per file
-            - Uses system temporary directory for intermediate storage
-            - File timestamps are captured from the final file location
+            def indexed_hash() -> Optional[str]:
+                return self.metadata_index.current_hash(
+                    session_data["project_id"], path, os.stat(final_path)
+                )
 
-        Example:
-            ```python
-            # Complete the upload process
-            result = await manager.finish_manuscript_save_session(session_id)
+            stored_hash = await self.fs_executor.run(indexed_hash)
+            if stored_hash is not None:
+                return stored_hash
+        return await self.fs_executor.run(self.file_hashes.get, final_path)
 
-            # Result structure:
-            {
-                "saved": "/manuscripts/123/documents/chapter1.docx",
-                "metadata": {
-                    "created_at": 1640995200.0,
-                    "modified_at": 1640995200.0
-                },
-                "metadata_location": "/manuscripts/123/documents/metadata.json"
-            }
-            ```
+    async def _is_unchanged(self, session_data: dict, final_path: str) -> bool:
         """
+        Tells whether the uploaded content is identical to the stored file.
 
-        if session_id not in self.sessions:
-            raise HTTPException(status_code=404, detail="Invalid session ID")
+        A content_hash of session_data is compared directly with the stored
+        file hash, it is computed by the server or, for upload sessions,
+        checked against the upload by finish. Otherwise the temporary file is
+        only hashed when both files have the same size.
+        """
+        if not await self.fs_executor.run(os.path.isfile, final_path):
+            return False
 
-        data = self.sessions[session_id]
+        content_hash = session_data.get("content_hash")
+        if content_hash is None:
+            temp_path = session_data["temp_path"]
 
-        # persist temporary files and create a final path
-        final_path = await self._move_temp_file_to_final_destination(data)
+            def same_size() -> bool:
+                return os.path.isfile(temp_path) and os.path.getsize(
+                    temp_path
+                ) == stored_size(final_path)
 
-        # generate metadata associated with the folder name
-        metadata = await self._update_file_metadata(data, final_path)
-        del self.sessions[session_id]
+            if not await self.fs_executor.run(same_size):
+                return False
+            content_hash = await self.fs_executor.run(file_sha256, temp_path)
+
+        stored_hash = await self._stored_hash(session_data, final_path)
+        return stored_hash == content_hash.lower()
+
+    async def get_directory_metadata(self, project_id: int, relative_path: str) -> dict:
+        """
+        Generates the metadata.json document of a project directory from the index.
+
+        Files of the directory that are missing from the index, or changed
+        since they were indexed, are indexed first, and index rows of files
+        that no longer exist are dropped, so the document always matches the
+        directory contents.
+
+        Args:
+            project_id (int): The project identifier
+            relative_path (str): Directory relative to the project root
 
+        Returns:
+            dict: The legacy document, keyed by the directory name ("root" for
+                  the project root) with the times of the last saved file,
+                  plus a "files" mapping with the metadata of every file
+        """
+        directory = index_path(relative_path)
+        full_dir = os.path.join(self.UPLOAD_DIR, str(project_id), directory)
+        dir_name = os.path.basename(directory) if directory != "." else "root"
+
+        def refresh() -> list[dict]:
+            on_disk = set()
+            if os.path.isdir(full_dir):
+                for entry in os.scandir(full_dir):
+                    if entry.name.startswith(".") or entry.name == "metadata.json":
+                        continue
+                    if entry.is_file():
+                        on_disk.add(entry.name)
+                        self._index_file(
+                            project_id,
+                            index_path(directory, entry.name),
+                            entry.path,
+                            False,
+                        )
+            for indexed in self.metadata_index.directory_files(project_id, directory):
+                if indexed["name"] not in on_disk:
+                    self.metadata_index.remove(project_id, indexed["path"])
+            return self.metadata_index.directory_files(project_id, directory)
+
+        files = await self.fs_executor.run(refresh)
+        if not files:
+            return {}
+
+        latest = max(files, key=lambda entry: entry["modified_at"])
         return {
-            "saved": final_path,
-            "metadata": metadata["metadata"],
-            "metadata_location": metadata["metadata_path"],
+            dir_name: {
+                "created_at": latest["created_at"],
+                "modified_at": latest["modified_at"],
+            },
+            "files": {entry["name"]: self._file_metadata(entry) for entry in files},
         }
 
-    async def delete_path(self, project_id: int, path: str):
+    async def check_manuscript_unchanged(self, request: SaveCheckRequest) -> dict:
         """
-        Delete a file or directory from the project storage.
+        Checks, before uploading anything, whether a file already holds the content.
 
-        This method resolves the absolute path for a given `project_id` and `path`,
-        then attempts to remove it. Both files and directories are supported.
-        If the path points to a file, it is deleted with `os.remove`.
-        If it points to a directory, it is recursively removed with `shutil.rmtree`.
+        Lets the editor skip the whole start/chunk/finish sequence when an
+        autosave would write the same bytes again.
 
         Args:
-            project_id (int): Unique identifier of the project. Used to determine
-                the root directory of the project inside `ROOT_DIR`.
-            path (str): Relative path (from the project root) to the file or
-                directory to be deleted. Leading slashes (`/`) are stripped.
-                If an empty string or `/` is provided, it resolves to the project root.
+            request (SaveCheckRequest): Request object containing project_id,
+                relative_path, filename and the SHA-256 content_hash of the content
 
-        Raises:
-            HTTPException (404): If the given path does not exist within the project directory.
-            HTTPException (403): If the process lacks permissions to delete the specified file or directory.
-            HTTPException (500): If an unexpected `OSError` occurs during deletion.
+        Returns:
+            dict: {"unchanged": False} when the file is missing or differs.
+                  Otherwise the same result as finish_manuscript_save_session(),
+                  with "unchanged": True and the existing metadata.
+        """
+        target = self._save_target(
+            request.project_id, request.relative_path, request.filename
+        )
+        final_path = self._final_path(target)
 
-        Examples:
-            - await manager.delete_path(1, "docs/readme.md")
-            # Deletes the file "readme.md" inside project 1's docs folder.
+        if not await self._is_unchanged(
+            {**target, "content_hash": request.content_hash}, final_path
+        ):
+            return {"unchanged": False}
 
-            - await manager.delete_path(2, "temp/")
-            # Recursively deletes the "temp" directory inside project 2.
+        metadata = await self._read_file_metadata(target, final_path)
+        return {
+            "unchanged": True,
+            "saved": final_path,
+            "metadata": metadata["metadata"],
+            "metadata_location": metadata["metadata_path"],
+        }
 
-        Notes:
-            - Paths are resolved relative to the project's root directory.
-            - The method ensures that leading slashes in the provided path
-              are stripped to avoid absolute path resolution.
+    def _stage_patch(self, request: SavePatchRequest, target: dict) -> dict:
         """
+        Applies a patch to the stored file and stages the result like an upload.
 
-        project_path = os.path.join(self.UPLOAD_DIR, str(project_id))
-
-        # Make sure relative_path doesn't start with /
-        relative_path = path.lstrip("/")
-        if not relative_path:
-            relative_path = "."
+        base_hash is the SHA-256 of the stored bytes, or of the text read from
+        get_manuscript_file_content(), whose newlines are "\n". The patch then
+        applies to that text, and the result is written back with the
+        newlines of the stored file. content_hash is checked the same way.
 
-        full_dir = os.path.join(project_path, relative_path)
+        Returns:
+            dict: The save target with the temp_path and content_hash of the result
+        """
+        final_path = self._final_path(target)
+        try:
+            with open_stored(final_path) as f:
+                base = f.read()
+        except FileNotFoundError:
+            base = None
+        not_the_base = HTTPException(
+            status_code=409,
+            detail="The stored file is not the patch base, upload the full content",
+        )
+        if base is None:
+            raise not_the_base
 
+        base_hash = request.base_hash.lower()
+        raw_base = hashlib.sha256(base).hexdigest() == base_hash
         try:
+            text = base.decode("utf-8")
+        except UnicodeDecodeError:
+            if not raw_base:
+                raise not_the_base
+            raise HTTPException(
+                status_code=422,
+                detail=f"File is not a valid text file: {target['filename']}",
+            )
+        newline = None
+        if not raw_base:
+            normalized = normalize_newlines(text)
+            if (
+                normalized == text
+                or hashlib.sha256(normalized.encode("utf-8")).hexdigest() != base_hash
+            ):
+                raise not_the_base
+            newline = "\r\n" if "\r\n" in text else "\r"
+            text = normalized
+
+        try:
+            if request.diff is not None:
+                patched = apply_unified_diff(text, request.diff)
+            else:
+                patched = apply_operations(
+                    text, [op.model_dump(exclude_none=True) for op in request.ops]
+                )
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=f"Patch does not apply: {e}")
+
+        content_hashes = set()
+        if newline is not None:
+            patched = normalize_newlines(patched)
+            content_hashes.add(hashlib.sha256(patched.encode("utf-8")).hexdigest())
+            patched = patched.replace("\n", newline)
+        content = patched.encode("utf-8")
+        content_hash = hashlib.sha256(content).hexdigest()
+        content_hashes.add(content_hash)
+        if (
+            request.content_hash is not None
+            and request.content_hash.lower() not in content_hashes
+        ):
+            raise HTTPException(
+                status_code=422,
+                detail="The patched content does not match content_hash",
+            )
+
+        return self._stage_content(target, content, content_hash)
+
+    def _stage_content(self, target: dict, content: bytes, content_hash: str) -> dict:
+        """
+        Writes content to a temporary file of the project staging directory,
+        for _commit_staged_file().
+
+        Returns:
+            dict: The save target with the temp_path and content_hash
+        """
+        final_path = self._final_path(target)
+        self._ensure_directories(target["project_path"], os.path.dirname(final_path))
+        temp_path = os.path.join(
+            target["project_path"],
+            STAGING_DIRNAME,
+            f"{target['filename']}.{uuid.uuid4()}.part",
+        )
+        with open(temp_path, "wb") as f:
+            f.write(content)
+        return {**target, "temp_path": temp_path, "content_hash": content_hash}
+
+    async def _read_small_save(
+        self,
+        project_id: int,
+        path: str,
+        stream: AsyncIterator[bytes],
+        content_hash: Optional[str],
+    ) -> tuple[dict, bytes, str]:
+        """
+        Buffers the body of a single request save.
+
+        Returns:
+            tuple: The save target, the content and its SHA-256
+        """
+        relative_path, filename = os.path.split(path.lstrip("/"))
+        if not filename:
+            raise HTTPException(status_code=422, detail=f"Not a file path: {path}")
+        target = self._save_target(project_id, relative_path, filename)
+
+        content = bytearray()
+        async for piece in stream:
+            content += piece
+            if len(content) > self.SMALL_SAVE_MAX_SIZE:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"Files over {self.SMALL_SAVE_MAX_SIZE} bytes must be "
+                    "uploaded through /save/start",
+                )
+
+        digest = hashlib.sha256(content).hexdigest()
+        if content_hash is not None and digest != content_hash.lower():
+            raise HTTPException(
+                status_code=422, detail="The content does not match content_hash"
+            )
+        return target, bytes(content), digest
+
+    async def _save_content(self, target: dict, content: bytes, digest: str) -> dict:
+        try:
+            data = await self.fs_executor.run(
+                self._stage_content, target, content, digest
+            )
+        except OSError as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Error saving {target['filename']}: {e.strerror}",
+            )
+        return await self._commit_staged_file(data)
+
+    def _autosave_key(self, project_id: int, path: str) -> str:
+        """Key of a file, or of a directory of files, in the autosave queue."""
+        return os.path.normpath(
+            os.path.join(self.UPLOAD_DIR, str(project_id), path.lstrip("/"))
+        )
+
+    async def _flush_autosave(self, project_id: int, path: str):
+        """Writes the pending autosave of a file before it is read."""
+        await self.autosave.flush(self._autosave_key(project_id, path))
+
+    async def save_manuscript_file(
+        self,
+        project_id: int,
+        path: str,
+        stream: AsyncIterator[bytes],
+        content_hash: Optional[str] = None,
+    ) -> dict:
+        """
+        Saves a small file in a single request, instead of the
+        start/chunk/finish sequence: the body is buffered in memory, staged
+        and committed like finish_manuscript_save_session() does. A pending
+        autosave of the file is dropped, this content replaces it.
+
+        Args:
+            project_id (int): The project identifier
+            path (str): Path of the file relative to the project root
+            stream (AsyncIterator[bytes]): Body of the request, e.g. request.stream()
+            content_hash (Optional[str]): SHA-256 of the content, checked when given
+
+        Returns:
+            dict: The same result as finish_manuscript_save_session()
+
+        Raises:
+            HTTPException:
+                - 413: If the body is larger than SMALL_SAVE_MAX_SIZE, the
+                       file must be uploaded through /save/start
+                - 422: If the path has no file name or the content does not
+                       match content_hash
+                - 500: If the file can't be written
+        """
+        target, content, digest = await self._read_small_save(
+            project_id, path, stream, content_hash
+        )
+        await self.autosave.discard(self._autosave_key(project_id, path))
+        return await self._save_content(target, content, digest)
+
+    async def autosave_manuscript_file(
+        self,
+        project_id: int,
+        path: str,
+        stream: AsyncIterator[bytes],
+        content_hash: Optional[str] = None,
+    ) -> dict:
+        """
+        Queues a save of a small file in the autosave queue (see
+        AutosaveQueue): saves of the same file within autosave.delay seconds
+        are coalesced and only the latest content is written, like
+        save_manuscript_file() does. Reads of the file write it first.
+
+        Args:
+            project_id (int): The project identifier
+            path (str): Path of the file relative to the project root
+            stream (AsyncIterator[bytes]): Body of the request, e.g. request.stream()
+            content_hash (Optional[str]): SHA-256 of the content, checked when given
+
+        Returns:
+            dict: A dictionary containing:
+                - path (str): Path of the file relative to the project root
+                - content_hash (str): SHA-256 of the queued content
+                - size (int): Size of the queued content
+                - coalesced (int): Number of pending saves it replaced
+                - flush_in (float): Seconds before it is written
+
+        Raises:
+            HTTPException: The same errors as save_manuscript_file(), the
+                errors of the write itself are reported by
+                flush_manuscript_autosaves()
+        """
+        target, content, digest = await self._read_small_save(
+            project_id, path, stream, content_hash
+        )
+        status = self.autosave.submit(
+            self._autosave_key(project_id, path),
+            lambda: self._save_content(target, content, digest),
+        )
+        return {
+            "path": index_path(target["relative_path"], target["filename"]),
+            "content_hash": digest,
+            "size": len(content),
+            **status,
+        }
+
+    async def flush_manuscript_autosaves(
+        self, project_id: Optional[int] = None, path: str = ""
+    ) -> dict:
+        """
+        Writes the pending autosaves of a file or directory of a project, of
+        every project when project_id is None, and waits for them.
+
+        Returns:
+            dict: A dictionary containing:
+                - flushed (list): The results of the writes, as returned by
+                  finish_manuscript_save_session()
+                - failed (list): The path and error detail of the writes that
+                  failed, they stay pending
+        """
+        prefix = None if project_id is None else self._autosave_key(project_id, path)
+        flushed, failed = [], []
+        for key, result in await self.autosave.flush(prefix):
+            if isinstance(result, HTTPException):
+                failed.append({"saved": key, "detail": result.detail})
+            elif isinstance(result, BaseException):
+                failed.append({"saved": key, "detail": str(result)})
+            else:
+                flushed.append(result)
+        return {"flushed": flushed, "failed": failed}
+
+    async def patch_manuscript(self, request: SavePatchRequest) -> dict:
+        """
+        Saves an edit of a stored text file sent as a unified diff or as
+        operations (see apply_unified_diff() and apply_operations()), instead
+        of uploading the whole file through start/chunk/finish.
+
+        The patch only applies to the content whose SHA-256 is base_hash, the
+        stored bytes or the text returned by get_manuscript_file_content()
+        (see _stage_patch()). Patches of the same file are applied one at a
+        time, so of two patches made from the same base the second one is
+        refused.
+
+        Returns:
+            dict: The same result as finish_manuscript_save_session()
+
+        Raises:
+            HTTPException:
+                - 409: If the file is missing or its content is not the base,
+                       the client should upload the full content instead
+                - 422: If the patch does not apply, the file is not UTF-8
+                       text or the result does not match content_hash
+                - 500: If the file can't be read or written
+        """
+        target = self._save_target(
+            request.project_id, request.relative_path, request.filename
+        )
+        final_path = self._final_path(target)
+        # The patch is made from the content the client autosaved last
+        await self.autosave.flush(os.path.normpath(final_path))
+        # Keyed by the real path, so every spelling of the file shares its lock
+        real_path = await self.fs_executor.run(os.path.realpath, final_path)
+        lock = self.patch_locks.setdefault(real_path, asyncio.Lock())
+
+        async with lock:
+            try:
+                data = await self.fs_executor.run(self._stage_patch, request, target)
+            except OSError as e:
+                raise HTTPException(
+                    status_code=500,
+                    detail=f"Error patching {request.filename}: {e.strerror}",
+                )
+            return await self._commit_staged_file(data)
+
+    async def finish_manuscript_save_session(self, session_id: str):
+        """
+        Completes a manuscript file save session by finalizing the upload process.
+
+        This method moves the temporary file to its final destination, updates metadata,
+        and cleans up the session. It's the final step in the chunked file upload process
+        and ensures data integrity by handling file operations and metadata management.
+
+        Args:
+            session_id (str): Unique session identifier previously created by
+                             start_manuscript_save_session()
+
+        Returns:
+            dict: A dictionary containing:
+                - saved (str): Full path where the file was saved
+                - metadata (dict): File metadata with creation and modification
+                  times, size, content hash and word count
+                - metadata_location (str): Path of the directory metadata.json,
+                  generated on demand from the metadata index
+                - unchanged (bool): True when the stored file already had this
+                  content and nothing was written
+
+        Raises:
+            HTTPException:
+                - 404: If the session_id doesn't exist in active sessions
+                - 409: If some byte ranges of the file were not received yet.
+                       The session is kept so the missing chunks can be sent
+                - 422: If the uploaded content does not match the
+                       content_hash given at start
+                - 500: If file move operation fails or other I/O errors occur
+
+        Process Flow:
+            1. Validates session existence and upload completeness
+            2. Constructs final file path
+            3. Skips the write when the content matches the stored file
+               (see _is_unchanged), returning the existing metadata
+            4. Ensures destination directory exists
+            5. Moves a temporary file to the final location
+            6. Records the file in the metadata and full-text indexes, its
+               word count in the word count history and its content as a new
+               revision in the history (when HISTORY is on)
+            7. Cleans up session data
+            8. Returns operation results
+
+        Metadata Structure:
+            ```JSON
+            {
+                "created_at": 1640995200.0,
+                "modified_at": 1640995200.0,
+                "size": 2048,
+                "content_hash": "9f86d081884c7d65...",
+                "word_count": 351
+            }
+            ```
+
+        Error Handling:
+            - Automatically cleans up temporary files on move failure
+            - The file is staged on the same filesystem, so the move is an
+              atomic os.replace() whatever its size
+
+        Note:
+            - The session is automatically deleted after successful completion
+            - Metadata is stored per file in the metadata index, only the row
+              of the saved file is written
+            - Uses the project staging directory for intermediate storage
+            - File timestamps are captured from the final file location
+
+        Example:
+            ```python
+            # Complete the upload process
+            result = await manager.finish_manuscript_save_session(session_id)
+
+            # Result structure:
+            {
+                "saved": "/manuscripts/123/documents/chapter1.docx",
+                "metadata": {
+                    "created_at": 1640995200.0,
+                    "modified_at": 1640995200.0,
+                    "size": 2048,
+                    "content_hash": "9f86d081884c7d65...",
+                    "word_count": 351
+                },
+                "metadata_location": "/manuscripts/123/documents/metadata.json",
+                "unchanged": False
+            }
+            ```
+        """
+
+        data = await self._get_session(session_id)
+
+        missing = missing_ranges(data.get("received", []), data.get("total_size"))
+        if missing:
+            raise HTTPException(
+                status_code=409,
+                detail=f"Upload incomplete, missing byte ranges: {missing}",
+            )
+
+        await self.upload_files.close(session_id)
+        if data.get("total_size") is not None:
+            # Only the declared size is stored, whatever the temporary file holds
+            await self.fs_executor.run(
+                _truncate_file, data["temp_path"], data["total_size"]
+            )
+        await self.autosave.discard(os.path.normpath(self._final_path(data)))
+
+        if data.get("content_hash") is not None:
+            # A stale or wrong hash must not turn an edit into an unchanged save
+            try:
+                digest = await self.fs_executor.run(file_sha256, data["temp_path"])
+            except OSError as e:
+                raise HTTPException(
+                    status_code=500,
+                    detail=f"Error reading the uploaded file: {e.strerror}",
+                )
+            if digest != data["content_hash"].lower():
+                raise HTTPException(
+                    status_code=422,
+                    detail="The uploaded content does not match content_hash",
+                )
+            data = {**data, "content_hash": digest}
+
+        result = await self._commit_staged_file(data)
+        await self.fs_executor.run(self.sessions.pop, session_id, None)
+        return result
+
+    async def _commit_staged_file(self, data: dict) -> dict:
+        """
+        Stores the file staged at data["temp_path"] (see
+        finish_manuscript_save_session() for the steps and the result), unless
+        the stored file already has its content.
+        """
+        final_path = self._final_path(data)
+        if await self._is_unchanged(data, final_path):
+            # Same content already stored, drop the upload instead of rewriting
+            await self.fs_executor.run(_remove_file, data["temp_path"])
+            metadata = await self._read_file_metadata(data, final_path)
+
+            return {
+                "saved": final_path,
+                "metadata": metadata["metadata"],
+                "metadata_location": metadata["metadata_path"],
+                "unchanged": True,
+            }
+
+        # persist temporary files and create a final path
+        final_path = await self._move_temp_file_to_final_destination(data)
+
+        # generate metadata associated with the folder name
+        metadata = await self._update_file_metadata(data, final_path)
+        path = index_path(data["relative_path"], data["filename"])
+        await self.fs_executor.run(
+            self._index_file_content, data["project_id"], path, final_path
+        )
+        await self.fs_executor.run(
+            self.word_history.record,
+            data["project_id"],
+            path,
+            metadata["metadata"]["word_count"],
+        )
+        if self.HISTORY:
+            await self.fs_executor.run(
+                self._record_revision,
+                data["project_id"],
+                path,
+                final_path,
+                metadata["metadata"]["content_hash"],
+            )
+        await self.fs_executor.run(self.tree_cache.invalidate, data["project_path"])
+
+        return {
+            "saved": final_path,
+            "metadata": metadata["metadata"],
+            "metadata_location": metadata["metadata_path"],
+            "unchanged": False,
+        }
+
+    async def delete_path(self, project_id: int, path: str):
+        """
+        Delete a file or directory from the project storage.
+
+        This method resolves the absolute path for a given `project_id` and `path`,
+        then attempts to remove it. Both files and directories are supported.
+        If the path points to a file, it is deleted with `os.remove`.
+        If it points to a directory, it is recursively removed with `shutil.rmtree`.
+
+        Args:
+            project_id (int): Unique identifier of the project. Used to determine
+                the root directory of the project inside `ROOT_DIR`.
+            path (str): Relative path (from the project root) to the file or
+                directory to be deleted. Leading slashes (`/`) are stripped.
+                If an empty string or `/` is provided, it resolves to the project root.
+
+        Raises:
+            HTTPException (404): If the given path does not exist within the project directory.
+            HTTPException (403): If the process lacks permissions to delete the specified file or directory.
+            HTTPException (500): If an unexpected `OSError` occurs during deletion.
+
+        Examples:
+            - await manager.delete_path(1, "docs/readme.md")
+            # Deletes the file "readme.md" inside project 1's docs folder.
+
+            - await manager.delete_path(2, "temp/")
+            # Recursively deletes the "temp" directory inside project 2.
+
+        Notes:
+            - Paths are resolved relative to the project's root directory.
+            - The method ensures that leading slashes in the provided path
+              are stripped to avoid absolute path resolution.
+        """
+
+        project_path = os.path.join(self.UPLOAD_DIR, str(project_id))
+
+        # Make sure relative_path doesn't start with /
+        relative_path = path.lstrip("/")
+        if not relative_path:
+            relative_path = "."
+
+        full_dir = os.path.join(project_path, relative_path)
+        await self.autosave.discard(os.path.normpath(full_dir))
+
+        def delete():
             if os.path.isfile(full_dir):
                 os.remove(full_dir)
             elif os.path.isdir(full_dir):
@@ -366,6 +1509,14 @@ class ManuscriptManager:
                 raise HTTPException(
                     status_code=404, detail=f"File or Path not found: {path}"
                 )
+            self.metadata_index.remove(project_id, index_path(relative_path))
+            self.full_text_index.remove(project_id, index_path(relative_path))
+            self.word_history.record_removed(project_id, index_path(relative_path))
+            self.tree_cache.invalidate(project_path)
+
+        try:
+            # rmtree of a large directory takes a while, keep it off the loop
+            await self.fs_executor.run(delete)
         except PermissionError:
             raise HTTPException(
                 status_code=403, detail=f"Insufficient permission to delete: {path}"
@@ -411,7 +1562,12 @@ class ManuscriptManager:
             - The method ensures that leading slashes in the provided path
               are stripped to avoid absolute path resolution.
             - Only works with text files - binary files will raise an encoding error.
-            - Uses async file operations with aiofiles for better performance.
+            - A metadata.json path returns the document generated by
+              get_directory_metadata(), for clients of the old metadata files.
+            - The file is read in fs_executor, decompressed when it is stored
+              compressed (see COMPRESSION).
+            - A pending autosave of the file is written first (see
+              autosave_manuscript_file()).
         """
 
         project_path = os.path.join(self.UPLOAD_DIR, str(project_id))
@@ -423,21 +1579,188 @@ class ManuscriptManager:
 
         full_path = os.path.join(project_path, relative_path)
 
+        if os.path.basename(relative_path) == "metadata.json":
+            # metadata.json is no longer stored, it is generated from the index
+            metadata = await self.get_directory_metadata(
+                project_id, os.path.dirname(relative_path)
+            )
+            return json.dumps(metadata, indent=2)
+
+        await self._flush_autosave(project_id, relative_path)
         try:
             # Check if path exists and is a file
-            if not os.path.exists(full_path):
+            path_type = await self.fs_executor.run(_path_type, full_path)
+            if path_type is None:
                 raise HTTPException(status_code=404, detail=f"File not found: {path}")
 
-            if not os.path.isfile(full_path):
+            if path_type != "file":
                 raise HTTPException(
                     status_code=404, detail=f"Path is not a file: {path}"
                 )
 
-            # Read file content asynchronously
-            async with aiofiles.open(full_path, "r", encoding="utf-8") as f:
-                content = await f.read()
-                return content
+            # Compressed files are decompressed while reading
+            return await self.fs_executor.run(read_stored_text, full_path)
+
+        except PermissionError:
+            raise HTTPException(
+                status_code=403, detail=f"Insufficient permission to read: {path}"
+            )
+        except UnicodeDecodeError:
+            raise HTTPException(
+                status_code=500, detail=f"File is not a valid text file: {path}"
+            )
+        except OSError as e:
+            raise HTTPException(
+                status_code=500, detail=f"Error reading file {path}: {e.strerror}"
+            )
+
+    async def get_manuscript_file_path(self, project_id: int, path: str) -> str:
+        """
+        Resolves a stored file of the project, for routes that stream it.
+
+        Raises:
+            HTTPException (404): If the path does not exist or is not a file
+        """
+        relative_path = path.lstrip("/") or "."
+        full_path = os.path.join(self.UPLOAD_DIR, str(project_id), relative_path)
+        await self._flush_autosave(project_id, relative_path)
+
+        path_type = await self.fs_executor.run(_path_type, full_path)
+        if path_type is None:
+            raise HTTPException(status_code=404, detail=f"File not found: {path}")
+        if path_type != "file":
+            raise HTTPException(status_code=404, detail=f"Path is not a file: {path}")
+        return full_path
+
+    async def stream_compressed_file(
+        self, full_path: str
+    ) -> Optional[
+        tuple[int, os.stat_result, Callable[[int, Optional[int]], AsyncIterator[bytes]]]
+    ]:
+        """
+        Decompressed content of a stored file, for routes that stream files.
+
+        Returns:
+            tuple: The size of the content, the stat result of the stored file
+                   and a function returning an iterator of the blocks of the
+                   content from start to end (excluded, the end of the content
+                   when None), or None when the file is not compressed and can
+                   be served as is. Decompression can only start at the
+                   beginning of the file, so a block from start has to
+                   decompress the content before it too.
+        """
+
+        def stored() -> tuple[Optional[tuple[str, int]], os.stat_result]:
+            return stored_header(full_path), os.stat(full_path)
+
+        header, stat = await self.fs_executor.run(stored)
+        if header is None:
+            return None
+        size = header[1]
+
+        async def blocks(start: int = 0, end: Optional[int] = None):
+            remaining = (size if end is None else end) - start
+            stored = await self.fs_executor.run(open_stored, full_path)
+            try:
+                await self.fs_executor.run(stored.seek, start)
+                while remaining > 0 and (
+                    block := await self.fs_executor.run(
+                        stored.read, min(self.COPY_BUFFER_MAX, remaining)
+                    )
+                ):
+                    remaining -= len(block)
+                    yield block
+            finally:
+                await self.fs_executor.run(stored.close)
+
+        return size, stat, blocks
+
+    async def get_manuscript_file_page(
+        self,
+        project_id: int,
+        path: str,
+        offset: Optional[int] = None,
+        length: int = 64 * 1024,
+        line: Optional[int] = None,
+        lines: int = 200,
+    ) -> dict:
+        """
+        Reads one window of a text file, so long manuscripts can be loaded lazily.
+
+        The window is either `length` bytes from the byte `offset`, or `lines`
+        lines from the 0-based `line` when a line is given. Only the window is
+        read and decoded, unlike get_manuscript_file_content(). Files stored
+        compressed (see COMPRESSION) are decompressed from their start up to
+        the window, each page costs more than the previous one.
+
+        Args:
+            project_id (int): Unique identifier of the project
+            path (str): Path of the file relative to the project root
+            offset (Optional[int]): Byte offset of the window, 0 by default.
+                Offsets inside a character are moved to the next character
+            length (int): Approximate size of a byte window
+            line (Optional[int]): First line of a line window
+            lines (int): Number of lines of a line window
+
+        Returns:
+            dict: A dictionary containing:
+                - path (str): The requested path
+                - size (int): Content size in bytes, before compression
+                - offset (int): Byte offset where the content starts
+                - next_offset (int): Byte offset to request the next window
+                - line / next_line (int): Line numbers, for line windows only
+                - eof (bool): True when the window reaches the end of the file
+                - content (str): The text of the window
+
+        Raises:
+            HTTPException (404): If the path does not exist or is not a file
+            HTTPException (403): If the file can't be read
+            HTTPException (416): If the offset is past the end of the file
+            HTTPException (500): If the window is not valid UTF-8 or on OSError
+        """
+        full_path = await self.get_manuscript_file_path(project_id, path)
+        try:
+            if line is not None:
+                page = await self.fs_executor.run(
+                    read_line_window, full_path, line, lines
+                )
+            else:
+                page = await self.fs_executor.run(
+                    read_byte_window, full_path, offset or 0, length
+                )
+        except UnicodeDecodeError:
+            raise HTTPException(
+                status_code=500, detail=f"File is not a valid text file: {path}"
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=416, detail=str(e))
+        except PermissionError:
+            raise HTTPException(
+                status_code=403, detail=f"Insufficient permission to read: {path}"
+            )
+        except OSError as e:
+            raise HTTPException(
+                status_code=500, detail=f"Error reading file {path}: {e.strerror}"
+            )
+        return {"path": path, **page}
+
+    async def _read_manuscript_text(self, project_id: int, path: str) -> str:
+        """
+        Reads a text file of the project in a single worker thread call, with
+        the same errors as get_manuscript_file_content().
+        """
+        relative_path = path.lstrip("/") or "."
+        if os.path.basename(relative_path) == "metadata.json":
+            return await self.get_manuscript_file_content(project_id, path)
 
+        full_path = os.path.join(self.UPLOAD_DIR, str(project_id), relative_path)
+        await self._flush_autosave(project_id, relative_path)
+        try:
+            return await self.fs_executor.run(read_stored_text, full_path)
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail=f"File not found: {path}")
+        except IsADirectoryError:
+            raise HTTPException(status_code=404, detail=f"Path is not a file: {path}")
         except PermissionError:
             raise HTTPException(
                 status_code=403, detail=f"Insufficient permission to read: {path}"
@@ -451,71 +1774,700 @@ class ManuscriptManager:
                 status_code=500, detail=f"Error reading file {path}: {e.strerror}"
             )
 
+    async def resolve_manuscript_content_paths(
+        self,
+        project_id: int,
+        paths: Optional[list[str]] = None,
+        directory: Optional[str] = None,
+    ) -> list[str]:
+        """
+        Returns the files to read for a bulk content request: the given paths,
+        or every scene of a chapter directory in the order of the listing.
+
+        Args:
+            project_id (int): Unique identifier of the project
+            paths (Optional[list[str]]): Paths relative to the project root
+            directory (Optional[str]): Chapter directory, used when paths is None
+
+        Raises:
+            HTTPException (404): If the directory doesn't exist
+            HTTPException (403): If the directory can't be read
+            HTTPException (500): If an unexpected OSError occurs
+        """
+        if paths is not None:
+            return paths
+
+        relative_path = directory.strip("/")
+        full_dir = os.path.join(self.UPLOAD_DIR, str(project_id), relative_path or ".")
+        try:
+            scenes = await self.fs_executor.run(list_scenes, full_dir, relative_path)
+        except (FileNotFoundError, NotADirectoryError):
+            raise HTTPException(
+                status_code=404, detail=f"Directory not found: {directory}"
+            )
+        except PermissionError:
+            raise HTTPException(
+                status_code=403, detail=f"Insufficient permission to read: {directory}"
+            )
+        except OSError as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Error reading directory {directory}: {e.strerror}",
+            )
+        return [scene["path"] for scene in scenes]
+
+    async def stream_manuscript_contents(
+        self, project_id: int, paths: list[str]
+    ) -> AsyncIterator[dict]:
+        """
+        Reads many manuscript files concurrently and yields their contents in
+        the order of `paths`.
+
+        At most BULK_READ_CONCURRENCY files are read (and held in memory) ahead
+        of the consumer, so a slow client does not make the whole chapter pile
+        up in memory. A file that cannot be read yields an error entry instead
+        of failing the whole batch.
+
+        Args:
+            project_id (int): Unique identifier of the project
+            paths (list[str]): Paths relative to the project root
+
+        Yields:
+            dict: {"path": ..., "content": ...} for every readable file, or
+                  {"path": ..., "error": {"status_code": ..., "detail": ...}}
+                  with the error get_manuscript_file_content() would raise
+        """
+
+        async def read(path: str) -> dict:
+            try:
+                content = await self._read_manuscript_text(project_id, path)
+                return {"path": path, "content": content}
+            except HTTPException as e:
+                return {
+                    "path": path,
+                    "error": {"status_code": e.status_code, "detail": e.detail},
+                }
+
+        remaining = iter(paths)
+        pending = deque(
+            asyncio.create_task(read(path))
+            for path in islice(remaining, self.BULK_READ_CONCURRENCY)
+        )
+        try:
+            while pending:
+                result = await pending.popleft()
+                next_path = next(remaining, None)
+                if next_path is not None:
+                    pending.append(asyncio.create_task(read(next_path)))
+                yield result
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def search_manuscripts(
+        self,
+        project_id: int,
+        query: str,
+        regex: bool = False,
+        case_sensitive: bool = False,
+        limit: int = 200,
+    ) -> AsyncIterator[dict]:
+        """
+        Starts a full-text search over every scene of the project.
+
+        The query and the project are validated before anything is searched,
+        then each file is memory mapped and searched in the search_executor
+        thread pool, so the event loop is never blocked. Matches of a file are
+        yielded as soon as that file is searched, in no particular file order.
+
+        Args:
+            project_id (int): Unique identifier of the project
+            query (str): Text to find, or a regular expression if regex is set
+            regex (bool): Interpret the query as a regular expression
+            case_sensitive (bool): Match letter case. Case folding only applies
+                to ASCII letters
+            limit (int): Maximum number of matches
+
+        Returns:
+            AsyncIterator[dict]: Matches, each with:
+                - path (str): File path relative to the project root
+                - line (int): 1-based line of the match
+                - match (str): The matched text
+                - snippet (str): The line around the match
+
+        Raises:
+            HTTPException (422): If the regular expression is invalid
+            HTTPException: Same errors as list_directory_contents()
+        """
+        try:
+            pattern = compile_search_pattern(query, regex, case_sensitive)
+        except re.error as e:
+            raise HTTPException(
+                status_code=422, detail=f"Invalid regular expression: {e}"
+            )
+
+        listing = await self.list_directory_contents(project_id)
+        project_path = os.path.join(self.UPLOAD_DIR, str(project_id))
+        paths = [
+            scene["path"]
+            for chapter in listing["chapters"]
+            for scene in chapter["scenes"]
+        ]
+        return self._search_results(project_path, paths, pattern, limit)
+
+    async def _search_results(
+        self, project_path: str, paths: list[str], pattern: re.Pattern, limit: int
+    ) -> AsyncIterator[dict]:
+        loop = asyncio.get_running_loop()
+
+        async def search(path: str) -> tuple[str, list]:
+            full_path = os.path.join(project_path, path)
+            try:
+                matches = await loop.run_in_executor(
+                    self.search_executor, search_file, full_path, pattern, limit
+                )
+            except OSError:
+                # Deleted or unreadable since it was listed
+                matches = []
+            return path, matches
+
+        tasks = [asyncio.create_task(search(path)) for path in paths]
+        found = 0
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                path, matches = await next_done
+                for match in matches:
+                    yield {"path": path, **match}
+                    found += 1
+                    if found >= limit:
+                        return
+        finally:
+            # Files not searched yet are dropped from the pool queue
+            for task in tasks:
+                task.cancel()
+
+    async def search_manuscript_index(
+        self, project_id: int, query: str, prefix: bool = True, limit: int = 50
+    ) -> list[dict]:
+        """
+        Ranked search over the full-text index of a project.
+
+        Every word of the query must appear in a file for it to match, words
+        match as prefixes unless prefix is False. Files are ranked by bm25, so
+        files where the words are frequent and the text is short come first.
+
+        Args:
+            project_id (int): Unique identifier of the project
+            query (str): Words to find, punctuation is ignored
+            prefix (bool): Match words starting with the query words
+            limit (int): Maximum number of files
+
+        Returns:
+            list: Best matches first, each with:
+                - path (str): File path relative to the project root
+                - rank (float): bm25 score, lower is better
+                - snippet (str): Text around the matches, highlighted with
+                  <mark> and </mark>
+
+        Raises:
+            HTTPException (422): If the query has no words
+        """
+        match = fts_query(query, prefix)
+        if not match:
+            raise HTTPException(status_code=422, detail="Search query has no words")
+        return await self.fs_executor.run(
+            self.full_text_index.search, project_id, match, limit
+        )
+
+    def _sync_project_index(self, project_id, rescan: bool) -> list[dict]:
+        """
+        Indexes every file of a project (see _index_file) and drops the rows
+        of files that are gone.
+
+        Raises:
+            OSError: If the project directory cannot be read
+        """
+        project_path = os.path.join(self.UPLOAD_DIR, str(project_id))
+        entries = []
+        for scene in walk_files(project_path):
+            full_path = os.path.join(project_path, scene["path"])
+            try:
+                entries.append(
+                    self._index_file(project_id, scene["path"], full_path, rescan)
+                )
+            except OSError:
+                # Removed while indexing
+                continue
+
+        gone = self.metadata_index.project_paths(project_id) - {
+            entry["path"] for entry in entries
+        }
+        self.metadata_index.forget(project_id, gone)
+        return entries
+
+    def _reindex_project(self, project_id: str) -> int:
+        entries = self._sync_project_index(project_id, True)
+        project_path = os.path.join(self.UPLOAD_DIR, project_id)
+        self.full_text_index.remove(project_id, ".")
+        for entry in entries:
+            full_path = os.path.join(project_path, entry["path"])
+            self._index_file_content(project_id, entry["path"], full_path)
+        return len(entries)
+
+    def _project_ids(self) -> list[str]:
+        with os.scandir(self.UPLOAD_DIR) as entries:
+            return sorted(
+                entry.name
+                for entry in entries
+                if entry.is_dir() and not entry.name.startswith(".")
+            )
+
+    async def reindex_manuscripts(self, project_id: Optional[int] = None) -> dict:
+        """
+        Rebuilds the metadata and full-text indexes of a project, or of every
+        project when project_id is None, from the files on disk. Used for trees
+        written before the indexes existed or changed outside the manager.
+
+        Returns:
+            dict: Number of files indexed per project id
+
+        Raises:
+            HTTPException (404): If the project directory does not exist
+        """
+        indexed = {}
+        for project in await self._resolve_projects(project_id):
+            indexed[project] = await self.fs_executor.run(
+                self._reindex_project, project
+            )
+        return indexed
+
+    async def _resolve_projects(self, project_id: Optional[int]) -> list[str]:
+        """The given project, or every project when project_id is None."""
+        if project_id is None:
+            return await self.fs_executor.run(self._project_ids)
+
+        project_path = os.path.join(self.UPLOAD_DIR, str(project_id))
+        if await self.fs_executor.run(_path_type, project_path) != "directory":
+            raise HTTPException(
+                status_code=404, detail=f"Project {project_id} not found"
+            )
+        return [str(project_id)]
+
+    def _recompress_file(
+        self, full_path: str, staging_dir: str, decompress: bool
+    ) -> Optional[int]:
+        """
+        Rewrites a stored file compressed, or decompressed, keeping its
+        modification time, with the same atomic replace as a save.
+
+        Returns:
+            int: The new size of the file, None when it was left as it is
+        """
+        stat = os.stat(full_path)
+        compressed = stored_header(full_path) is not None
+        temp_path = os.path.join(staging_dir, f"migrate.{uuid.uuid4()}.part")
+        try:
+            if decompress:
+                if not compressed:
+                    return None
+                size = decompress_file(full_path, temp_path)
+            else:
+                codec = (
+                    None
+                    if compressed
+                    else choose_codec(
+                        stat.st_size, self.COMPRESSION_MIN_SIZE, self.ZSTD_MIN_SIZE
+                    )
+                )
+                if codec is None:
+                    return None
+                size = compress_file(full_path, temp_path, codec)
+                if size >= stat.st_size:
+                    _remove_file(temp_path)
+                    return None
+            current = os.stat(full_path)
+            if (current.st_size, current.st_mtime_ns) != (
+                stat.st_size,
+                stat.st_mtime_ns,
+            ):
+                # Saved meanwhile, the new content wins
+                _remove_file(temp_path)
+                return None
+            os.utime(temp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+            commit_upload_file(temp_path, full_path, self.FSYNC_POLICY)
+        except BaseException:
+            _remove_file(temp_path)
+            raise
+        return size
+
+    def _compress_project(self, project_id: str, decompress: bool) -> dict:
+        project_path = os.path.join(self.UPLOAD_DIR, project_id)
+        staging_dir = os.path.join(project_path, STAGING_DIRNAME)
+        os.makedirs(staging_dir, exist_ok=True)
+
+        totals = {"files": 0, "rewritten": 0, "size_before": 0, "size_after": 0}
+        for scene in walk_files(project_path):
+            full_path = os.path.join(project_path, scene["path"])
+            try:
+                size_before = os.path.getsize(full_path)
+                size_after = self._recompress_file(full_path, staging_dir, decompress)
+                if size_after is not None:
+                    # Same content, only the size in the index changes
+                    self._index_file(project_id, scene["path"], full_path, False)
+            except OSError:
+                # Removed while migrating
+                continue
+            totals["files"] += 1
+            totals["size_before"] += size_before
+            if size_after is None:
+                totals["size_after"] += size_before
+            else:
+                totals["rewritten"] += 1
+                totals["size_after"] += size_after
+
+        if totals["rewritten"]:
+            self.tree_cache.invalidate(project_path)
+        return totals
+
+    async def compress_manuscripts(
+        self, project_id: Optional[int] = None, decompress: bool = False
+    ) -> dict:
+        """
+        Compresses the stored files of a project, or of every project when
+        project_id is None, like saves do when COMPRESSION is on. Used to
+        migrate trees written before compression was enabled, or to go back
+        to plain files with decompress set.
+
+        Files are replaced one at a time and a file saved while it was being
+        migrated is left as it is, but the check is not atomic, so the
+        migration is best run while the server is stopped.
+
+        Returns:
+            dict: Per project id, the number of files, of files rewritten and
+                  the total size before and after
+        """
+        migrated = {}
+        for project in await self._resolve_projects(project_id):
+            migrated[project] = await self.fs_executor.run(
+                self._compress_project, project, decompress
+            )
+        return migrated
+
+    async def get_word_stats(self, project_id: int) -> dict:
+        """
+        Word counts of a project, computed by the server from its files.
+
+        Counts come from the metadata index, which every save updates for the
+        saved file only. Files changed outside the manager are found by their
+        size and modification time and are the only ones counted again, so the
+        stats of a long novel cost one stat() per file.
+
+        Returns:
+            dict: Containing:
+                - words (int): Words of the whole project
+                - chapters (list): One {path, words, files} dict per chapter
+                  (top level directory) with files, sorted by path. Files at
+                  the project root only count towards the project total
+
+        Raises:
+            HTTPException (403): If the project directory cannot be read
+            HTTPException (500): If an unexpected OSError occurs
+        """
+        try:
+            entries = await self.fs_executor.run(
+                self._sync_project_index, project_id, False
+            )
+        except FileNotFoundError:
+            # No manuscript saved yet
+            entries = []
+        except PermissionError:
+            raise HTTPException(
+                status_code=403,
+                detail=f"Insufficient permission to read project directory: {project_id}",
+            )
+        except OSError as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Error reading project directory {project_id}: {e.strerror}",
+            )
+
+        chapters: dict[str, dict] = {}
+        for entry in entries:
+            chapter, separator, _ = entry["path"].partition("/")
+            if not separator:
+                continue
+            stats = chapters.setdefault(
+                chapter, {"path": chapter, "words": 0, "files": 0}
+            )
+            stats["words"] += entry["word_count"]
+            stats["files"] += 1
+
+        return {
+            "words": sum(entry["word_count"] for entry in entries),
+            "chapters": [chapters[path] for path in sorted(chapters)],
+        }
+
+    async def get_word_history(
+        self,
+        project_id: int,
+        start: float,
+        end: float,
+        resolution: str = "day",
+        path: Optional[str] = None,
+    ) -> dict:
+        """
+        Word count history of a project, or of one of its files, for progress
+        charts. Only files saved through the manager are recorded.
+
+        Args:
+            project_id (int): Unique identifier of the project
+            start (float): Start of the range, Unix time
+            end (float): End of the range, Unix time
+            resolution (str): "minute", "hour" or "day" (UTC days)
+            path (str): File path relative to the project root, the whole
+                project when None
+
+        Returns:
+            dict: Containing:
+                - resolution (str): The requested resolution
+                - baseline (int): Words before start
+                - points (list): {time, words} at the end of every bucket where
+                  the count changed, time being the bucket start
+
+        Raises:
+            HTTPException (422): If the resolution is unknown or end is before start
+        """
+        if resolution not in RESOLUTIONS:
+            raise HTTPException(
+                status_code=422,
+                detail=f"Unknown resolution {resolution}, use one of {', '.join(RESOLUTIONS)}",
+            )
+        if end < start:
+            raise HTTPException(
+                status_code=422, detail="The end of the range is before its start"
+            )
+
+        series = await self.fs_executor.run(
+            self.word_history.series,
+            project_id,
+            start,
+            end,
+            RESOLUTIONS[resolution],
+            None if path is None else index_path(path),
+        )
+        return {"resolution": resolution, **series}
+
+    async def list_manuscript_revisions(self, project_id: int, path: str) -> list[dict]:
+        """
+        The saved revisions of a file, newest first, deleted files included.
+
+        Returns:
+            list: One {id, path, content_hash, size, created_at} dict per revision
+        """
+        return await self.fs_executor.run(
+            self.history.revisions, project_id, index_path(path)
+        )
+
+    def _read_revision(self, project_id: int, revision_id: int) -> tuple[dict, str]:
+        revision = self.history.get(project_id, revision_id)
+        content = self.history.read(project_id, revision_id)
+        if revision is None or content is None:
+            raise HTTPException(
+                status_code=404, detail=f"Revision not found: {revision_id}"
+            )
+        try:
+            # The same text as read_stored_text(), so revisions compare with
+            # the current file and match what /content returns
+            return revision, normalize_newlines(content.decode("utf-8"))
+        except UnicodeDecodeError:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Revision {revision_id} is not a valid text file",
+            )
+
+    async def get_manuscript_revision(self, project_id: int, revision_id: int) -> dict:
+        """
+        A saved revision of a file with its text content, with "\n" newlines
+        like get_manuscript_file_content().
+
+        Returns:
+            dict: The revision (see list_manuscript_revisions()) and its content
+
+        Raises:
+            HTTPException (404): If the project has no such revision
+            HTTPException (500): If the revision is not text or can't be read
+        """
+        try:
+            revision, content = await self.fs_executor.run(
+                self._read_revision, project_id, revision_id
+            )
+        except OSError as e:
+            raise HTTPException(
+                status_code=500, detail=f"Error reading revision {revision_id}: {e}"
+            )
+        return {**revision, "content": content}
+
+    async def diff_manuscript_revision(
+        self, project_id: int, revision_id: int, against: Optional[int] = None
+    ) -> dict:
+        """
+        Unified diff from a revision to another revision of the project, or to
+        the current content of the file when against is None. A deleted file
+        compares as empty.
+
+        Returns:
+            dict: Containing path, from and to (revision ids, to is None for
+                  the current file) and the diff text, empty when they match
+
+        Raises:
+            HTTPException (404): If a revision does not exist
+            HTTPException (500): If a revision or the file is not text
+        """
+
+        def diff() -> dict:
+            revision, old = self._read_revision(project_id, revision_id)
+            if against is None:
+                full_path = os.path.join(
+                    self.UPLOAD_DIR, str(project_id), revision["path"]
+                )
+                try:
+                    new = read_stored_text(full_path)
+                except FileNotFoundError:
+                    new = ""
+                except UnicodeDecodeError:
+                    raise HTTPException(
+                        status_code=500,
+                        detail=f"File is not a valid text file: {revision['path']}",
+                    )
+                to_name = revision["path"]
+            else:
+                target, new = self._read_revision(project_id, against)
+                to_name = f"{target['path']}@{against}"
+
+            lines = difflib.unified_diff(
+                old.splitlines(keepends=True),
+                new.splitlines(keepends=True),
+                fromfile=f"{revision['path']}@{revision_id}",
+                tofile=to_name,
+            )
+            return {
+                "path": revision["path"],
+                "from": revision_id,
+                "to": against,
+                "diff": "".join(lines),
+            }
+
+        try:
+            return await self.fs_executor.run(diff)
+        except OSError as e:
+            raise HTTPException(
+                status_code=500, detail=f"Error reading revision {revision_id}: {e}"
+            )
+
+    async def collect_history(self) -> dict:
+        """
+        Applies the retention policy of the revision history (see
+        ManuscriptHistory.prune()) and deletes the chunks left unused.
+
+        Returns:
+            dict: Number of revisions and of chunks removed
+        """
+        revisions = await self.fs_executor.run(
+            self.history.prune, self.HISTORY_KEEP, self.HISTORY_MAX_AGE
+        )
+        chunks = await self.fs_executor.run(self.history.collect_garbage)
+        return {"revisions": revisions, "chunks": chunks}
+
+    async def get_directory_listing(self, project_id: int) -> tuple[dict, str]:
+        """
+        Returns the listing of list_directory_contents() and its ETag, from the
+        tree cache when the project did not change since it was last listed.
+
+        The cache is invalidated by every save, new directory and delete made
+        through ManuscriptManager, in this or any other worker (see
+        ManuscriptTreeCache). Files changed by hand in the manuscripts
+        directory are only seen after the next change made by the manager.
+
+        Returns:
+            tuple: The listing dict and its ETag (a quoted string)
+
+        Raises:
+            HTTPException: Same errors as list_directory_contents()
+        """
+        project_path = os.path.join(self.UPLOAD_DIR, str(project_id))
+        version = await self.fs_executor.run(
+            self.tree_cache.current_version, project_path
+        )
+
+        cached = self.tree_cache.get(project_path, version)
+        if cached is not None:
+            return cached
+
+        listing = await self.list_directory_contents(project_id)
+        return listing, self.tree_cache.put(project_path, version, listing)
+
     async def list_directory_contents(self, project_id: int) -> dict:
         """
         List all files and directories in the project storage grouped by directories.
 
-        This method returns a structure where directories are listed first, and each
-        directory contains all its files. Only shows 2 levels: directories and their
-        direct files (no nested subdirectories).
+        This method returns a structure where the top level directories of the
+        project are the chapters, and each chapter contains its direct files,
+        sorted by name. Only 2 levels are listed: files of nested
+        subdirectories are not scenes. Each chapter is read with one
+        os.scandir() call in a worker thread, hidden directories are never
+        opened, and the stat result of each directory entry is reused to
+        report the size and modification time of every scene. Compressed
+        scenes report the size of their content (see _set_content_sizes()).
 
         Args:
             project_id (int): Unique identifier of the project
-            path (str): Not used in this simplified version, kept for API compatibility
 
         Returns:
             dict: A dictionary containing:
                 - path (str): Empty string (project root)
-                - entries (list): List of directory entries, each containing:
-                    For directories:
-                    - name (str): Name of the directory
+                - chapters (list): List of directory entries, each containing:
+                    - title (str): Name of the directory
                     - path (str): Relative path from project root
-                    - type (str): "directory"
-                    - files (list): List of files within this directory, each with:
-                        - name (str): Name of the file
+                    - scenes (list): Files within this directory, each with:
+                        - title (str): Name of the file
                         - path (str): Relative path from project root
-                        - type (str): "file"
-                        - size (int): File size in bytes
+                        - content (str): Always empty, see get_manuscript_file_content()
+                        - size (int): Content size in bytes, before compression
+                        - modified_at (float): Modification time (epoch seconds)
 
         Raises:
             HTTPException (404): If the project directory doesn't exist
             HTTPException (403): If insufficient permissions to read the directory
             HTTPException (500): If an unexpected OSError occurs
 
+        Note:
+            - Hidden files and directories and metadata.json files are skipped
+            - Files at the project root and in nested subdirectories are
+              not listed
+            - Unreadable chapters are listed without scenes
+
         Example Response:
             ```json
             {
                 "path": "",
-                "entries": [
+                "chapters": [
                     {
-                        "name": "chapters",
+                        "title": "chapters",
                         "path": "chapters",
-                        "type": "directory",
-                        "files": [
-                            {
-                                "name": "intro.md",
-                                "path": "chapters/intro.md",
-                                "type": "file",
-                                "size": 1024
-                            },
+                        "scenes": [
                             {
-                                "name": "chapter1.md",
+                                "title": "chapter1.md",
                                 "path": "chapters/chapter1.md",
-                                "type": "file",
-                                "size": 2048
-                            }
-                        ]
-                    },
-                    {
-                        "name": "scenes",
-                        "path": "scenes",
-                        "type": "directory",
-                        "files": [
+                                "content": "",
+                                "size": 2048,
+                                "modified_at": 1640995200.0
+                            },
                             {
-                                "name": "scene1.md",
-                                "path": "scenes/scene1.md",
-                                "type": "file",
-                                "size": 1536
+                                "title": "intro.md",
+                                "path": "chapters/intro.md",
+                                "content": "",
+                                "size": 1024,
+                                "modified_at": 1640995200.0
                             }
                         ]
                     }
@@ -528,89 +2480,25 @@ class ManuscriptManager:
 
         try:
             # Check if project directory exists
-            if not os.path.exists(project_path):
+            path_type = await self.fs_executor.run(_path_type, project_path)
+            if path_type is None:
                 raise HTTPException(
                     status_code=404,
                     detail=f"Project directory not found: {project_id}",
                 )
 
-            if not os.path.isdir(project_path):
+            if path_type != "directory":
                 raise HTTPException(
                     status_code=404,
                     detail=f"Project path is not a directory: {project_id}",
                 )
 
-            directories_data = {}
-
             try:
-                # First pass: collect all directories and their files
-                for root, dirs, files in os.walk(project_path):
-                    # Calculate relative path from project root
-                    relative_root = os.path.relpath(root, project_path)
-                    if relative_root == ".":
-                        relative_root = ""
-
-                    # For root level, process directories
-                    if relative_root == "":
-                        for dir_name in sorted(dirs):
-                            # Skip hidden directories
-                            if dir_name.startswith("."):
-                                continue
-
-                            directories_data[dir_name] = {
-                                "title": dir_name,
-                                "path": dir_name,
-                                "scenes": [],
-                            }
-
-                    # For any directory (including subdirectories), collect files
-                    if relative_root in directories_data or relative_root == "":
-                        for file_name in sorted(files):
-                            # Skip hidden files and metadata files
-                            if (
-                                file_name.startswith(".")
-                                or file_name == "metadata.json"
-                            ):
-                                continue
-
-                            file_full_path = os.path.join(root, file_name)
-
-                            # Construct file relative path
-                            if relative_root:
-                                file_relative_path = f"{relative_root}/{file_name}"
-                            else:
-                                file_relative_path = file_name
-
-                            file_entry = {
-                                "title": file_name,
-                                "path": file_relative_path,
-                                "content": "",
-                            }
-
-                            # Add to appropriate directory or root
-                            if relative_root == "":
-                                # Root level files - we could add them to a special "root" entry
-                                # or handle them separately based on requirements
-                                pass
-                            elif relative_root in directories_data:
-                                directories_data[relative_root]["scenes"].append(
-                                    file_entry
-                                )
-                            else:
-                                # This is a file in a subdirectory of a main directory
-                                # Find the parent directory
-                                parent_dir = relative_root.split("/")[0]
-                                if parent_dir in directories_data:
-                                    directories_data[parent_dir]["scenes"].append(
-                                        file_entry
-                                    )
-
-                # Convert directories_data to entries list
-                chapters = list(directories_data.values())
-
-                # Sort entries by directory name
-                chapters.sort(key=lambda x: x["title"])
-
+                chapters = await self.fs_executor.run(
+                    self._list_chapters, project_id, project_path
+                )
+            except PermissionError:
+                raise
             except OSError as e:
                 raise HTTPException(
                     status_code=500,
@@ -0,0 +1,119 @@
+import re
+
+HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+def _lines(text: str) -> list[str]:
+    """Lines of text with their "\n", other line breaks stay in the lines."""
+    lines = text.split("\n")
+    last = lines.pop()
+    lines = [line + "\n" for line in lines]
+    if last:
+        lines.append(last)
+    return lines
+
+
+def _parse_hunk(lines: list[str], start: int) -> tuple[list[tuple[str, str]], int]:
+    """The (tag, line) pairs of the hunk body starting at lines[start], and its end."""
+    body = []
+    index = start
+    while index < len(lines) and not lines[index].startswith("@@"):
+        line = lines[index]
+        index += 1
+        if line.startswith("\\"):
+            # "\ No newline at end of file", about the line before
+            if not body:
+                raise ValueError("Misplaced end of file marker")
+            tag, previous = body[-1]
+            body[-1] = (tag, previous.removesuffix("\n"))
+        elif line == "\n":
+            # Blank context line whose leading space was trimmed
+            body.append((" ", "\n"))
+        elif line[0] in " -+":
+            body.append((line[0], line[1:]))
+        else:
+            raise ValueError(f"Invalid diff line: {line.rstrip()!r}")
+    return body, index
+
+
+def apply_unified_diff(text: str, diff: str) -> str:
+    """
+    Applies a unified diff (diff -u, git diff, difflib.unified_diff or the
+    jsdiff createPatch output) to text. Context and removed lines must match
+    the text exactly, hunks are not searched for at other positions.
+
+    Raises:
+        ValueError: If the diff is malformed or does not apply to text
+    """
+    source = _lines(text)
+    lines = _lines(diff)
+    result = []
+    position = 0
+
+    index = 0
+    # File headers (---, +++, diff --git, index) before the first hunk
+    while index < len(lines) and not lines[index].startswith("@@"):
+        index += 1
+    while index < len(lines):
+        match = HUNK_HEADER.match(lines[index])
+        if match is None:
+            raise ValueError(f"Invalid hunk header: {lines[index].rstrip()!r}")
+        old_start, old_count, _, new_count = (
+            int(group) if group is not None else 1 for group in match.groups()
+        )
+        body, index = _parse_hunk(lines, index + 1)
+        if (
+            sum(tag != "+" for tag, _ in body) != old_count
+            or sum(tag != "-" for tag, _ in body) != new_count
+        ):
+            raise ValueError(f"Hunk at line {old_start} has wrong line counts")
+
+        # An empty old range gives the line after which the hunk inserts
+        start = old_start - 1 if old_count else old_start
+        if start < position or start > len(source):
+            raise ValueError(f"Hunk at line {old_start} is out of order or range")
+        result.extend(source[position:start])
+        position = start
+
+        for tag, line in body:
+            if tag == "+":
+                result.append(line)
+                continue
+            if position >= len(source) or source[position] != line:
+                raise ValueError(f"Diff does not apply at line {position + 1}")
+            if tag == " ":
+                result.append(line)
+            position += 1
+
+    result.extend(source[position:])
+    return "".join(result)
+
+
+def apply_operations(text: str, operations: list[dict]) -> str:
+    """
+    Applies operational transform style operations to text, in order:
+    {"retain": n} keeps the next n characters, {"insert": s} inserts s and
+    {"delete": n} removes the next n characters. Characters after the last
+    operation are kept. Characters are Unicode code points.
+
+    Raises:
+        ValueError: If an operation goes past the end of the text
+    """
+    result = []
+    position = 0
+    for operation in operations:
+        if "insert" in operation:
+            result.append(operation["insert"])
+            continue
+        count = operation.get("retain", operation.get("delete"))
+        if count is None or count < 0:
+            raise ValueError(f"Invalid operation: {operation}")
+        if position + count > len(text):
+            raise ValueError(
+                f"Operation {operation} goes past the end of the text ({len(text)})"
+            )
+        if "retain" in operation:
+            result.append(text[position : position + count])
+        position += count
+    result.append(text[position:])
+    return "".join(result)
@@ -0,0 +1,115 @@
+from backend.app.domain.manuscript_compression import open_stored
+
+READ_BLOCK_SIZE = 1024 * 1024
+# Blocks read for the lines of a window, a window is usually a few pages
+LINE_BLOCK_SIZE = 64 * 1024
+# Longest UTF-8 sequence, minus its first byte
+MAX_CONTINUATION_BYTES = 3
+
+
+def _is_continuation(byte: int) -> bool:
+    return byte & 0xC0 == 0x80
+
+
+def read_byte_window(path: str, offset: int, length: int) -> dict:
+    """
+    Reads about `length` bytes of a UTF-8 file starting at `offset`.
+
+    The window is aligned to whole characters: continuation bytes at the start
+    are skipped and a character cut at the end is completed, so any offset can
+    be requested and `next_offset` always points at a character boundary.
+
+    Raises:
+        ValueError: If offset is past the end of the file
+        UnicodeDecodeError: If the window is not valid UTF-8
+    """
+    with open_stored(path) as f:
+        size = f.size
+        if offset > size:
+            raise ValueError(f"Offset {offset} is past the end of the file ({size})")
+        f.seek(offset)
+        data = f.read(length + MAX_CONTINUATION_BYTES)
+
+    start = 0
+    while start < min(len(data), MAX_CONTINUATION_BYTES) and _is_continuation(
+        data[start]
+    ):
+        start += 1
+    end = max(start, min(length, len(data)))
+    while end < len(data) and _is_continuation(data[end]):
+        end += 1
+
+    return {
+        "size": size,
+        "offset": offset + start,
+        "next_offset": offset + end,
+        "eof": offset + end >= size,
+        "content": data[start:end].decode("utf-8"),
+    }
+
+
+def _nth_line_end(data: bytes, n: int) -> int:
+    """Index after the n-th newline of data, which must hold at least n."""
+    index = -1
+    for _ in range(n):
+        index = data.index(b"\n", index + 1)
+    return index + 1
+
+
+def _line_offset(f, line: int) -> tuple[int, bytes]:
+    """
+    Byte offset of a 0-based line, counting newlines a block at a time.
+
+    Returns:
+        tuple: The offset and the bytes already read past it, so the lines can
+               be read on without seeking back (compressed files can't)
+    """
+    position = 0
+    while line:
+        block = f.read(READ_BLOCK_SIZE)
+        if not block:
+            break
+        newlines = block.count(b"\n")
+        if newlines < line:
+            line -= newlines
+            position += len(block)
+            continue
+        end = _nth_line_end(block, line)
+        return position + end, block[end:]
+    return position, b""
+
+
+def read_line_window(path: str, line: int, lines: int) -> dict:
+    """
+    Reads `lines` lines of a UTF-8 file starting at the 0-based `line`.
+
+    Raises:
+        UnicodeDecodeError: If the lines are not valid UTF-8
+    """
+    with open_stored(path) as f:
+        size = f.size
+        offset, data = _line_offset(f, line)
+        newlines = data.count(b"\n")
+        while newlines < lines:
+            block = f.read(LINE_BLOCK_SIZE)
+            if not block:
+                break
+            data += block
+            newlines += block.count(b"\n")
+
+    if newlines >= lines:
+        data = data[: _nth_line_end(data, lines)]
+        read = lines
+    else:
+        # The last line of the file may have no newline
+        read = newlines + int(bool(data) and not data.endswith(b"\n"))
+    next_offset = offset + len(data)
+    return {
+        "size": size,
+        "line": line,
+        "next_line": line + read,
+        "offset": offset,
+        "next_offset": next_offset,
+        "eof": next_offset >= size,
+        "content": data.decode("utf-8"),
+    }
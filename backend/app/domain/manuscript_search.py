@@ -0,0 +1,81 @@
+import mmap
+import re
+
+from backend.app.domain.manuscript_compression import open_stored
+
+# Bytes of context kept on each side of a match in the snippet
+SNIPPET_CONTEXT = 80
+
+
+def compile_search_pattern(query: str, regex: bool, case_sensitive: bool) -> re.Pattern:
+    """
+    Compiles the query to a bytes pattern, so files can be searched through
+    mmap without decoding them. Case folding only applies to ASCII letters.
+
+    Raises:
+        re.error: If regex is set and the query is not a valid expression
+    """
+    source = query.encode("utf-8")
+    if not regex:
+        source = re.escape(source)
+    return re.compile(source, 0 if case_sensitive else re.IGNORECASE)
+
+
+def search_buffer(data, pattern: re.Pattern, max_matches: int) -> list[dict]:
+    """
+    Searches a bytes-like buffer.
+
+    Returns:
+        list: Up to max_matches dicts with the 1-based line, the matched text
+              and a snippet of the line around the match
+    """
+    matches = []
+    line = 1
+    counted_until = 0
+    for match in pattern.finditer(data):
+        start, end = match.span()
+        if start == end:
+            continue
+        line += data[counted_until:start].count(b"\n")
+        counted_until = start
+
+        line_start = data.rfind(b"\n", 0, start) + 1
+        line_end = data.find(b"\n", end)
+        if line_end == -1:
+            line_end = len(data)
+        snippet_start = max(line_start, start - SNIPPET_CONTEXT)
+        snippet_end = min(line_end, end + SNIPPET_CONTEXT)
+
+        matches.append(
+            {
+                "line": line,
+                "match": match.group().decode("utf-8", errors="replace"),
+                "snippet": data[snippet_start:snippet_end]
+                .decode("utf-8", errors="ignore")
+                .strip(),
+            }
+        )
+        if len(matches) >= max_matches:
+            break
+    return matches
+
+
+def search_file(path: str, pattern: re.Pattern, max_matches: int) -> list[dict]:
+    """
+    Searches a file through a read only memory map. Compressed files are
+    decompressed in memory instead.
+
+    Returns:
+        list: See search_buffer()
+    """
+    with open_stored(path) as f:
+        if f.compressed:
+            return search_buffer(f.read(), pattern, max_matches)
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files can't be mapped
+            return []
+
+        with mapped:
+            return search_buffer(mapped, pattern, max_matches)
@@ -0,0 +1,185 @@
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import MutableMapping
+from typing import Callable, Iterator
+
+
+class SessionStore(MutableMapping, ABC):
+    """
+    Storage of the upload sessions of ManuscriptManager.
+
+    Behaves like a dict of session_id -> session data, plus `modify` for atomic
+    read-modify-write updates and `expire` for TTL based cleanup. Session data
+    must be JSON serializable so persistent stores can share it across
+    restarts and workers.
+
+    Stores are blocking and thread safe, ManuscriptManager calls them from
+    its fs_executor threads, never on the event loop.
+    """
+
+    @abstractmethod
+    def modify(self, session_id: str, change: Callable[[dict], None]) -> dict:
+        """Applies `change` to the session data in place and stores the result."""
+
+    @abstractmethod
+    def expire(self, ttl_seconds: float) -> dict:
+        """Removes sessions inactive for more than ttl_seconds and returns them."""
+
+
+class MemorySessionStore(SessionStore):
+    """Process local store, sessions are lost on restart."""
+
+    def __init__(self):
+        self._sessions: dict[str, tuple[dict, float]] = {}
+        # modify and expire are called from several threads
+        self._lock = threading.Lock()
+
+    def __getitem__(self, session_id: str) -> dict:
+        return self._sessions[session_id][0]
+
+    def __setitem__(self, session_id: str, data: dict):
+        self._sessions[session_id] = (data, time.time())
+
+    def __delitem__(self, session_id: str):
+        del self._sessions[session_id]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._sessions))
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def modify(self, session_id: str, change: Callable[[dict], None]) -> dict:
+        with self._lock:
+            data = json.loads(json.dumps(self[session_id]))
+            change(data)
+            self[session_id] = data
+        return data
+
+    def expire(self, ttl_seconds: float) -> dict:
+        deadline = time.time() - ttl_seconds
+        with self._lock:
+            expired = {
+                session_id: data
+                for session_id, (data, updated_at) in list(self._sessions.items())
+                if updated_at < deadline
+            }
+            for session_id in expired:
+                del self._sessions[session_id]
+        return expired
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Sessions kept in a SQLite table, so they survive restarts and can be shared
+    by several backend workers. `modify` runs inside an immediate transaction,
+    so concurrent chunks from different workers do not lose range updates.
+    """
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            path, timeout=5, isolation_level=None, check_same_thread=False
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS upload_sessions ("
+            "session_id TEXT PRIMARY KEY, data TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+
+    def _select(self, session_id: str) -> dict:
+        row = self._connection.execute(
+            "SELECT data FROM upload_sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(session_id)
+        return json.loads(row[0])
+
+    def _replace(self, session_id: str, data: dict):
+        self._connection.execute(
+            "INSERT OR REPLACE INTO upload_sessions VALUES (?, ?, ?)",
+            (session_id, json.dumps(data), time.time()),
+        )
+
+    def __getitem__(self, session_id: str) -> dict:
+        with self._lock:
+            return self._select(session_id)
+
+    def __setitem__(self, session_id: str, data: dict):
+        with self._lock:
+            self._replace(session_id, data)
+
+    def __delitem__(self, session_id: str):
+        with self._lock:
+            cursor = self._connection.execute(
+                "DELETE FROM upload_sessions WHERE session_id = ?", (session_id,)
+            )
+        if cursor.rowcount == 0:
+            raise KeyError(session_id)
+
+    def __contains__(self, session_id) -> bool:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT 1 FROM upload_sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return row is not None
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT session_id FROM upload_sessions"
+            ).fetchall()
+        return iter([row[0] for row in rows])
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute(
+                "SELECT COUNT(*) FROM upload_sessions"
+            ).fetchone()[0]
+
+    def clear(self):
+        with self._lock:
+            self._connection.execute("DELETE FROM upload_sessions")
+
+    def modify(self, session_id: str, change: Callable[[dict], None]) -> dict:
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                data = self._select(session_id)
+                change(data)
+                self._replace(session_id, data)
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+        return data
+
+    def expire(self, ttl_seconds: float) -> dict:
+        deadline = time.time() - ttl_seconds
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            rows = self._connection.execute(
+                "SELECT session_id, data FROM upload_sessions WHERE updated_at < ?",
+                (deadline,),
+            ).fetchall()
+            self._connection.execute(
+                "DELETE FROM upload_sessions WHERE updated_at < ?", (deadline,)
+            )
+            self._connection.execute("COMMIT")
+        return {session_id: json.loads(data) for session_id, data in rows}
+
+    def close(self):
+        self._connection.close()
+
+
+def create_session_store(kind: str, sqlite_path: str) -> SessionStore:
+    if kind == "memory":
+        return MemorySessionStore()
+    if kind == "sqlite":
+        return SQLiteSessionStore(sqlite_path)
+    raise ValueError(
+        f"Unknown upload session store '{kind}', expected one of: memory, sqlite"
+    )
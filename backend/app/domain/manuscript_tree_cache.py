@@ -0,0 +1,88 @@
+import hashlib
+import json
+import os
+import threading
+import uuid
+from typing import Optional
+
+TREE_VERSION_FILENAME = ".tree_version"
+
+
+def listing_etag(listing: dict) -> str:
+    body = json.dumps(listing, sort_keys=True, separators=(",", ":"))
+    return f'"{hashlib.sha1(body.encode()).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Evaluates an If-None-Match header against an ETag (weak comparison)."""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in [
+        candidate.removeprefix("W/") for candidate in candidates
+    ]
+
+
+class ManuscriptTreeCache:
+    """
+    Last listing of every project, with its ETag.
+
+    Each project directory holds a `.tree_version` file with a random token that
+    is replaced whenever ManuscriptManager changes the tree. A cached listing is
+    served only while the token it was built with is still current, so checking
+    the cache costs a single small read instead of a walk of the project, and
+    changes made by other workers sharing the manuscripts directory are seen.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: dict[str, tuple[str, dict, str]] = {}
+
+    @staticmethod
+    def _version_path(project_path: str) -> str:
+        return os.path.join(project_path, TREE_VERSION_FILENAME)
+
+    def current_version(self, project_path: str) -> Optional[str]:
+        """The tree token of the project, created if the project has none yet."""
+        version_path = self._version_path(project_path)
+        try:
+            with open(version_path, "r") as f:
+                return f.read()
+        except FileNotFoundError:
+            return self.invalidate(project_path)
+
+    def get(self, project_path: str, version: Optional[str]) -> Optional[tuple]:
+        """The cached (listing, etag) if it was built for this tree version."""
+        with self._lock:
+            entry = self._entries.get(project_path)
+        if entry is None or version is None or entry[0] != version:
+            return None
+        return entry[1], entry[2]
+
+    def put(self, project_path: str, version: Optional[str], listing: dict) -> str:
+        etag = listing_etag(listing)
+        if version is not None:
+            with self._lock:
+                self._entries[project_path] = (version, listing, etag)
+        return etag
+
+    def invalidate(self, project_path: str) -> Optional[str]:
+        """Drops the cached listing and gives the project tree a new token."""
+        with self._lock:
+            self._entries.pop(project_path, None)
+
+        version = uuid.uuid4().hex
+        version_path = self._version_path(project_path)
+        temp_path = f"{version_path}.{version}"
+        try:
+            with open(temp_path, "w") as f:
+                f.write(version)
+            os.replace(temp_path, version_path)
+        except OSError:
+            # The project directory does not exist (yet or anymore)
+            return None
+        return version
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
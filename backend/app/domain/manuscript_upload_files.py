@@ -0,0 +1,227 @@
+import asyncio
+import errno
+import os
+import shutil
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import BinaryIO, Optional
+
+from backend.app.domain.manuscript_fs_executor import FileSystemExecutor
+
+# "full": fsync the file before the rename and its directory after it,
+# "file": fsync the file only, "none": leave flushing to the OS
+FSYNC_POLICIES = ("full", "file", "none")
+
+# os.pwrite is not available on Windows, positional writes fall back to
+# seek + write serialized by this lock
+_seek_write_lock = threading.Lock()
+
+
+def positional_write(fd: int, data: bytes, offset: int):
+    view = memoryview(data)
+    while view:
+        if hasattr(os, "pwrite"):
+            written = os.pwrite(fd, view, offset)
+        else:  # pragma: no cover
+            with _seek_write_lock:
+                os.lseek(fd, offset, os.SEEK_SET)
+                written = os.write(fd, view)
+        view = view[written:]
+        offset += written
+
+
+def copy_to_offset(
+    source: BinaryIO,
+    fd: int,
+    offset: int,
+    buffer_size: int,
+    limit: Optional[int] = None,
+) -> int:
+    """
+    Copies a whole file object into fd starting at offset, returns the bytes written.
+
+    Raises:
+        ValueError: If the file has more than limit bytes, before writing
+            the ones past the limit
+    """
+    written = 0
+    while data := source.read(buffer_size):
+        if limit is not None and written + len(data) > limit:
+            raise ValueError(f"More than {limit} bytes to write")
+        positional_write(fd, data, offset + written)
+        written += len(data)
+    return written
+
+
+def _open_upload_file(path: str, size: Optional[int]) -> int:
+    fd = os.open(path, os.O_RDWR | os.O_CREAT | getattr(os, "O_BINARY", 0), 0o644)
+    if size and os.fstat(fd).st_size < size:
+        try:
+            os.posix_fallocate(fd, 0, size)
+        except (AttributeError, OSError):
+            os.ftruncate(fd, size)
+    return fd
+
+
+def check_fsync_policy(policy: str) -> str:
+    if policy not in FSYNC_POLICIES:
+        raise ValueError(
+            f"Unknown fsync policy {policy}, use one of {', '.join(FSYNC_POLICIES)}"
+        )
+    return policy
+
+
+def _fsync_path(path: str, flags: int):
+    try:
+        fd = os.open(path, flags)
+    except OSError:
+        # Directories can't be opened on Windows
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def commit_upload_file(temp_path: str, final_path: str, fsync: str):
+    """
+    Atomically replaces final_path with a finished temporary file.
+
+    The temporary file is staged on the same filesystem as final_path, so this
+    is a rename whatever the file size: readers see the old or the new
+    content, never a partial file. fsync follows FSYNC_POLICIES.
+    """
+    if fsync != "none":
+        _fsync_path(temp_path, os.O_RDWR | getattr(os, "O_BINARY", 0))
+    try:
+        os.replace(temp_path, final_path)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        # Staged in the system temporary directory by an earlier version
+        shutil.move(temp_path, final_path)
+    if fsync == "full":
+        _fsync_path(os.path.dirname(final_path) or ".", os.O_RDONLY)
+
+
+class OpenUploadFile:
+    def __init__(self, path: str, fd: int):
+        self.path = path
+        self.fd = fd
+        self.append_lock = asyncio.Lock()
+        self.active = 0
+        self.last_used = time.monotonic()
+        # Set by UploadFileHandles.close(), the last chunk using it closes fd
+        self.closing = False
+
+
+class UploadFileHandles:
+    """
+    Keeps the temporary file of every upload session open between chunks.
+
+    Opening and closing the `.part` file for each chunk dominates the cost of
+    uploads made of many small chunks, so the file descriptor is opened on the
+    first chunk and reused until the session finishes or stays idle for too
+    long. Chunks are written with positional writes, so several chunks of the
+    same session can be written in parallel.
+
+    Files are opened and closed in `executor` when given, in the default
+    executor otherwise.
+    """
+
+    def __init__(self, executor: Optional[FileSystemExecutor] = None):
+        self._files: dict[str, OpenUploadFile] = {}
+        self._executor = executor
+
+    async def _run(self, func, *args):
+        if self._executor is None:
+            return await asyncio.to_thread(func, *args)
+        return await self._executor.run(func, *args)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._files
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    @asynccontextmanager
+    async def open(self, session_id: str, path: str, size: Optional[int] = None):
+        """
+        Yields the OpenUploadFile of the session, opening the temporary file
+        (preallocated to `size` bytes when given) if it is not open yet.
+        """
+        entry = self._files.get(session_id)
+        if entry is None:
+            fd = await self._run(_open_upload_file, path, size)
+            # Another chunk of the same session may have opened it meanwhile
+            entry = self._files.get(session_id)
+            if entry is None:
+                entry = self._files[session_id] = OpenUploadFile(path, fd)
+            else:
+                await self._run(os.close, fd)
+
+        entry.active += 1
+        entry.last_used = time.monotonic()
+        try:
+            yield entry
+        finally:
+            entry.active -= 1
+            entry.last_used = time.monotonic()
+            if entry.closing and not entry.active:
+                await self._run(os.close, entry.fd)
+
+    async def close(self, session_id: str):
+        """
+        Closes the file of a session. While chunks still write to it, the
+        entry is only marked closing and the last of them closes the file
+        descriptor, so it is never closed, or its number reused by another
+        file, under a write.
+        """
+        entry = self._files.pop(session_id, None)
+        if entry is not None:
+            entry.closing = True
+            if not entry.active:
+                await self._run(os.close, entry.fd)
+
+    async def close_idle(self, max_idle_seconds: float):
+        now = time.monotonic()
+        for session_id, entry in list(self._files.items()):
+            if not entry.active and now - entry.last_used > max_idle_seconds:
+                await self.close(session_id)
+
+    async def close_all(self):
+        for session_id in list(self._files):
+            await self.close(session_id)
+
+
+def add_received_range(ranges: list, start: int, end: int) -> list:
+    """Merges the [start, end) byte range into a sorted list of disjoint ranges."""
+    merged = []
+    for range_start, range_end in sorted([*ranges, [start, end]]):
+        if merged and range_start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], range_end)
+        else:
+            merged.append([range_start, range_end])
+    return merged
+
+
+def received_end(ranges: list) -> int:
+    return ranges[-1][1] if ranges else 0
+
+
+def missing_ranges(ranges: list, total_size: Optional[int]) -> list:
+    """
+    Returns the [start, end) gaps left in the upload. Without a declared total
+    size the upload is only required to be contiguous from byte 0.
+    """
+    end = received_end(ranges) if total_size is None else total_size
+    missing = []
+    position = 0
+    for range_start, range_end in ranges:
+        if range_start > position:
+            missing.append([position, min(range_start, end)])
+        position = max(position, range_end)
+    if position < end:
+        missing.append([position, end])
+    return missing
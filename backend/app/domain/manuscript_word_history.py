@@ -0,0 +1,252 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from backend.app.domain.manuscript_index import INDEX_FILENAME
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+RESOLUTIONS = {"minute": MINUTE, "hour": HOUR, "day": DAY}
+
+
+def _bucket(timestamp: float, resolution: int) -> int:
+    return int(timestamp) - int(timestamp) % resolution
+
+
+class WordCountHistory:
+    """
+    Append-only history of the word count of every manuscript file.
+
+    A snapshot is the word count of a file at the end of a time bucket. Saves
+    land in minute buckets and a save only replaces the snapshot of the
+    current minute, so autosaving every few seconds writes at most one row per
+    file and minute, and saves that don't change the count write nothing.
+    compact() then keeps only the last snapshot of every hour for minutes
+    older than MINUTE_RETENTION, and of every day for hours older than
+    HOUR_RETENTION.
+    """
+
+    # Seconds minute and hour snapshots are kept before being downsampled
+    MINUTE_RETENTION = 2 * DAY
+    HOUR_RETENTION = 90 * DAY
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            path, timeout=5, isolation_level=None, check_same_thread=False
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        # Buckets of different resolutions never overlap, compact() replaces
+        # the minutes of an hour with that hour
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS word_history ("
+            "project_id TEXT NOT NULL, path TEXT NOT NULL, bucket INTEGER NOT NULL, "
+            "resolution INTEGER NOT NULL, word_count INTEGER NOT NULL, "
+            "PRIMARY KEY (project_id, path, bucket)) WITHOUT ROWID"
+        )
+
+    def _transaction(self, statements):
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                result = statements(self._connection)
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+        return result
+
+    @staticmethod
+    def _latest(connection: sqlite3.Connection, project_id, path: str) -> Optional[int]:
+        row = connection.execute(
+            "SELECT word_count FROM word_history WHERE project_id = ? AND path = ? "
+            "ORDER BY bucket DESC LIMIT 1",
+            (str(project_id), path),
+        ).fetchone()
+        return row[0] if row else None
+
+    def record(
+        self, project_id, path: str, word_count: int, timestamp: Optional[float] = None
+    ) -> bool:
+        """
+        Records the word count of a file, unless it is the last one recorded.
+
+        Returns:
+            bool: Whether a snapshot was written
+        """
+        bucket = _bucket(time.time() if timestamp is None else timestamp, MINUTE)
+
+        def write(connection: sqlite3.Connection) -> bool:
+            if self._latest(connection, project_id, path) == word_count:
+                return False
+            connection.execute(
+                "INSERT OR REPLACE INTO word_history VALUES (?, ?, ?, ?, ?)",
+                (str(project_id), path, bucket, MINUTE, word_count),
+            )
+            return True
+
+        return self._transaction(write)
+
+    def record_removed(
+        self, project_id, path: str, timestamp: Optional[float] = None
+    ) -> int:
+        """
+        Records a count of 0 for a removed file, or for every file below a
+        removed directory ("." for the whole project).
+
+        Returns:
+            int: Number of files recorded as removed
+        """
+        bucket = _bucket(time.time() if timestamp is None else timestamp, MINUTE)
+
+        def write(connection: sqlite3.Connection) -> int:
+            if path == ".":
+                rows = connection.execute(
+                    "SELECT DISTINCT path FROM word_history WHERE project_id = ?",
+                    (str(project_id),),
+                ).fetchall()
+            else:
+                escaped = (
+                    path.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+                )
+                rows = connection.execute(
+                    "SELECT DISTINCT path FROM word_history WHERE project_id = ? "
+                    "AND (path = ? OR path LIKE ? ESCAPE '\\')",
+                    (str(project_id), path, f"{escaped}/%"),
+                ).fetchall()
+
+            removed = 0
+            for (file_path,) in rows:
+                if self._latest(connection, project_id, file_path) == 0:
+                    continue
+                connection.execute(
+                    "INSERT OR REPLACE INTO word_history VALUES (?, ?, ?, ?, ?)",
+                    (str(project_id), file_path, bucket, MINUTE, 0),
+                )
+                removed += 1
+            return removed
+
+        return self._transaction(write)
+
+    @staticmethod
+    def _downsample(
+        connection: sqlite3.Connection, source: int, target: int, cutoff: int
+    ) -> int:
+        rows = connection.execute(
+            "SELECT project_id, path, bucket, word_count FROM word_history "
+            "WHERE resolution = ? AND bucket < ? ORDER BY bucket",
+            (source, cutoff),
+        ).fetchall()
+        if not rows:
+            return 0
+
+        # Last snapshot of every coarser bucket
+        latest = {}
+        for project_id, path, bucket, word_count in rows:
+            latest[(project_id, path, _bucket(bucket, target))] = word_count
+
+        connection.execute(
+            "DELETE FROM word_history WHERE resolution = ? AND bucket < ?",
+            (source, cutoff),
+        )
+        connection.executemany(
+            "INSERT OR REPLACE INTO word_history VALUES (?, ?, ?, ?, ?)",
+            [
+                (project_id, path, bucket, target, word_count)
+                for (project_id, path, bucket), word_count in latest.items()
+            ],
+        )
+        return len(rows) - len(latest)
+
+    def compact(self, now: Optional[float] = None) -> int:
+        """
+        Downsamples old minute snapshots to hours and old hour snapshots to days.
+
+        Returns:
+            int: Number of rows removed
+        """
+        now = time.time() if now is None else now
+        # Cutoffs are aligned so a coarser bucket is never built from part of
+        # its snapshots
+        minute_cutoff = _bucket(now - self.MINUTE_RETENTION, HOUR)
+        hour_cutoff = _bucket(now - self.HOUR_RETENTION, DAY)
+
+        def downsample(connection: sqlite3.Connection) -> int:
+            return self._downsample(
+                connection, MINUTE, HOUR, minute_cutoff
+            ) + self._downsample(connection, HOUR, DAY, hour_cutoff)
+
+        return self._transaction(downsample)
+
+    def series(
+        self,
+        project_id,
+        start: float,
+        end: float,
+        resolution: int,
+        path: Optional[str] = None,
+    ) -> dict:
+        """
+        Word counts of a project, or of one file, over a time range.
+
+        Returns:
+            dict: Containing:
+                - baseline (int): Words before start
+                - points (list): One {time, words} dict per bucket of the given
+                  resolution in which the count changed, with the count at the
+                  end of the bucket. Old history only has hour or day snapshots,
+                  so finer resolutions get coarser points there
+        """
+        query = (
+            "SELECT path, bucket, word_count FROM word_history "
+            "WHERE project_id = ? AND bucket <= ?"
+        )
+        parameters = [str(project_id), int(end)]
+        if path is not None:
+            query += " AND path = ?"
+            parameters.append(path)
+        with self._lock:
+            rows = self._connection.execute(
+                query + " ORDER BY bucket", parameters
+            ).fetchall()
+
+        counts: dict[str, int] = {}
+        total = 0
+        baseline = 0
+        points: dict[int, int] = {}
+        for file_path, bucket, word_count in rows:
+            total += word_count - counts.get(file_path, 0)
+            counts[file_path] = word_count
+            if bucket < start:
+                baseline = total
+            else:
+                points[_bucket(bucket, resolution)] = total
+
+        return {
+            "baseline": baseline,
+            "points": [
+                {"time": bucket, "words": words} for bucket, words in points.items()
+            ],
+        }
+
+    def close(self):
+        self._connection.close()
+
+
+_histories: dict[str, WordCountHistory] = {}
+_histories_lock = threading.Lock()
+
+
+def get_word_history(upload_dir: str) -> WordCountHistory:
+    """The word count history of the manuscripts under upload_dir, opened once per process."""
+    path = os.path.abspath(os.path.join(upload_dir, INDEX_FILENAME))
+    with _histories_lock:
+        history = _histories.get(path)
+        if history is None:
+            if not os.path.exists(upload_dir):
+                os.makedirs(upload_dir)
+            history = _histories[path] = WordCountHistory(path)
+        return history
@@ -1,3 +1,5 @@
+from typing import Iterable
+
 from fastapi import HTTPException
 
 from backend.app.data.respositories.sections.character_repository import (
@@ -17,39 +19,64 @@ async def delete_plot_steps_by_plot_id(repository: PlotRepository, plot_id: int)
         await repository.delete_plot_step(plot_step)
 
 
-async def plot_with_steps_factory(
-    plot_repository: PlotRepository,
-    character_repository: CharacterRepository,
-    plot_id: int,
-) -> PlotSchemaWithSteps:
-    steps_sequence = await plot_repository.get_plot_step_list(plot_id)
-    plot = await plot_repository.get_plot(plot_id)
+class CharacterLookup:
+    """
+    Per-request identity map of characters referenced by plots.
+
+    Each character is loaded at most once, and missing ids are fetched in bulk
+    with a single IN query instead of one query per id.
+    """
+
+    def __init__(self, character_repository: CharacterRepository, characters=()):
+        self.character_repository = character_repository
+        self._characters = {character.id: character for character in characters}
+        self._requested_ids = set(self._characters)
+
+    async def prefetch(self, character_ids: Iterable[int]):
+        missing_ids = [
+            char_id
+            for char_id in dict.fromkeys(character_ids)
+            if char_id not in self._requested_ids
+        ]
+        if not missing_ids:
+            return
 
-    character_list = []
-    for char_id in plot.characterReferencesIDs:
-        character = await character_repository.get_character(char_id)
-        if not character:
+        self._requested_ids.update(missing_ids)
+
+        characters = await self.character_repository.get_characters_by_ids(missing_ids)
+        for character in characters:
+            self._characters[character.id] = character
+
+    async def resolve(self, character_ids: Iterable[int]) -> list:
+        character_ids = list(character_ids)
+        await self.prefetch(character_ids)
+
+        if any(char_id not in self._characters for char_id in character_ids):
             raise HTTPException(
                 status_code=422,
                 detail="Some of the characters referenced in this plot do not exist",
             )
-        character_list.append(
-            CharacterSchema(
-                id=character.id,
-                name=character.name,
-                importance=character.importance,
-                characteristics=character.characteristics,
-                motivation=character.motivation,
-                objetive=character.objetive,
-                conflict=character.conflict,
-                epiphany=character.epiphany,
-                resumePhrase=character.resumePhrase,
-                projectID=character.projectID,
-            )
-        )
+        return [self._characters[char_id] for char_id in character_ids]
 
+
+def character_in_plot_schema(character) -> CharacterSchema:
+    return CharacterSchema(
+        id=character.id,
+        name=character.name,
+        importance=character.importance,
+        characteristics=character.characteristics,
+        motivation=character.motivation,
+        objetive=character.objetive,
+        conflict=character.conflict,
+        epiphany=character.epiphany,
+        resumePhrase=character.resumePhrase,
+        projectID=character.projectID,
+    )
+
+
+def plot_with_steps_schema(plot, steps, characters) -> PlotSchemaWithSteps:
     steps_list = []
-    for step in steps_sequence:
+    for step in steps:
         steps_list.append(
             PlotStepSchema(
                 id=step.id,
@@ -61,7 +88,7 @@ async def plot_with_steps_factory(
             )
         )
 
-    plot_with_steps_and_chars = PlotSchemaWithSteps(
+    return PlotSchemaWithSteps(
         id=plot.id,
         projectID=plot.projectID,
         title=plot.title,
@@ -70,10 +97,25 @@ async def plot_with_steps_factory(
         result=plot.result,
         importance=plot.importance,
         plotSteps=steps_list,
-        characters=character_list,
+        characters=[character_in_plot_schema(char) for char in characters],
     )
 
-    return plot_with_steps_and_chars
+
+async def plot_with_steps_factory(
+    plot_repository: PlotRepository,
+    character_repository: CharacterRepository,
+    plot_id: int,
+    character_lookup: CharacterLookup = None,
+) -> PlotSchemaWithSteps:
+    if character_lookup is None:
+        character_lookup = CharacterLookup(character_repository)
+
+    steps_sequence = await plot_repository.get_plot_step_list(plot_id)
+    plot = await plot_repository.get_plot(plot_id)
+
+    character_list = await character_lookup.resolve(plot.characterReferencesIDs)
+
+    return plot_with_steps_schema(plot, steps_sequence, character_list)
 
 
 async def plot_list_with_steps_factory(
@@ -85,13 +127,42 @@ async def plot_list_with_steps_factory(
     if len(plots) == 0:
         return []
 
+    # Load every character referenced by the project plots in one query
+    character_lookup = CharacterLookup(character_repository)
+    await character_lookup.prefetch(
+        char_id for plot in plots for char_id in plot.characterReferencesIDs
+    )
+
     plots_list = []
 
     for plot in plots:
         plots_list.append(
             await plot_with_steps_factory(
-                plot_repository, character_repository, plot.id
+                plot_repository, character_repository, plot.id, character_lookup
             )
         )
 
     return plots_list
+
+
+async def plot_list_from_project_aggregate(
+    project,
+    character_repository: CharacterRepository,
+) -> list[PlotSchemaWithSteps]:
+    """
+    Builds the plots of a project loaded with
+    ProjectRepository.get_project_aggregate, reusing its eager loaded steps
+    and characters instead of querying them plot by plot.
+    """
+    character_lookup = CharacterLookup(character_repository, project.characters)
+    # Characters referenced from other projects are fetched in a single query
+    await character_lookup.prefetch(
+        char_id for plot in project.plots for char_id in plot.characterReferencesIDs
+    )
+
+    plots_list = []
+    for plot in project.plots:
+        character_list = await character_lookup.resolve(plot.characterReferencesIDs)
+        plots_list.append(plot_with_steps_schema(plot, plot.steps, character_list))
+
+    return plots_list
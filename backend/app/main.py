@@ -1,7 +1,10 @@
-from backend.app.router.sections.manuscript_router import manuscript_router
+from backend.app.router.sections.manuscript_router import (
+    manuscript_router,
+    manuscript_manager,
+)
 from backend.app.router.sections.plot_router import plot_router
 from backend.app.data.entities.project_entities import Base
-from backend.app.data.db.db import engine
+from backend.app.data.db.db import engine, sqlite_profile, settings
 from backend.app.data.entities.sections.character_entities import Character
 from backend.app.data.entities.sections.plot_entities import Plot, PlotStep
 from backend.app.data.entities.sections.references_entities import ReferenceBase
@@ -10,21 +13,49 @@ from backend.app.data.entities.sections.world_entities import World, WorldElemen
 from backend.app.router.sections.character_router import character_router
 from backend.app.router.sections.world_router import world_router
 from backend.app.router.project_router import projects_router
+from backend.app.middleware.request_metrics import (
+    MetricsJSONResponse,
+    RequestMetricsMiddleware,
+    install_query_counter,
+    metrics_router,
+)
 
-from contextlib import asynccontextmanager
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager, suppress
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy import event
 
+logger = logging.getLogger(__name__)
+
 
 @event.listens_for(engine.sync_engine, "connect")
-def enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+def configure_sqlite_connection(dbapi_connection, connection_record):
     cursor = dbapi_connection.cursor()
-    cursor.execute("PRAGMA foreign_keys=ON")
+    for pragma in sqlite_profile.pragmas():
+        cursor.execute(pragma)
     cursor.close()
 
 
+async def flush_autosaves():
+    """
+    Writes the queued autosaves, trying once more those that failed, and logs
+    the files that still could not be written.
+    """
+    result = await manuscript_manager.flush_manuscript_autosaves()
+    if result["failed"]:
+        result = await manuscript_manager.flush_manuscript_autosaves()
+    for failure in result["failed"]:
+        logger.error(
+            "Autosave of %s could not be written: %s",
+            os.path.relpath(failure["saved"], manuscript_manager.UPLOAD_DIR),
+            failure["detail"],
+        )
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     async with engine.begin() as conn:
@@ -52,16 +83,33 @@ async def lifespan(app: FastAPI):
         await conn.run_sync(
             Character.metadata.create_all,
         )
+    session_cleanup = asyncio.create_task(manuscript_manager.run_session_cleanup())
     yield
+    session_cleanup.cancel()
+    with suppress(asyncio.CancelledError):
+        await session_cleanup
+    # Queued autosaves are written before the executor stops
+    await flush_autosaves()
+    await manuscript_manager.upload_files.close_all()
+    manuscript_manager.search_executor.shutdown(wait=False, cancel_futures=True)
+    # Pending moves and deletes are finished before exiting
+    manuscript_manager.fs_executor.shutdown(wait=True)
 
 
-app = FastAPI(lifespan=lifespan)
+app = FastAPI(lifespan=lifespan, default_response_class=MetricsJSONResponse)
 app.include_router(projects_router)
 app.include_router(world_router)
 app.include_router(character_router)
 app.include_router(plot_router)
 app.include_router(manuscript_router)
 
+if settings.request_metrics_enabled:
+    install_query_counter(engine.sync_engine)
+    app.add_middleware(RequestMetricsMiddleware)
+
+if settings.request_metrics_endpoint_enabled:
+    app.include_router(metrics_router)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # ⚠️ Esto permite TODOS los orígenes
@@ -0,0 +1,192 @@
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from backend.app.domain.manuscript_manager import ManuscriptManager
+
+
+class RequestMetrics:
+    """Counters collected while a single request is being handled."""
+
+    def __init__(self):
+        self.query_count = 0
+        self.db_ms = 0.0
+        self.serialization_ms = 0.0
+
+    def server_timing(self, total_ms: float) -> str:
+        return ", ".join(
+            [
+                f'db;dur={self.db_ms:.2f};desc="{self.query_count} queries"',
+                f"serialization;dur={self.serialization_ms:.2f}",
+                f"total;dur={total_ms:.2f}",
+            ]
+        )
+
+
+current_request_metrics: ContextVar[Optional[RequestMetrics]] = ContextVar(
+    "current_request_metrics", default=None
+)
+
+
+def install_query_counter(sync_engine: Engine):
+    """
+    Hooks the engine cursor events so every statement executed while a request
+    is in flight is added to that request's RequestMetrics.
+    """
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        if current_request_metrics.get() is not None:
+            conn.info["request_metrics_started_at"] = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, many):
+        metrics = current_request_metrics.get()
+        started_at = conn.info.pop("request_metrics_started_at", None)
+        if metrics is None or started_at is None:
+            return
+        metrics.query_count += 1
+        metrics.db_ms += (time.perf_counter() - started_at) * 1000
+
+
+class MetricsJSONResponse(JSONResponse):
+    """JSONResponse that adds its rendering time to the request serialization time."""
+
+    def render(self, content) -> bytes:
+        started_at = time.perf_counter()
+        body = super().render(content)
+        metrics = current_request_metrics.get()
+        if metrics is not None:
+            metrics.serialization_ms += (time.perf_counter() - started_at) * 1000
+        return body
+
+
+class RequestMetricsRegistry:
+    """Per-route aggregates of the request metrics, kept in process memory."""
+
+    def __init__(self):
+        self._routes = {}
+
+    def record(self, route: str, metrics: RequestMetrics, total_ms: float):
+        stats = self._routes.setdefault(
+            route,
+            {
+                "route": route,
+                "requests": 0,
+                "queries": 0,
+                "max_queries": 0,
+                "db_ms": 0.0,
+                "serialization_ms": 0.0,
+                "total_ms": 0.0,
+            },
+        )
+        stats["requests"] += 1
+        stats["queries"] += metrics.query_count
+        stats["max_queries"] = max(stats["max_queries"], metrics.query_count)
+        stats["db_ms"] += metrics.db_ms
+        stats["serialization_ms"] += metrics.serialization_ms
+        stats["total_ms"] += total_ms
+
+    def snapshot(self) -> list[dict]:
+        routes = []
+        for stats in self._routes.values():
+            requests = stats["requests"]
+            routes.append(
+                {
+                    **stats,
+                    "avg_queries": stats["queries"] / requests,
+                    "avg_db_ms": stats["db_ms"] / requests,
+                    "avg_total_ms": stats["total_ms"] / requests,
+                }
+            )
+        return sorted(routes, key=lambda stats: stats["queries"], reverse=True)
+
+    def reset(self):
+        self._routes.clear()
+
+
+request_metrics_registry = RequestMetricsRegistry()
+
+# Registry key of the requests no route handled, e.g. 404s of scanners, so
+# unknown URLs and methods don't add entries to the registry
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def route_key(scope) -> str:
+    """Method and path template of the route that handled the request."""
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    methods = getattr(route, "methods", None)
+    if path is None or (methods is not None and scope["method"] not in methods):
+        return UNMATCHED_ROUTE
+    return f"{scope['method']} {path}"
+
+
+class RequestMetricsMiddleware:
+    """
+    ASGI middleware that collects RequestMetrics for every HTTP request and
+    exposes them through the Server-Timing response header.
+    """
+
+    def __init__(self, app, registry: RequestMetricsRegistry = None):
+        self.app = app
+        self.registry = registry or request_metrics_registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = RequestMetrics()
+        token = current_request_metrics.set(metrics)
+        started_at = time.perf_counter()
+
+        async def send_with_server_timing(message):
+            if message["type"] == "http.response.start":
+                total_ms = (time.perf_counter() - started_at) * 1000
+                headers = list(message.get("headers", []))
+                headers.append(
+                    (b"server-timing", metrics.server_timing(total_ms).encode())
+                )
+                headers.append((b"timing-allow-origin", b"*"))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_server_timing)
+        finally:
+            current_request_metrics.reset(token)
+            self.registry.record(
+                route_key(scope), metrics, (time.perf_counter() - started_at) * 1000
+            )
+
+
+metrics_router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+
+@metrics_router.get("/requests")
+async def get_request_metrics():
+    return {"routes": request_metrics_registry.snapshot()}
+
+
+@metrics_router.delete("/requests")
+async def reset_request_metrics():
+    request_metrics_registry.reset()
+    return {"ok": True}
+
+
+@metrics_router.get("/filesystem")
+async def get_filesystem_metrics():
+    """Queue depth and wait times of the manuscript filesystem thread pool."""
+    return ManuscriptManager.fs_executor.stats()
+
+
+@metrics_router.delete("/filesystem")
+async def reset_filesystem_metrics():
+    ManuscriptManager.fs_executor.reset_stats()
+    return {"ok": True}
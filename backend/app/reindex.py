@@ -0,0 +1,29 @@
+import argparse
+import asyncio
+
+from backend.app.domain.manuscript_manager import ManuscriptManager
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Rebuild the metadata and full-text indexes of the manuscripts"
+    )
+    parser.add_argument(
+        "project_ids", nargs="*", type=int, help="Projects to reindex, all by default"
+    )
+    args = parser.parse_args()
+
+    manager = ManuscriptManager()
+    if args.project_ids:
+        indexed = {}
+        for project_id in args.project_ids:
+            indexed.update(asyncio.run(manager.reindex_manuscripts(project_id)))
+    else:
+        indexed = asyncio.run(manager.reindex_manuscripts())
+
+    for project_id, files in indexed.items():
+        print(f"Project {project_id}: {files} files indexed")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
+import time
 from datetime import datetime
+from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.app.data.db.db import get_session
@@ -9,14 +11,14 @@ from backend.app.data.respositories.project_repository import ProjectRepository
 from backend.app.data.respositories.sections.character_repository import (
     CharacterRepository,
 )
-from backend.app.data.respositories.sections.plot_repository import PlotRepository
 from backend.app.data.respositories.sections.world_repository import WorldRepository
-from backend.app.domain.plot_utils import plot_list_with_steps_factory
+from backend.app.domain.plot_utils import plot_list_from_project_aggregate
 from backend.app.domain.project_utils import (
     create_project_object_from_request,
     project_schema_factory,
     project_on_response_list,
 )
+from backend.app.router.sections.manuscript_router import manuscript_manager
 
 from backend.app.schemas.project_schemas import (
     BaseProjectSchema,
@@ -74,37 +76,32 @@ async def get_project(id: int, session: AsyncSession = Depends(get_session)):
     project_repository = ProjectRepository(session)
     character_repository = CharacterRepository(session)
     world_repository = WorldRepository(session)
-    plot_repository = PlotRepository(session)
 
-    project = await project_repository.get_project(id)
-    character_list = await character_repository.get_list_by_project_id(id)
-    plots_with_steps = await plot_list_with_steps_factory(
-        plot_repository, character_repository, id
-    )
+    project = await project_repository.get_project_aggregate(id)
 
     if project is None:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    world = await world_repository.get_world_by_project_id(id)
+    plots_with_steps = await plot_list_from_project_aggregate(
+        project, character_repository
+    )
+
+    world = project.world
 
     if world is None:
         new_world = await world_repository.create_world(id)
         return project_schema_factory(
             project,
             new_world,
-            characters=character_list,
+            characters=project.characters,
             plots_with_steps=plots_with_steps,
         )
 
-    world_elements = []
-    if world:
-        world_elements = await world_repository.get_world_elements(world_id=world.id)
-
     return project_schema_factory(
         project,
         world,
-        world_elements,
-        characters=character_list,
+        world.elements,
+        characters=project.characters,
         plots_with_steps=plots_with_steps,
     )
 
@@ -126,23 +123,96 @@ async def delete_project(project_id: int, session: AsyncSession = Depends(get_se
     return {"id": project_id}
 
 
+@projects_router.get("/projects/{project_id}/word-stats")
+async def get_word_stats(project_id: int, session: AsyncSession = Depends(get_session)):
+    """
+    Word goal and word counts of a project, with the words of every chapter.
+    The counts are computed from the saved manuscripts, the words stored in
+    the project are updated by POST /projects/{project_id}/word-stats/recompute.
+    """
+    repository = ProjectRepository(session)
+    project = await repository.get_project(project_id)
+
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    stats = await manuscript_manager.get_word_stats(project_id)
+    return {"wordGoal": project.word_goal, **stats}
+
+
+@projects_router.post("/projects/{project_id}/word-stats/recompute")
+async def recompute_word_stats(
+    project_id: int, session: AsyncSession = Depends(get_session)
+):
+    """
+    Computes the word counts of a project from the saved manuscripts and
+    stores the total in the project.
+    """
+    repository = ProjectRepository(session)
+    project = await repository.get_project(project_id)
+
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    stats = await manuscript_manager.get_word_stats(project_id)
+    if project.words != stats["words"]:
+        project.words = stats["words"]
+        await repository.update_project(project)
+
+    return {"wordGoal": project.word_goal, **stats}
+
+
 @projects_router.patch("/projects/{project_id}/word-stats")
 async def update_word_stats(
     project_id: int, data: WordStatsUpdate, session: AsyncSession = Depends(get_session)
 ):
+    """
+    Updates the word goal. The words of the project are always computed from
+    the saved manuscripts, a `words` value sent by the client is ignored.
+    """
     repository = ProjectRepository(session)
     project = await repository.get_project(project_id)
 
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
+    stats = await manuscript_manager.get_word_stats(project_id)
     if data.wordGoal is not None:
         project.word_goal = data.wordGoal
-    if data.words is not None:
-        project.words = data.words
+    project.words = stats["words"]
 
     await repository.update_project(project)
-    return {"message": "Word stats updated successfully"}
+    return {
+        "message": "Word stats updated successfully",
+        "wordGoal": project.word_goal,
+        **stats,
+    }
+
+
+@projects_router.get("/projects/{project_id}/word-history")
+async def get_word_history(
+    project_id: int,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    resolution: str = Query("day", pattern="^(minute|hour|day)$"),
+    path: Optional[str] = None,
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Word count history of a project, or of one manuscript file, for progress
+    charts. `start` and `end` are Unix times, the last 30 days by default.
+    """
+    repository = ProjectRepository(session)
+    project = await repository.get_project(project_id)
+
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    end = time.time() if end is None else end
+    start = end - 30 * 24 * 60 * 60 if start is None else start
+    return await manuscript_manager.get_word_history(
+        project_id, start, end, resolution=resolution, path=path
+    )
 
 
 # ─── Endpoint ───
@@ -1,22 +1,58 @@
-from urllib.parse import unquote
+import hashlib
+import json
+import mimetypes
+import os
+from email.utils import formatdate
+from urllib.parse import quote, unquote
 
-from fastapi import APIRouter, UploadFile, File, Form
+from typing import AsyncIterator, Optional
+
+from fastapi import (
+    APIRouter,
+    UploadFile,
+    File,
+    Form,
+    HTTPException,
+    Request,
+    Query,
+    Header,
+    Response,
+)
+from fastapi.responses import FileResponse, StreamingResponse
 
 from backend.app.domain.manuscript_manager import ManuscriptManager
+from backend.app.domain.manuscript_tree_cache import etag_matches
 from backend.app.schemas.sections.manuscript_schemas import (
+    SHA256_PATTERN,
+    SaveCheckRequest,
+    SavePatchRequest,
     SaveStartRequest,
     GetManuscriptContentRequest,
+    GetManuscriptContentsRequest,
+    GetManuscriptPageRequest,
 )
 
 manuscript_router = APIRouter(prefix="/manuscript", tags=["Manuscript API"])
 manuscript_manager = ManuscriptManager()
 
 
+async def ndjson_lines(results: AsyncIterator[dict]) -> AsyncIterator[str]:
+    async for result in results:
+        yield json.dumps(result) + "\n"
+
+
+# 0 - Optional pre-check, skips the upload when the stored file has the same content
+@manuscript_router.post("/save/check")
+async def check_save(request: SaveCheckRequest):
+
+    return await manuscript_manager.check_manuscript_unchanged(request)
+
+
 # 1 - Save Chunks using UploadFile
 @manuscript_router.post("/save/start")
 async def start_save(request: SaveStartRequest):
 
-    session_id = manuscript_manager.start_manuscript_save_session(request)
+    session_id = await manuscript_manager.start_manuscript_save_session(request)
 
     return {"session_id": session_id}
 
@@ -24,14 +60,37 @@ async def start_save(request: SaveStartRequest):
 # 2 - Save Chunks using UploadFile
 @manuscript_router.post("/save/chunk/{session_id}")
 async def save_chunk(
-    session_id: str, file: UploadFile = File(...), relative_path: str = Form(...)
+    session_id: str,
+    file: UploadFile = File(...),
+    relative_path: str = Form(...),
+    offset: Optional[int] = Form(None, ge=0),
 ):
 
-    await manuscript_manager.save_manuscript_chunk(session_id, file)
+    await manuscript_manager.save_manuscript_chunk(session_id, file, offset)
 
     return {"ok": True}
 
 
+# 2b - Save Chunks streaming the raw request body, without multipart parsing
+@manuscript_router.post("/save/chunk/{session_id}/raw")
+async def save_chunk_raw(
+    session_id: str, request: Request, offset: Optional[int] = Query(None, ge=0)
+):
+
+    await manuscript_manager.save_manuscript_chunk_stream(
+        session_id, request.stream(), offset
+    )
+
+    return {"ok": True}
+
+
+# Upload progress, used to resume a session and retry missing chunks
+@manuscript_router.get("/save/status/{session_id}")
+async def save_status(session_id: str):
+
+    return await manuscript_manager.get_manuscript_save_status(session_id)
+
+
 # 3 - Finish Save Session - Make temp files persist.
 @manuscript_router.post("/save/finish/{session_id}")
 async def finish_save(session_id: str):
@@ -39,6 +98,75 @@ async def finish_save(session_id: str):
     return await manuscript_manager.finish_manuscript_save_session(session_id)
 
 
+# Save an edit as a diff against the stored content, without the upload session
+@manuscript_router.post("/save/patch")
+async def patch_save(request: SavePatchRequest):
+    """
+    Apply a unified `diff`, or `ops` ({"retain": n}, {"insert": text},
+    {"delete": n}), to the stored file whose SHA-256 is `base_hash`.
+
+    Answers 409 when the stored file is not the base: the client then saves
+    the full content through /save/start.
+    """
+    return await manuscript_manager.patch_manuscript(request)
+
+
+# Save a small file in one request, the body is the whole content
+@manuscript_router.put("/project/{project_id}/file/{path:path}")
+async def save_file(
+    project_id: int,
+    path: str,
+    request: Request,
+    content_hash: Optional[str] = Query(None, pattern=SHA256_PATTERN),
+):
+    """
+    Save a file of up to ELEUTERIA_MANUSCRIPT_SMALL_SAVE_MAX_SIZE bytes with
+    the raw request body, atomically, without an upload session. Larger
+    files answer 413 and go through /save/start.
+
+    Examples:
+        PUT /manuscript/project/123/file/chapters/intro.md
+        PUT /manuscript/project/123/file/intro.md?content_hash=9f86d0...
+    """
+    return await manuscript_manager.save_manuscript_file(
+        project_id, path, request.stream(), content_hash
+    )
+
+
+# Autosave, saves of the same file are coalesced and written after a short delay
+@manuscript_router.post("/project/{project_id}/autosave/flush")
+async def flush_autosaves(project_id: int, path: str = Query("")):
+    """
+    Write the pending autosaves of the project, or of one file or directory,
+    now. Failed writes are listed in "failed" and stay pending.
+
+    Examples:
+        POST /manuscript/project/123/autosave/flush
+        POST /manuscript/project/123/autosave/flush?path=chapters/intro.md
+    """
+    return await manuscript_manager.flush_manuscript_autosaves(project_id, path)
+
+
+@manuscript_router.put("/project/{project_id}/autosave/{path:path}", status_code=202)
+async def autosave_file(
+    project_id: int,
+    path: str,
+    request: Request,
+    content_hash: Optional[str] = Query(None, pattern=SHA256_PATTERN),
+):
+    """
+    Queue a save like PUT /project/{project_id}/file/{path}. Only the latest
+    content of a file is written, ELEUTERIA_MANUSCRIPT_AUTOSAVE_DELAY seconds
+    after its last autosave.
+
+    Examples:
+        PUT /manuscript/project/123/autosave/chapters/intro.md
+    """
+    return await manuscript_manager.autosave_manuscript_file(
+        project_id, path, request.stream(), content_hash
+    )
+
+
 @manuscript_router.delete("/project/{project_id}/file/{path:path}")
 async def delete_file(project_id: int, path: str):
     """
@@ -75,6 +203,238 @@ async def get_file_content(request: GetManuscriptContentRequest):
     return {"content": content}
 
 
+@manuscript_router.post("/content/page")
+async def get_file_page(request: GetManuscriptPageRequest):
+    """
+    Read one window of a long file: `length` bytes from `offset`, or `lines`
+    lines from `line`. Request the next window with the returned `next_offset`
+    (or `next_line`) until `eof` is true.
+    """
+    return await manuscript_manager.get_manuscript_file_page(
+        request.project_id,
+        request.path,
+        offset=request.offset,
+        length=request.length,
+        line=request.line,
+        lines=request.lines,
+    )
+
+
+def _byte_range(http_range: str, size: int) -> Optional[tuple[int, int]]:
+    """
+    Start and end (excluded) of a single bytes range of a Range header, None
+    for several ranges, which are answered with the whole content.
+
+    Raises:
+        HTTPException (400): If the header is malformed
+        HTTPException (416): If the range starts after the end of the content
+    """
+    units, _, ranges = http_range.partition("=")
+    if units.strip().lower() != "bytes" or not ranges.strip():
+        raise HTTPException(status_code=400, detail="Malformed Range header")
+    if "," in ranges:
+        return None
+    first, _, last = ranges.strip().partition("-")
+    try:
+        if first:
+            start = int(first)
+            end = min(int(last) + 1, size) if last else size
+        else:
+            start, end = max(size - int(last), 0), size
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Malformed Range header")
+    if not 0 <= start < size:
+        raise HTTPException(
+            status_code=416,
+            detail="Range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+    if start >= end:
+        raise HTTPException(status_code=400, detail="Malformed Range header")
+    return start, end
+
+
+def _compressed_file_response(
+    request: Request, full_path: str, compressed: tuple
+) -> StreamingResponse:
+    """
+    Streams the content of a compressed file with the headers and Range
+    handling FileResponse gives plain files: ETag and Last-Modified of the
+    stored file, If-Range, and a single range (206) of the content.
+    """
+    size, stat, blocks = compressed
+    filename = os.path.basename(full_path)
+    quoted = quote(filename)
+    etag_base = f"{stat.st_mtime}-{stat.st_size}".encode()
+    etag = hashlib.md5(etag_base, usedforsecurity=False).hexdigest()
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": (
+            f'inline; filename="{filename}"'
+            if quoted == filename
+            else f"inline; filename*=utf-8''{quoted}"
+        ),
+        "ETag": f'"{etag}"',
+        "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+    }
+    media_type = mimetypes.guess_type(filename)[0] or "text/plain"
+
+    http_range = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    byte_range = None
+    if http_range is not None and if_range in (
+        None,
+        headers["ETag"],
+        headers["Last-Modified"],
+    ):
+        byte_range = _byte_range(http_range, size)
+    if byte_range is None:
+        return StreamingResponse(
+            blocks(),
+            media_type=media_type,
+            headers={**headers, "Content-Length": str(size)},
+        )
+
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end - 1}/{size}"
+    headers["Content-Length"] = str(end - start)
+    return StreamingResponse(
+        blocks(start, end), status_code=206, media_type=media_type, headers=headers
+    )
+
+
+@manuscript_router.get("/project/{project_id}/file/{path:path}")
+async def download_file(project_id: int, path: str, request: Request):
+    """
+    Stream a stored file without loading it in memory.
+
+    Supports HTTP Range requests (206 Partial Content, 416 for unsatisfiable
+    ranges) and If-Range through the ETag and Last-Modified headers. Files
+    stored compressed are streamed decompressed, a range of one is read by
+    decompressing the file up to the end of the range.
+
+    Examples:
+        GET /manuscript/project/123/file/chapters/intro.md
+        GET /manuscript/project/123/file/novel.md  (Range: bytes=0-65535)
+    """
+    full_path = await manuscript_manager.get_manuscript_file_path(project_id, path)
+    compressed = await manuscript_manager.stream_compressed_file(full_path)
+    if compressed is not None:
+        return _compressed_file_response(request, full_path, compressed)
+
+    return FileResponse(
+        full_path,
+        filename=os.path.basename(full_path),
+        content_disposition_type="inline",
+    )
+
+
+@manuscript_router.get("/project/{project_id}/history/{path:path}")
+async def list_revisions(project_id: int, path: str):
+    """
+    List the saved revisions of a file, newest first. Deleted files keep
+    their history.
+
+    Examples:
+        GET /manuscript/project/123/history/chapters/intro.md
+    """
+    revisions = await manuscript_manager.list_manuscript_revisions(project_id, path)
+    return {"revisions": revisions}
+
+
+@manuscript_router.get("/project/{project_id}/revision/{revision_id}")
+async def get_revision(project_id: int, revision_id: int):
+    """
+    Fetch a saved revision of a file with its content.
+
+    Examples:
+        GET /manuscript/project/123/revision/42
+    """
+    return await manuscript_manager.get_manuscript_revision(project_id, revision_id)
+
+
+@manuscript_router.get("/project/{project_id}/revision/{revision_id}/diff")
+async def diff_revision(
+    project_id: int, revision_id: int, against: Optional[int] = Query(None)
+):
+    """
+    Unified diff from a revision to the current file, or to the revision
+    given in `against`.
+
+    Examples:
+        GET /manuscript/project/123/revision/42/diff
+        GET /manuscript/project/123/revision/42/diff?against=45
+    """
+    return await manuscript_manager.diff_manuscript_revision(
+        project_id, revision_id, against
+    )
+
+
+@manuscript_router.post("/content/batch")
+async def get_files_content(request: GetManuscriptContentsRequest):
+    """
+    Read many files in one request, e.g. every scene of a chapter.
+
+    The body gives either `paths` (relative to the project root) or a chapter
+    `directory`. Files are read concurrently and streamed back as NDJSON, one
+    `{"path", "content"}` object per line in the requested order, or
+    `{"path", "error": {"status_code", "detail"}}` for files that can't be read.
+    """
+    paths = await manuscript_manager.resolve_manuscript_content_paths(
+        request.project_id, request.paths, request.directory
+    )
+    results = manuscript_manager.stream_manuscript_contents(request.project_id, paths)
+    return StreamingResponse(ndjson_lines(results), media_type="application/x-ndjson")
+
+
+@manuscript_router.get("/search/{project_id}")
+async def search_files(
+    project_id: int,
+    q: str = Query(..., min_length=1),
+    regex: bool = False,
+    case_sensitive: bool = False,
+    limit: int = Query(200, gt=0, le=10000),
+):
+    """
+    Full-text search over the scenes of a project.
+
+    Matches are streamed as NDJSON as soon as each file has been searched, one
+    `{"path", "line", "match", "snippet"}` object per line.
+
+    Examples:
+        GET /manuscript/search/123?q=dragon
+        GET /manuscript/search/123?q=chapter%20[0-9]%2B&regex=true
+    """
+    results = await manuscript_manager.search_manuscripts(
+        project_id, q, regex=regex, case_sensitive=case_sensitive, limit=limit
+    )
+    return StreamingResponse(ndjson_lines(results), media_type="application/x-ndjson")
+
+
+@manuscript_router.get("/search/{project_id}/ranked")
+async def search_files_ranked(
+    project_id: int,
+    q: str = Query(..., min_length=1),
+    prefix: bool = True,
+    limit: int = Query(50, gt=0, le=1000),
+):
+    """
+    Ranked search over the full-text index of a project.
+
+    Returns the files containing every word of the query, best matches first,
+    each with a snippet where the matches are wrapped in `<mark>` tags. Words
+    match as prefixes unless `prefix=false`.
+
+    Examples:
+        GET /manuscript/search/123/ranked?q=drag
+        GET /manuscript/search/123/ranked?q=dragon%20castle&prefix=false
+    """
+    results = await manuscript_manager.search_manuscript_index(
+        project_id, q, prefix=prefix, limit=limit
+    )
+    return {"results": results}
+
+
 @manuscript_router.get(
     "/list/{project_id}",
     responses={
@@ -122,6 +482,7 @@ async def get_file_content(request: GetManuscriptContentRequest):
                 }
             },
         },
+        304: {"description": "The listing did not change since the given ETag"},
         404: {
             "description": "Project directory not found",
             "content": {
@@ -152,7 +513,11 @@ async def get_file_content(request: GetManuscriptContentRequest):
         },
     },
 )
-async def list_directory(project_id: int):
+async def list_directory(
+    project_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+):
     """
     List all directories and their files in the manuscript storage.
 
@@ -162,6 +527,7 @@ async def list_directory(project_id: int):
 
     Args:
         project_id (int): The project identifier
+        if_none_match (str): Optional ETag of a listing the client already has
 
     Returns:
         dict: Directory listing with grouped structure containing:
@@ -184,9 +550,21 @@ async def list_directory(project_id: int):
         - All files in "scenes/" directory (including subdirectories) are listed under scenes
         - Each directory entry contains its complete file inventory
 
+    Caching:
+        The response carries an ETag. Sending it back in If-None-Match returns
+        304 Not Modified, without walking the project, while nothing was
+        saved or deleted in the project.
+
     Raises:
         HTTPException (404): If the project directory doesn't exist
         HTTPException (403): If insufficient permissions to read the project directory
         HTTPException (500): If an unexpected OSError occurs during directory traversal
     """
-    return await manuscript_manager.list_directory_contents(project_id)
+    listing, etag = await manuscript_manager.get_directory_listing(project_id)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return listing
@@ -1,4 +1,8 @@
-from pydantic import BaseModel
+from typing import Optional
+
+from pydantic import BaseModel, Field, model_validator
+
+SHA256_PATTERN = r"^[0-9a-fA-F]{64}$"
 
 
 class SaveStartRequest(BaseModel):
@@ -6,8 +10,86 @@ class SaveStartRequest(BaseModel):
     relative_path: str
     filename: str
     title: str = None
+    total_size: Optional[int] = Field(default=None, ge=0)
+    content_hash: Optional[str] = Field(default=None, pattern=SHA256_PATTERN)
+
+
+class SaveCheckRequest(BaseModel):
+    project_id: int
+    relative_path: str
+    filename: str
+    content_hash: str = Field(pattern=SHA256_PATTERN)
+
+
+class PatchOperation(BaseModel):
+    """Keeps (retain) or removes (delete) a number of characters, or inserts text."""
+
+    retain: Optional[int] = Field(default=None, gt=0)
+    insert: Optional[str] = None
+    delete: Optional[int] = Field(default=None, gt=0)
+
+    @model_validator(mode="after")
+    def check_single_operation(self):
+        given = [self.retain, self.insert, self.delete]
+        if sum(value is not None for value in given) != 1:
+            raise ValueError("Exactly one of retain, insert or delete must be given")
+        return self
+
+
+class SavePatchRequest(BaseModel):
+    """
+    An edit of the stored file whose SHA-256 is base_hash, as a unified diff
+    or as operations. base_hash is the hash of the stored bytes, or of the
+    text read from /content, whose newlines are "\n". content_hash, when
+    given, is checked against the result.
+    """
+
+    project_id: int
+    relative_path: str
+    filename: str
+    base_hash: str = Field(pattern=SHA256_PATTERN)
+    content_hash: Optional[str] = Field(default=None, pattern=SHA256_PATTERN)
+    diff: Optional[str] = None
+    ops: Optional[list[PatchOperation]] = None
+
+    @model_validator(mode="after")
+    def check_diff_or_ops(self):
+        if (self.diff is None) == (self.ops is None):
+            raise ValueError("Exactly one of diff or ops must be given")
+        return self
 
 
 class GetManuscriptContentRequest(BaseModel):
     project_id: int
     path: str
+
+
+class GetManuscriptContentsRequest(BaseModel):
+    """Either a list of file paths or a chapter directory whose scenes are read."""
+
+    project_id: int
+    paths: Optional[list[str]] = Field(default=None, max_length=1000)
+    directory: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_paths_or_directory(self):
+        if (self.paths is None) == (self.directory is None):
+            raise ValueError("Exactly one of paths or directory must be given")
+        return self
+
+
+class GetManuscriptPageRequest(BaseModel):
+    """A byte window (offset, length) or a line window (line, lines) of a file."""
+
+    project_id: int
+    path: str
+    offset: Optional[int] = Field(default=None, ge=0)
+    length: int = Field(default=64 * 1024, gt=0, le=4 * 1024 * 1024)
+    line: Optional[int] = Field(default=None, ge=0)
+    lines: int = Field(default=200, gt=0, le=10000)
+
+    @model_validator(mode="after")
+    def check_single_window(self):
+        if self.offset is not None and self.line is not None:
+            raise ValueError("Give either offset or line, not both")
+        return self
@@ -4,4 +4,5 @@ from typing import Optional
 
 class WordStatsUpdate(BaseModel):
     wordGoal: Optional[int] = None
+    # Ignored, words are computed from the saved manuscripts
     words: Optional[int] = None
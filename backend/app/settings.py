@@ -0,0 +1,59 @@
+import os
+from functools import lru_cache
+from typing import Mapping, Optional
+
+from pydantic import BaseModel
+
+ENV_PREFIX = "ELEUTERIA_"
+
+
+class Settings(BaseModel):
+    """
+    Backend configuration.
+
+    Every field can be overridden with an environment variable named after it,
+    prefixed with ELEUTERIA_ (e.g. ELEUTERIA_DATABASE_PROFILE=compat).
+    """
+
+    database_url: str = "sqlite+aiosqlite:///./schemas.db"
+    database_profile: str = "tuned"
+    database_echo: bool = False
+
+    query_log_enabled: bool = False
+    query_log_sample_rate: float = 0.01
+    query_log_slow_ms: float = 100.0
+    query_log_file: Optional[str] = None
+
+    request_metrics_enabled: bool = True
+    request_metrics_endpoint_enabled: bool = False
+
+    upload_session_store: str = "memory"
+    upload_session_db: str = "./upload_sessions.db"
+    upload_session_ttl: float = 24 * 60 * 60
+
+    manuscript_fs_workers: int = 8
+    manuscript_fsync: str = "full"
+    manuscript_compression: bool = False
+    manuscript_compression_min_size: int = 4096
+    manuscript_zstd_min_size: int = 1024 * 1024
+    manuscript_small_save_max_size: int = 512 * 1024
+    manuscript_autosave_delay: float = 1.0
+    manuscript_autosave_max_delay: float = 10.0
+    manuscript_history: bool = True
+    manuscript_history_keep: int = 100
+    manuscript_history_max_age_days: float = 90
+
+    @classmethod
+    def from_env(cls, environ: Optional[Mapping[str, str]] = None) -> "Settings":
+        environ = os.environ if environ is None else environ
+        values = {}
+        for field_name in cls.model_fields:
+            env_name = f"{ENV_PREFIX}{field_name.upper()}"
+            if env_name in environ:
+                values[field_name] = environ[env_name]
+        return cls(**values)
+
+
+@lru_cache
+def get_settings() -> Settings:
+    return Settings.from_env()
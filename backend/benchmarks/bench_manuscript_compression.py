@@ -0,0 +1,126 @@
+"""
+Benchmark of the manuscript compression codecs over synthetic prose.
+
+    python -m backend.benchmarks.bench_manuscript_compression [--sizes 4096,65536,1048576,8388608] [--repeat 5]
+
+For each file size, compares storing the file as is with gzip and zstd (when
+the zstandard package is installed): compression and decompression
+throughput, and the disk space saved. The last line gives the savings of the
+default thresholds (see choose_codec()) over a tree holding one file of each
+size.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from backend.app.domain.manuscript_compression import (
+    choose_codec,
+    compress_file,
+    open_stored,
+    zstd_available,
+)
+from backend.app.settings import get_settings
+
+WORDS = (
+    "the of and to a in that was he she it with as his her had for on at by "
+    "dragon castle night silence river letter window morning stranger voice "
+    "remembered whispered suddenly quietly beneath between although because"
+).split()
+
+
+def write_prose(path: str, size: int, seed: int = 0):
+    generator = random.Random(seed)
+    written = 0
+    with open(path, "w", encoding="utf-8") as f:
+        while written < size:
+            sentence = " ".join(generator.choices(WORDS, k=generator.randint(6, 24)))
+            paragraph = f"{sentence.capitalize()}.\n"
+            if generator.random() < 0.2:
+                paragraph += "\n"
+            f.write(paragraph)
+            written += len(paragraph)
+
+
+def read_all(path: str) -> int:
+    total = 0
+    with open_stored(path) as f:
+        while block := f.read(1024 * 1024):
+            total += len(block)
+    return total
+
+
+def measure(function, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="4096,65536,1048576,8388608")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",")]
+
+    codecs = ["gzip"] + (["zstd"] if zstd_available() else [])
+    if not zstd_available():
+        print("zstandard is not installed, only gzip is measured")
+
+    settings = get_settings()
+    tree_before = tree_after = 0
+    with tempfile.TemporaryDirectory() as root:
+        print(
+            f"{'size':>10} {'codec':<6} {'ratio':>7} {'saved':>7} "
+            f"{'compress':>13} {'decompress':>13}"
+        )
+        for size in sizes:
+            source = os.path.join(root, f"prose-{size}.md")
+            write_prose(source, size)
+            size = os.path.getsize(source)
+
+            plain_read = measure(lambda: read_all(source), args.repeat)
+            print(
+                f"{size:>10} {'none':<6} {1:>7.2f} {0:>6.0%} {'-':>13} "
+                f"{size / plain_read / 1e6:>9.0f} MB/s"
+            )
+            for codec in codecs:
+                target = os.path.join(root, f"prose-{size}.{codec}")
+                compress_time = measure(
+                    lambda: compress_file(source, target, codec), args.repeat
+                )
+                stored = os.path.getsize(target)
+                decompress_time = measure(lambda: read_all(target), args.repeat)
+                print(
+                    f"{size:>10} {codec:<6} {size / stored:>7.2f} "
+                    f"{1 - stored / size:>6.0%} "
+                    f"{size / compress_time / 1e6:>8.0f} MB/s "
+                    f"{size / decompress_time / 1e6:>8.0f} MB/s"
+                )
+
+            codec = choose_codec(
+                size,
+                settings.manuscript_compression_min_size,
+                settings.manuscript_zstd_min_size,
+            )
+            tree_before += size
+            if codec is None:
+                tree_after += size
+            else:
+                target = os.path.join(root, f"prose-{size}.{codec}")
+                tree_after += min(size, os.path.getsize(target))
+
+    print(
+        f"Default thresholds: {tree_before} -> {tree_after} bytes "
+        f"({1 - tree_after / tree_before:.0%} saved)"
+    )
+
+
+if __name__ == "__main__":
+    main()
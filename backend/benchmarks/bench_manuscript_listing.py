@@ -0,0 +1,160 @@
+"""
+Benchmark of the manuscript listing walkers over a synthetic project.
+
+    python -m backend.benchmarks.bench_manuscript_listing [--files 10000] [--repeat 7]
+
+Compares walk_chapters() with the os.walk() loop that list_directory_contents
+used before it, copied as it was (it returns no size), and with the os.stat()
+per listed file it would need to return the sizes and modification times
+walk_chapters() reports.
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from backend.app.domain.manuscript_listing import walk_chapters
+
+
+def build_project(root: str, files: int, chapters: int = 50, subdirectories: int = 4):
+    """
+    Half of the files are scenes directly in the chapters, the other half
+    are in subdirectories of the chapters, which are not listed.
+    """
+    per_directory = max(1, files // (2 * chapters * subdirectories))
+    for chapter in range(chapters):
+        chapter_path = os.path.join(root, f"chapter-{chapter:03}")
+        for subdirectory in range(subdirectories):
+            directory = os.path.join(chapter_path, f"part-{subdirectory}")
+            os.makedirs(directory)
+            for scene in range(per_directory):
+                for parent in (chapter_path, directory):
+                    name = f"scene-{subdirectory}-{scene:04}.md"
+                    with open(os.path.join(parent, name), "w") as f:
+                        f.write("Lorem ipsum dolor sit amet. " * 8)
+    # Hidden directories that the listing should not pay for
+    for hidden in range(files // 10):
+        directory = os.path.join(root, "chapter-000", ".history", str(hidden % 20))
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f"{hidden}.md"), "w") as f:
+            f.write("old")
+
+
+def baseline_listing(project_path: str, stat_files: bool = False) -> list:
+    """
+    The loop of list_directory_contents before walk_chapters(), unchanged
+    but for the optional os.stat() of each listed file.
+    """
+    directories_data = {}
+    for root, dirs, files in os.walk(project_path):
+        # Calculate relative path from project root
+        relative_root = os.path.relpath(root, project_path)
+        if relative_root == ".":
+            relative_root = ""
+
+        # For root level, process directories
+        if relative_root == "":
+            for dir_name in sorted(dirs):
+                # Skip hidden directories
+                if dir_name.startswith("."):
+                    continue
+
+                directories_data[dir_name] = {
+                    "title": dir_name,
+                    "path": dir_name,
+                    "scenes": [],
+                }
+
+        # For any directory (including subdirectories), collect files
+        if relative_root in directories_data or relative_root == "":
+            for file_name in sorted(files):
+                # Skip hidden files and metadata files
+                if file_name.startswith(".") or file_name == "metadata.json":
+                    continue
+
+                file_full_path = os.path.join(root, file_name)
+
+                # Construct file relative path
+                if relative_root:
+                    file_relative_path = f"{relative_root}/{file_name}"
+                else:
+                    file_relative_path = file_name
+
+                file_entry = {
+                    "title": file_name,
+                    "path": file_relative_path,
+                    "content": "",
+                }
+                if stat_files:
+                    stat = os.stat(file_full_path)
+                    file_entry["size"] = stat.st_size
+                    file_entry["modified_at"] = stat.st_mtime
+
+                # Add to appropriate directory or root
+                if relative_root == "":
+                    pass
+                elif relative_root in directories_data:
+                    directories_data[relative_root]["scenes"].append(file_entry)
+                else:
+                    parent_dir = relative_root.split("/")[0]
+                    if parent_dir in directories_data:
+                        directories_data[parent_dir]["scenes"].append(file_entry)
+
+    # Convert directories_data to entries list
+    chapters = list(directories_data.values())
+
+    # Sort entries by directory name
+    chapters.sort(key=lambda x: x["title"])
+    return chapters
+
+
+def measure(function, repeat: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        build_project(root, args.files)
+        scenes = sum(len(chapter["scenes"]) for chapter in walk_chapters(root))
+        print(
+            f"Synthetic project: {scenes} listed scenes, {args.files - scenes} "
+            f"nested files, {args.files // 10} hidden files"
+        )
+
+        # Same chapters and scenes, walk_chapters() adds size and modified_at
+        assert [
+            [scene["path"] for scene in chapter["scenes"]]
+            for chapter in baseline_listing(root)
+        ] == [
+            [scene["path"] for scene in chapter["scenes"]]
+            for chapter in walk_chapters(root)
+        ]
+
+        candidates = {
+            "baseline (no size)": lambda: baseline_listing(root),
+            "baseline + os.stat": lambda: baseline_listing(root, stat_files=True),
+            "walk_chapters (scandir)": lambda: walk_chapters(root),
+        }
+        for name, function in candidates.items():
+            function()  # warm the dentry cache
+            timings = measure(function, args.repeat)
+            print(
+                f"{name:<26} min {min(timings) * 1000:8.1f} ms   "
+                f"median {statistics.median(timings) * 1000:8.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import json
+import logging
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from backend.app.data.db.query_log import (
+    QueryLogger,
+    configure_query_logger,
+    normalize_statement,
+    statement_fingerprint,
+)
+
+
+def test_normalize_statement_replaces_literals():
+    statement = "SELECT *  FROM characters\n WHERE name = 'Ana' AND importance > 3"
+
+    assert (
+        normalize_statement(statement)
+        == "SELECT * FROM characters WHERE name = ? AND importance > ?"
+    )
+
+
+def test_fingerprint_ignores_in_list_length():
+    short = "SELECT * FROM characters WHERE id IN (?, ?)"
+    long = "SELECT * FROM characters WHERE id IN (?, ?, ?, ?, ?)"
+
+    assert statement_fingerprint(short) == statement_fingerprint(long)
+    assert statement_fingerprint(short) != statement_fingerprint(
+        "SELECT * FROM plots WHERE id IN (?, ?)"
+    )
+
+
+@pytest.fixture
+def records():
+    logger = logging.getLogger("tests.query_log")
+    logger.setLevel(logging.INFO)
+    captured = []
+
+    class ListHandler(logging.Handler):
+        def emit(self, record):
+            captured.append(record)
+
+    handler = ListHandler()
+    logger.addHandler(handler)
+    yield logger, captured
+    logger.removeHandler(handler)
+
+
+async def run_statements(query_logger: QueryLogger):
+    engine = create_async_engine("sqlite+aiosqlite://")
+    query_logger.install(engine.sync_engine)
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE notes (id INTEGER, body TEXT)"))
+        await conn.execute(text("INSERT INTO notes VALUES (1, 'a'), (2, 'b')"))
+        await conn.execute(text("SELECT * FROM notes WHERE id = 1"))
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_query_logger_records_structured_entries(records):
+    logger, captured = records
+
+    await run_statements(QueryLogger(sample_rate=1.0, logger=logger))
+
+    entries = [json.loads(record.getMessage()) for record in captured]
+    insert = next(e for e in entries if e["statement"].startswith("INSERT"))
+    select = next(e for e in entries if e["statement"].startswith("SELECT *"))
+
+    assert insert["row_count"] == 2
+    assert select["row_count"] is None
+    assert select["statement"] == "SELECT * FROM notes WHERE id = ?"
+    assert select["fingerprint"] == statement_fingerprint(select["statement"])
+    assert select["duration_ms"] >= 0
+    assert select["slow"] is False
+
+
+@pytest.mark.asyncio
+async def test_query_logger_sampling_skips_fast_statements(records):
+    logger, captured = records
+
+    await run_statements(
+        QueryLogger(sample_rate=0.5, logger=logger, random_source=lambda: 0.9)
+    )
+
+    assert captured == []
+
+
+@pytest.mark.asyncio
+async def test_query_logger_always_logs_slow_statements(records):
+    logger, captured = records
+
+    await run_statements(
+        QueryLogger(
+            sample_rate=0.0,
+            slow_query_ms=0.0,
+            logger=logger,
+            random_source=lambda: 0.9,
+        )
+    )
+
+    assert captured
+    assert all(record.levelno == logging.WARNING for record in captured)
+    assert all(json.loads(record.getMessage())["slow"] for record in captured)
+
+
+def test_configure_query_logger_writes_to_file(tmp_path):
+    log_file = tmp_path / "queries.log"
+    logger = configure_query_logger(str(log_file))
+    try:
+        logger.info('{"fingerprint": "abc"}')
+        for handler in logger.handlers:
+            handler.flush()
+
+        assert log_file.read_text().strip() == '{"fingerprint": "abc"}'
+    finally:
+        for handler in list(logger.handlers):
+            handler.close()
+            logger.removeHandler(handler)
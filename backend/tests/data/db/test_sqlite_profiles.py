@@ -0,0 +1,68 @@
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from backend.app.data.db.sqlite_profiles import (
+    SQLiteProfile,
+    SQLITE_PROFILES,
+    get_sqlite_profile,
+)
+
+
+def test_compat_profile_only_enables_foreign_keys():
+    profile = get_sqlite_profile("compat")
+
+    assert profile.pragmas() == ["PRAGMA foreign_keys=ON"]
+    assert profile.engine_options("sqlite+aiosqlite:///./schemas.db") == {}
+
+
+def test_tuned_profile_pragmas():
+    pragmas = get_sqlite_profile("tuned").pragmas()
+
+    assert pragmas[0] == "PRAGMA foreign_keys=ON"
+    assert "PRAGMA journal_mode=WAL" in pragmas
+    assert "PRAGMA synchronous=NORMAL" in pragmas
+    assert "PRAGMA busy_timeout=5000" in pragmas
+
+
+def test_pool_options_skipped_for_memory_database():
+    profile = SQLiteProfile(pool_size=3, max_overflow=1)
+
+    assert profile.engine_options("sqlite+aiosqlite:///./schemas.db") == {
+        "pool_size": 3,
+        "max_overflow": 1,
+    }
+    assert profile.engine_options("sqlite+aiosqlite://") == {}
+    assert profile.engine_options("sqlite+aiosqlite:///:memory:") == {}
+
+
+def test_unknown_profile_raises():
+    with pytest.raises(ValueError) as exc:
+        get_sqlite_profile("turbo")
+
+    assert "turbo" in str(exc.value)
+    for name in SQLITE_PROFILES:
+        assert name in str(exc.value)
+
+
+@pytest.mark.asyncio
+async def test_tuned_profile_applied_on_connect(tmp_path):
+    database_url = f"sqlite+aiosqlite:///{tmp_path / 'profile.db'}"
+    profile = get_sqlite_profile("tuned")
+    engine = create_async_engine(database_url, **profile.engine_options(database_url))
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def apply_profile(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in profile.pragmas():
+            cursor.execute(pragma)
+        cursor.close()
+
+    async with engine.connect() as conn:
+        journal_mode = (await conn.execute(text("PRAGMA journal_mode"))).scalar()
+        foreign_keys = (await conn.execute(text("PRAGMA foreign_keys"))).scalar()
+
+    await engine.dispose()
+
+    assert journal_mode == "wal"
+    assert foreign_keys == 1
@@ -78,3 +78,29 @@ async def test_delete_character():
 
     mock_session.delete.assert_called_once_with(char)
     mock_session.commit.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_get_characters_by_ids():
+    mock_session = AsyncMock()
+
+    mock_result = MagicMock()
+    mock_result.scalars.return_value.all.return_value = ["char1", "char2"]
+    mock_session.execute.return_value = mock_result
+
+    repo = CharacterRepository(mock_session)
+    result = await repo.get_characters_by_ids([1, 2])
+
+    assert result == ["char1", "char2"]
+    mock_session.execute.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_get_characters_by_ids_empty_skips_query():
+    mock_session = AsyncMock()
+    repo = CharacterRepository(mock_session)
+
+    result = await repo.get_characters_by_ids([])
+
+    assert result == []
+    mock_session.execute.assert_not_called()
@@ -1,10 +1,21 @@
 import pytest
+import pytest_asyncio
 from unittest.mock import AsyncMock, MagicMock, patch
 from datetime import datetime
 
+from sqlalchemy import event
 from sqlalchemy.exc import SQLAlchemyError
-
-from backend.app.data.entities.project_entities import BaseProject
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from backend.app.data.entities.project_entities import (
+    Base,
+    BaseProject,
+    FictionProject,
+)
+from backend.app.data.entities.sections.character_entities import Character
+from backend.app.data.entities.sections.plot_entities import Plot, PlotStep
+from backend.app.data.entities.sections.world_entities import World, WorldElement
 from http.client import HTTPException
 
 from backend.app.data.respositories.project_repository import ProjectRepository
@@ -96,3 +107,94 @@ async def test_delete_project(repository, mock_session):
     await repository.delete_project(project)
     mock_session.delete.assert_called_once_with(project)
     mock_session.commit.assert_called_once()
+
+
+@pytest_asyncio.fixture
+async def sqlite_session():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    statements = []
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def count_statements(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        yield session, statements
+
+    await engine.dispose()
+
+
+async def seed_project(session, size: int) -> int:
+    project = FictionProject(projectListID=1, type="novel", status="planning")
+    session.add(project)
+    await session.flush()
+
+    world = World(projectID=project.id)
+    session.add(world)
+    await session.flush()
+
+    for i in range(size):
+        character = Character(projectID=project.id, name=f"char-{i}")
+        session.add(character)
+        session.add(WorldElement(worldId=world.id, name=f"element-{i}"))
+        await session.flush()
+
+        plot = Plot(
+            projectID=project.id,
+            title=f"plot-{i}",
+            characterReferencesIDs=[character.id],
+        )
+        session.add(plot)
+        await session.flush()
+        session.add_all([PlotStep(plotID=plot.id), PlotStep(plotID=plot.id)])
+
+    await session.commit()
+    session.expunge_all()
+    return project.id
+
+
+@pytest.mark.asyncio
+async def test_get_project_aggregate_loads_every_section(sqlite_session):
+    session, _ = sqlite_session
+    project_id = await seed_project(session, size=3)
+
+    project = await ProjectRepository(session).get_project_aggregate(project_id)
+
+    assert isinstance(project, FictionProject)
+    assert len(project.world.elements) == 3
+    assert [c.name for c in project.characters] == ["char-0", "char-1", "char-2"]
+    assert len(project.plots) == 3
+    assert all(len(plot.steps) == 2 for plot in project.plots)
+
+
+@pytest.mark.asyncio
+async def test_get_project_aggregate_query_count_is_constant(sqlite_session):
+    session, statements = sqlite_session
+    repo = ProjectRepository(session)
+
+    small_id = await seed_project(session, size=1)
+    big_id = await seed_project(session, size=25)
+
+    statements.clear()
+    await repo.get_project_aggregate(small_id)
+    small_count = len(statements)
+    session.expunge_all()
+
+    statements.clear()
+    await repo.get_project_aggregate(big_id)
+    big_count = len(statements)
+
+    assert small_count == big_count
+    assert big_count <= 6
+
+
+@pytest.mark.asyncio
+async def test_get_project_aggregate_not_found(sqlite_session):
+    session, _ = sqlite_session
+
+    project = await ProjectRepository(session).get_project_aggregate(404)
+
+    assert project is None
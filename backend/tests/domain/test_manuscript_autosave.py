@@ -0,0 +1,128 @@
+import asyncio
+import os
+
+import pytest
+
+from backend.app.domain.manuscript_autosave import AutosaveQueue
+
+
+def recorder(written: list):
+    def save(key: str, content: str, pause: float = 0):
+        async def write() -> dict:
+            await asyncio.sleep(pause)
+            written.append((key, content))
+            return {"saved": key, "content": content}
+
+        return write
+
+    return save
+
+
+@pytest.mark.asyncio
+async def test_saves_of_the_same_key_are_coalesced():
+    written = []
+    save = recorder(written)
+    queue = AutosaveQueue(delay=0.05, max_delay=1)
+
+    statuses = [
+        queue.submit("scene.md", save("scene.md", f"draft {n}")) for n in range(3)
+    ]
+    queue.submit("other.md", save("other.md", "other"))
+
+    assert [status["coalesced"] for status in statuses] == [0, 1, 2]
+    assert statuses[-1]["flush_in"] == pytest.approx(0.05)
+    assert written == []
+    await asyncio.sleep(0.15)
+    assert sorted(written) == [("other.md", "other"), ("scene.md", "draft 2")]
+    assert len(queue) == 0
+
+
+@pytest.mark.asyncio
+async def test_max_delay_bounds_the_debounce():
+    written = []
+    save = recorder(written)
+    queue = AutosaveQueue(delay=0.05, max_delay=0.1)
+
+    for n in range(10):
+        queue.submit("scene.md", save("scene.md", f"draft {n}"))
+        await asyncio.sleep(0.03)
+
+    # Saves never stopped for `delay` seconds, they were still written
+    assert written
+    await queue.flush()
+    assert written[-1] == ("scene.md", "draft 9")
+
+
+@pytest.mark.asyncio
+async def test_flush_writes_now():
+    written = []
+    save = recorder(written)
+    queue = AutosaveQueue(delay=60, max_delay=60)
+    one = os.path.join("1", "one", "scene.md")
+    queue.submit(one, save(one, "one"))
+    queue.submit(os.path.join("1", "two.md"), save("two", "two"))
+    queue.submit(os.path.join("10", "ten.md"), save("ten", "ten"))
+
+    assert await queue.flush(os.path.join("1", "one")) == [
+        (one, {"saved": one, "content": "one"})
+    ]
+    assert written == [(one, "one")]
+
+    # "1" is a directory of keys, "10/ten.md" is not in it
+    assert [key for key, _ in await queue.flush("1")] == [os.path.join("1", "two.md")]
+    assert len(queue) == 1
+    await queue.flush()
+    assert len(queue) == 0
+    assert await queue.flush() == []
+
+
+@pytest.mark.asyncio
+async def test_writes_of_a_key_run_in_order():
+    written = []
+    save = recorder(written)
+    queue = AutosaveQueue(delay=60, max_delay=60)
+
+    queue.submit("scene.md", save("scene.md", "first", pause=0.05))
+    first = asyncio.ensure_future(queue.flush())
+    await asyncio.sleep(0)
+    queue.submit("scene.md", save("scene.md", "second"))
+    await queue.flush()
+    await first
+
+    assert written == [("scene.md", "first"), ("scene.md", "second")]
+
+
+@pytest.mark.asyncio
+async def test_failed_write_stays_pending():
+    written = []
+    save = recorder(written)
+    queue = AutosaveQueue(delay=60, max_delay=60)
+    error = OSError("disk full")
+
+    async def fail() -> dict:
+        raise error
+
+    queue.submit("scene.md", fail)
+    assert await queue.flush() == [("scene.md", error)]
+    assert "scene.md" in queue
+
+    # A newer save replaces it
+    queue.submit("scene.md", save("scene.md", "retry"))
+    await queue.flush()
+    assert written == [("scene.md", "retry")]
+    assert "scene.md" not in queue
+
+
+@pytest.mark.asyncio
+async def test_discard_drops_pending_writes():
+    written = []
+    save = recorder(written)
+    queue = AutosaveQueue(delay=0.05, max_delay=0.05)
+
+    queue.submit(os.path.join("1", "a.md"), save("a", "a"))
+    queue.submit(os.path.join("1", "b.md"), save("b", "b"))
+    queue.submit(os.path.join("2", "c.md"), save("c", "c"))
+
+    assert await queue.discard("1") == 2
+    await asyncio.sleep(0.1)
+    assert written == [("c", "c")]
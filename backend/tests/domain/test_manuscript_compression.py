@@ -0,0 +1,101 @@
+import hashlib
+
+import pytest
+
+from backend.app.domain import manuscript_compression
+from backend.app.domain.manuscript_compression import (
+    choose_codec,
+    compress_file,
+    decompress_file,
+    is_compressed,
+    open_stored,
+    read_stored_text,
+    stored_size,
+)
+from backend.app.domain.manuscript_hashing import file_sha256
+from backend.app.domain.manuscript_index import count_words
+from backend.app.domain.manuscript_reading import read_byte_window, read_line_window
+from backend.app.domain.manuscript_search import compile_search_pattern, search_file
+
+CODECS = [
+    "gzip",
+    pytest.param(
+        "zstd",
+        marks=pytest.mark.skipif(
+            not manuscript_compression.zstd_available(),
+            reason="zstandard is not installed",
+        ),
+    ),
+]
+
+TEXT = "".join(f"Line {n}: the dragon slept under the castle.\n" for n in range(2000))
+
+
+@pytest.fixture(params=CODECS)
+def stored(request, tmp_path):
+    source = tmp_path / "scene.md"
+    source.write_text(TEXT)
+    target = tmp_path / "scene.md.z"
+    compress_file(str(source), str(target), request.param)
+    return str(source), str(target)
+
+
+def test_choose_codec_by_size(monkeypatch):
+    assert choose_codec(100, 4096, 1 << 20) is None
+    assert choose_codec(4096, 4096, 1 << 20) == "gzip"
+    monkeypatch.setattr(manuscript_compression, "zstandard", object())
+    assert choose_codec(1 << 20, 4096, 1 << 20) == "zstd"
+    monkeypatch.setattr(manuscript_compression, "zstandard", None)
+    assert choose_codec(1 << 20, 4096, 1 << 20) == "gzip"
+
+
+def test_compress_file_unknown_codec(tmp_path):
+    source = tmp_path / "scene.md"
+    source.write_text("text")
+
+    with pytest.raises(ValueError):
+        compress_file(str(source), str(tmp_path / "out"), "lz4")
+
+
+def test_compressed_file_round_trip(stored, tmp_path):
+    source, target = stored
+
+    assert is_compressed(target)
+    assert not is_compressed(source)
+    assert stored_size(target) == stored_size(source) == len(TEXT)
+    with open_stored(target) as f:
+        assert f.read() == TEXT.encode()
+
+    restored = tmp_path / "restored.md"
+    assert decompress_file(target, str(restored)) == len(TEXT)
+    assert restored.read_text() == TEXT
+
+
+def test_stored_file_seeks_forward_only(stored):
+    _, target = stored
+
+    with open_stored(target) as f:
+        assert f.seek(1000) == 1000
+        assert f.read(5) == TEXT[1000:1005].encode()
+        with pytest.raises(OSError):
+            f.seek(0)
+
+
+def test_readers_see_the_content(stored):
+    source, target = stored
+
+    assert file_sha256(target) == hashlib.sha256(TEXT.encode()).hexdigest()
+    assert count_words(target) == count_words(source)
+    assert read_stored_text(target) == TEXT
+    assert read_byte_window(target, 100, 50) == read_byte_window(source, 100, 50)
+    assert read_line_window(target, 1500, 10) == read_line_window(source, 1500, 10)
+
+    pattern = compile_search_pattern("line 1999", regex=False, case_sensitive=False)
+    assert search_file(target, pattern, 5) == search_file(source, pattern, 5)
+
+
+def test_read_stored_text_translates_newlines(tmp_path):
+    path = tmp_path / "scene.md"
+    path.write_bytes(b"one\r\ntwo\rthree\n")
+
+    assert read_stored_text(str(path)) == "one\ntwo\nthree\n"
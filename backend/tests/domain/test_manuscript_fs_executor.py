@@ -0,0 +1,68 @@
+import asyncio
+import threading
+
+import pytest
+
+from backend.app.domain.manuscript_fs_executor import FileSystemExecutor
+
+
+@pytest.mark.asyncio
+async def test_run_returns_result_and_propagates_errors():
+    executor = FileSystemExecutor(2)
+
+    assert await executor.run(sum, [1, 2, 3]) == 6
+    with pytest.raises(FileNotFoundError):
+        await executor.run(open, "/nonexistent/file")
+
+    stats = executor.stats()
+    assert stats["calls"] == 2
+    assert stats["queued"] == stats["running"] == 0
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_stats_track_queue_depth_and_wait_time():
+    executor = FileSystemExecutor(1)
+    release = threading.Event()
+
+    blocked = asyncio.create_task(executor.run(release.wait))
+    waiting = [asyncio.create_task(executor.run(lambda: None)) for _ in range(3)]
+    await asyncio.sleep(0.05)
+
+    stats = executor.stats()
+    assert stats["running"] == 1
+    assert stats["queued"] == 3
+
+    release.set()
+    await asyncio.gather(blocked, *waiting)
+
+    stats = executor.stats()
+    assert stats["calls"] == 4
+    assert stats["queued"] == stats["running"] == 0
+    assert stats["max_queued"] >= 3
+    assert stats["max_wait_ms"] >= 40
+    assert stats["avg_wait_ms"] > 0
+
+    executor.reset_stats()
+    assert executor.stats()["calls"] == 0
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_calls_leave_the_queue():
+    executor = FileSystemExecutor(1)
+    release = threading.Event()
+    ran = []
+
+    blocked = asyncio.create_task(executor.run(release.wait))
+    cancelled = asyncio.create_task(executor.run(ran.append, "ran"))
+    await asyncio.sleep(0.05)
+    cancelled.cancel()
+    await asyncio.sleep(0)
+
+    assert executor.stats()["queued"] == 0
+
+    release.set()
+    await blocked
+    executor.shutdown()
+    assert ran == []
@@ -0,0 +1,87 @@
+from backend.app.domain.manuscript_fts import (
+    ManuscriptFullTextIndex,
+    fts_query,
+    get_manuscript_fts,
+    read_text,
+)
+
+
+def test_fts_query_quotes_words():
+    assert fts_query("dragon castle", prefix=False) == '"dragon" "castle"'
+    assert fts_query('drag* OR "cas', prefix=True) == '"drag"* "OR"* "cas"*'
+    assert fts_query("  ...  ", prefix=True) == ""
+
+
+def test_read_text(tmp_path):
+    text = tmp_path / "scene.md"
+    text.write_text("Érase una vez", encoding="utf-8")
+    binary = tmp_path / "scene.docx"
+    binary.write_bytes(b"\xff\xfe\x00binary")
+
+    assert read_text(str(text)) == "Érase una vez"
+    assert read_text(str(binary)) is None
+
+
+def test_search_ranks_and_highlights(tmp_path):
+    index = ManuscriptFullTextIndex(str(tmp_path / "index.db"))
+    index.update(1, "one/scene.md", "The dragon slept. The dragon woke.")
+    index.update(1, "two/scene.md", "A long road, a castle and a dragon far away.")
+    index.update(2, "one/scene.md", "Another project with a dragon.")
+
+    results = index.search(1, fts_query("dragon", prefix=False), 10)
+
+    assert [result["path"] for result in results] == ["one/scene.md", "two/scene.md"]
+    assert results[0]["rank"] < results[1]["rank"]
+    assert "<mark>dragon</mark>" in results[0]["snippet"]
+
+    prefixed = index.search(1, fts_query("cast", prefix=True), 10)
+    assert [result["path"] for result in prefixed] == ["two/scene.md"]
+    assert index.search(1, fts_query("cast", prefix=False), 10) == []
+
+    # Diacritics are folded
+    index.update(1, "three/escena.md", "Érase una canción")
+    assert index.search(1, fts_query("cancion", prefix=False), 10)[0]["path"] == (
+        "three/escena.md"
+    )
+    index.close()
+
+
+def test_update_replaces_content(tmp_path):
+    index = ManuscriptFullTextIndex(str(tmp_path / "index.db"))
+    index.update(1, "one/scene.md", "dragon")
+    index.update(1, "one/scene.md", "castle")
+
+    assert index.search(1, '"dragon"', 10) == []
+    assert len(index.search(1, '"castle"', 10)) == 1
+
+    index.update(1, "one/scene.md", None)
+    assert index.search(1, '"castle"', 10) == []
+    index.close()
+
+
+def test_remove_file_directory_and_project(tmp_path):
+    index = ManuscriptFullTextIndex(str(tmp_path / "index.db"))
+    for path in ("one/a.md", "one/b.md", "one_b/c.md", "two/d.md"):
+        index.update(1, path, "dragon")
+    index.update(2, "one/a.md", "dragon")
+
+    assert index.remove(1, "one/a.md") == 1
+    assert index.remove(1, "one") == 1
+    assert sorted(result["path"] for result in index.search(1, '"dragon"', 10)) == [
+        "one_b/c.md",
+        "two/d.md",
+    ]
+    assert index.remove(1, ".") == 2
+    assert index.search(1, '"dragon"', 10) == []
+    assert len(index.search(2, '"dragon"', 10)) == 1
+    index.close()
+
+
+def test_get_manuscript_fts_is_cached(tmp_path):
+    upload_dir = str(tmp_path / "manuscripts")
+
+    index = get_manuscript_fts(upload_dir)
+
+    assert get_manuscript_fts(upload_dir) is index
+    index.update(1, "scene.md", "dragon")
+    assert len(index.search(1, '"dragon"', 10)) == 1
@@ -0,0 +1,65 @@
+import hashlib
+import os
+
+from backend.app.domain.manuscript_hashing import FileHashCache, file_sha256
+
+
+def test_file_sha256(tmp_path):
+    path = tmp_path / "scene.md"
+    path.write_bytes(b"Once upon a time")
+
+    assert file_sha256(str(path)) == hashlib.sha256(b"Once upon a time").hexdigest()
+
+
+def test_hash_cache_reuses_digest_until_file_changes(tmp_path, monkeypatch):
+    path = tmp_path / "scene.md"
+    path.write_bytes(b"first")
+    cache = FileHashCache()
+
+    calls = []
+
+    def counting_sha256(file_path):
+        calls.append(file_path)
+        return file_sha256(file_path)
+
+    monkeypatch.setattr(
+        "backend.app.domain.manuscript_hashing.file_sha256", counting_sha256
+    )
+
+    first = cache.get(str(path))
+    assert cache.get(str(path)) == first
+    assert len(calls) == 1
+
+    path.write_bytes(b"second version")
+    assert cache.get(str(path)) == hashlib.sha256(b"second version").hexdigest()
+    assert len(calls) == 2
+
+
+def test_hash_cache_evicts_least_recently_used(tmp_path):
+    cache = FileHashCache(max_entries=2)
+    paths = []
+    for name in ("a", "b", "c"):
+        path = tmp_path / name
+        path.write_bytes(name.encode())
+        paths.append(str(path))
+
+    cache.get(paths[0])
+    cache.get(paths[1])
+    cache.get(paths[0])
+    cache.get(paths[2])
+
+    assert cache.peek(paths[0]) is not None
+    assert cache.peek(paths[1]) is None
+    assert cache.peek(paths[2]) is not None
+
+
+def test_hash_cache_put(tmp_path):
+    path = tmp_path / "scene.md"
+    path.write_bytes(b"content")
+    cache = FileHashCache()
+
+    cache.put(str(path), "abc")
+
+    assert cache.get(str(path)) == "abc"
+    cache.clear()
+    assert cache.peek(str(path)) is None
@@ -0,0 +1,148 @@
+import hashlib
+import zlib
+from unittest.mock import patch
+
+import pytest
+
+from backend.app.domain.manuscript_history import (
+    CHUNK_MAX_SIZE,
+    CHUNK_MIN_SIZE,
+    ManuscriptHistory,
+    split_chunks,
+)
+
+DAY = 24 * 60 * 60
+
+
+def novel(paragraphs: int = 400, edit: str = "") -> bytes:
+    text = "".join(
+        f"Paragraph {n}: the dragon slept under the castle walls.{edit if n == 200 else ''}\n"
+        for n in range(paragraphs)
+    )
+    return text.encode()
+
+
+def sha256(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+@pytest.fixture
+def history(tmp_path):
+    history = ManuscriptHistory(str(tmp_path / "index.db"))
+    yield history
+    history.close()
+
+
+def stored_chunks(history) -> int:
+    return history.usage(1)["chunks"]
+
+
+def test_split_chunks_is_content_defined():
+    content = novel()
+    chunks = split_chunks(content)
+
+    assert b"".join(chunks) == content
+    assert all(len(chunk) >= CHUNK_MIN_SIZE for chunk in chunks[:-1])
+    assert all(len(chunk) <= CHUNK_MAX_SIZE for chunk in chunks)
+
+    # An edit in the middle only changes the chunk around it, and the next
+    # one when it moved their boundary
+    edited = split_chunks(novel(edit=" Suddenly, a voice."))
+    assert len(chunks) > 10
+    assert len(set(edited) - set(chunks)) <= 2
+
+
+def test_split_chunks_without_newlines():
+    content = b"x" * (CHUNK_MAX_SIZE * 2 + 10)
+
+    chunks = split_chunks(content)
+
+    assert [len(chunk) for chunk in chunks] == [CHUNK_MAX_SIZE, CHUNK_MAX_SIZE, 10]
+    assert split_chunks(b"") == []
+
+
+def test_record_and_read_revisions(history, tmp_path):
+    first = novel()
+    second = novel(edit=" Suddenly, a voice.")
+
+    one = history.record(1, "one/scene.md", first, sha256(first), timestamp=100)
+    chunks = stored_chunks(history)
+    two = history.record(1, "one/scene.md", second, sha256(second), timestamp=200)
+
+    # The second revision only stored the edited chunks
+    assert chunks < stored_chunks(history) <= chunks + 2
+    assert history.record(1, "one/scene.md", second, sha256(second)) is None
+    assert [r["id"] for r in history.revisions(1, "one/scene.md")] == [
+        two["id"],
+        one["id"],
+    ]
+    assert history.get(1, one["id"]) == {
+        "id": one["id"],
+        "path": "one/scene.md",
+        "content_hash": sha256(first),
+        "size": len(first),
+        "created_at": 100,
+    }
+    assert history.read(1, one["id"]) == first
+    assert history.read(1, two["id"]) == second
+    assert history.read(2, one["id"]) is None
+    assert history.get(1, 999) is None
+
+
+def test_read_detects_corrupt_chunks(history, tmp_path):
+    revision = history.record(1, "scene.md", b"text\n", sha256(b"text\n"))
+    history._connection.execute("UPDATE history_chunks SET data = ?", (b"garbage",))
+
+    with pytest.raises(OSError):
+        history.read(1, revision["id"])
+
+    history._connection.execute(
+        "UPDATE history_chunks SET data = ?", (zlib.compress(b"other\n"),)
+    )
+    with pytest.raises(OSError):
+        history.read(1, revision["id"])
+
+
+def test_record_does_not_fsync_chunks(history):
+    content = novel()
+
+    with patch("os.fsync") as fsync:
+        history.record(1, "scene.md", content, sha256(content))
+
+    # Durable with the commit of the revision
+    fsync.assert_not_called()
+    assert stored_chunks(history) > 10
+
+
+def test_prune_and_collect_garbage(history, tmp_path):
+    contents = [f"draft {n}\n".encode() for n in range(5)]
+    for n, content in enumerate(contents):
+        history.record(1, "scene.md", content, sha256(content), timestamp=n * DAY)
+    history.record(1, "old.md", b"old\n", sha256(b"old\n"), timestamp=0)
+
+    # Keeps the 3 newest revisions, and only the ones newer than 2.5 days
+    assert history.prune(keep=3, max_age=2.5 * DAY, now=5 * DAY) == 3
+    assert [r["content_hash"] for r in history.revisions(1, "scene.md")] == [
+        sha256(contents[4]),
+        sha256(contents[3]),
+    ]
+    # The last revision of a file is always kept
+    assert len(history.revisions(1, "old.md")) == 1
+
+    assert stored_chunks(history) == 6
+    assert history.collect_garbage() == 3
+    assert stored_chunks(history) == 3
+    assert history.usage(1)["revisions"] == 3
+    assert history.usage(1)["chunks"] == 3
+
+
+def test_shared_chunks_survive_garbage_collection(history):
+    content = novel()
+    history.record(1, "one.md", content, sha256(content))
+    copy = history.record(1, "two.md", content, sha256(content))
+    history.record(1, "one.md", b"rewritten\n", sha256(b"rewritten\n"))
+
+    history.prune(keep=1, max_age=DAY)
+    history.collect_garbage()
+
+    assert history.read(1, copy["id"]) == content
@@ -0,0 +1,119 @@
+import os
+
+from backend.app.domain import manuscript_index
+from backend.app.domain.manuscript_index import (
+    ManuscriptIndex,
+    count_words,
+    get_manuscript_index,
+    index_path,
+)
+
+
+def test_count_words_across_blocks(tmp_path, monkeypatch):
+    content = b"Once upon  a\ntime, there was\ta  scene. "
+    path = tmp_path / "scene.md"
+    path.write_bytes(content)
+    monkeypatch.setattr(manuscript_index, "HASH_BUFFER_SIZE", 3)
+
+    assert count_words(str(path)) == len(content.split()) == 8
+
+
+def test_count_words_utf8_text(tmp_path, monkeypatch):
+    path = tmp_path / "escena.md"
+    path.write_text("Érase una vez,\u00a0en él año", encoding="utf-8")
+    # Blocks cut multibyte characters
+    monkeypatch.setattr(manuscript_index, "HASH_BUFFER_SIZE", 1)
+
+    # The no-break space separates words too
+    assert count_words(str(path)) == 6
+
+
+def test_count_words_binary_file(tmp_path):
+    path = tmp_path / "cover.png"
+    path.write_bytes(b"\x89PNG\r\n\x1a\n\xff\xfe words")
+
+    assert count_words(str(path)) == 0
+
+
+def test_index_path():
+    assert index_path("docs", "file.txt") == "docs/file.txt"
+    assert index_path("/docs/", "file.txt") == "docs/file.txt"
+    assert index_path(".", "file.txt") == "file.txt"
+    assert index_path("") == "."
+    assert index_path("/") == "."
+
+
+def test_record_get_and_directory_files(tmp_path):
+    index = ManuscriptIndex(str(tmp_path / "index.db"))
+    path = tmp_path / "scene.md"
+    path.write_text("one two")
+    stat = os.stat(path)
+
+    entry = index.record(1, "docs/scene.md", stat, "abc", 2)
+
+    assert entry["size"] == stat.st_size
+    assert entry["word_count"] == 2
+    assert index.get(1, "docs/scene.md") == entry
+    assert index.get(2, "docs/scene.md") is None
+    assert index.directory_files(1, "docs") == [entry]
+    assert index.current_hash(1, "docs/scene.md", stat) == "abc"
+
+    path.write_text("one two three")
+    assert index.current_hash(1, "docs/scene.md", os.stat(path)) is None
+    index.close()
+
+
+def test_content_size_of_compressed_files(tmp_path):
+    index = ManuscriptIndex(str(tmp_path / "index.db"))
+    path = tmp_path / "scene.md"
+    path.write_bytes(b"compressed")
+    stat = os.stat(path)
+
+    entry = index.record(1, "docs/scene.md", stat, "abc", 2, size=7000)
+
+    assert entry["size"] == 7000
+    # Changes are found by the size on disk
+    assert index.current_hash(1, "docs/scene.md", stat) == "abc"
+    assert index.content_sizes(1) == {
+        "docs/scene.md": (stat.st_size, stat.st_mtime, 7000)
+    }
+    index.close()
+
+
+def test_remove_file_directory_and_project(tmp_path):
+    index = ManuscriptIndex(str(tmp_path / "index.db"))
+    stat = os.stat(tmp_path)
+    for path in ("docs/a.md", "docs/sub/b.md", "docs_old/c.md", "d%/e.md", "f.md"):
+        index.record(1, path, stat, "hash", 0)
+    index.record(2, "docs/a.md", stat, "hash", 0)
+
+    assert index.remove(1, "docs") == 2
+    assert index.get(1, "docs_old/c.md") is not None
+    assert index.remove(1, "d%") == 1
+    assert index.remove(1, ".") == 2
+    assert index.get(2, "docs/a.md") is not None
+    index.close()
+
+
+def test_get_manuscript_index_is_opened_once(tmp_path):
+    first = get_manuscript_index(str(tmp_path / "manuscripts"))
+
+    assert get_manuscript_index(str(tmp_path / "manuscripts")) is first
+    assert os.path.exists(tmp_path / "manuscripts" / ".manuscript_index.db")
+
+
+def test_cached_word_count_project_paths_and_forget(tmp_path):
+    index = ManuscriptIndex(str(tmp_path / "index.db"))
+    path = tmp_path / "scene.md"
+    path.write_text("one two")
+    stat = os.stat(path)
+    index.record(1, "a/scene.md", stat, "abc", 2)
+    index.record(1, "a/scene.md/child.md", stat, "def", 5)
+
+    assert index.cached_word_count("abc") == 2
+    assert index.cached_word_count("missing") is None
+    assert index.project_paths(1) == {"a/scene.md", "a/scene.md/child.md"}
+
+    assert index.forget(1, ["a/scene.md"]) == 1
+    assert index.project_paths(1) == {"a/scene.md/child.md"}
+    index.close()
@@ -0,0 +1,135 @@
+import os
+from unittest.mock import patch
+
+import pytest
+
+from backend.app.domain.manuscript_listing import (
+    list_scenes,
+    walk_chapters,
+    walk_files,
+)
+
+
+def write(path, content="text"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+
+
+def test_walk_chapters_lists_scenes_with_size_and_mtime(tmp_path):
+    write(tmp_path / "b" / "scene.md", "12345")
+    write(tmp_path / "a" / "z.md")
+    write(tmp_path / "a" / "sub" / "deep" / "x.md")
+    write(tmp_path / "a" / "sub" / "y.md")
+    write(tmp_path / "a" / "b.md")
+    write(tmp_path / "root.md")
+
+    chapters = walk_chapters(str(tmp_path))
+
+    # Only the direct files of the chapters are scenes, as before the walker
+    assert [chapter["title"] for chapter in chapters] == ["a", "b"]
+    assert [scene["path"] for scene in chapters[0]["scenes"]] == ["a/b.md", "a/z.md"]
+    scene = chapters[1]["scenes"][0]
+    assert scene == {
+        "title": "scene.md",
+        "path": "b/scene.md",
+        "content": "",
+        "size": 5,
+        "modified_at": os.stat(tmp_path / "b" / "scene.md").st_mtime,
+    }
+
+
+def test_walk_chapters_prunes_hidden_entries(tmp_path):
+    write(tmp_path / ".git" / "objects" / "file")
+    write(tmp_path / "a" / ".drafts" / "old.md")
+    write(tmp_path / "a" / ".hidden.md")
+    write(tmp_path / "a" / "metadata.json", "{}")
+    write(tmp_path / "a" / "scene.md")
+
+    opened = []
+    real_scandir = os.scandir
+
+    def tracking_scandir(path):
+        opened.append(os.path.relpath(path, tmp_path))
+        return real_scandir(path)
+
+    with patch(
+        "backend.app.domain.manuscript_listing.os.scandir", side_effect=tracking_scandir
+    ):
+        chapters = walk_chapters(str(tmp_path))
+
+    assert chapters == [
+        {"title": "a", "path": "a", "scenes": chapters[0]["scenes"]},
+    ]
+    assert [scene["title"] for scene in chapters[0]["scenes"]] == ["scene.md"]
+    assert sorted(opened) == [".", "a"]
+
+
+def test_walk_chapters_does_not_follow_symlinked_directories(tmp_path):
+    write(tmp_path / "outside" / "x.md")
+    (tmp_path / "project").mkdir()
+    write(tmp_path / "project" / "a" / "scene.md")
+    os.symlink(tmp_path / "outside", tmp_path / "project" / "linked")
+    os.symlink(tmp_path / "outside", tmp_path / "project" / "a" / "linked")
+
+    chapters = walk_chapters(str(tmp_path / "project"))
+
+    assert chapters[0]["scenes"][0]["path"] == "a/scene.md"
+    assert len(chapters[0]["scenes"]) == 1
+    assert chapters[1] == {"title": "linked", "path": "linked", "scenes": []}
+
+
+def test_unreadable_directories_are_skipped(tmp_path):
+    write(tmp_path / "a" / "scene.md")
+    write(tmp_path / "a" / "locked" / "secret.md")
+    write(tmp_path / "locked" / "secret.md")
+    real_scandir = os.scandir
+
+    def failing_scandir(path):
+        if os.path.basename(path) == "locked":
+            raise PermissionError("denied")
+        return real_scandir(path)
+
+    with patch(
+        "backend.app.domain.manuscript_listing.os.scandir", side_effect=failing_scandir
+    ):
+        chapters = walk_chapters(str(tmp_path))
+        files = walk_files(str(tmp_path))
+
+    assert chapters[1] == {"title": "locked", "path": "locked", "scenes": []}
+    assert [scene["path"] for scene in files] == ["a/scene.md"]
+
+
+def test_walk_chapters_root_errors_propagate(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        walk_chapters(str(tmp_path / "missing"))
+
+
+def test_list_scenes_of_one_chapter(tmp_path):
+    write(tmp_path / "a" / "scene.md")
+    write(tmp_path / "a" / "sub" / "other.md")
+
+    scenes = list_scenes(str(tmp_path / "a"), "a")
+    assert [scene["path"] for scene in scenes] == ["a/scene.md"]
+
+    with pytest.raises(FileNotFoundError):
+        list_scenes(str(tmp_path / "missing"), "missing")
+
+
+def test_walk_files_lists_every_file(tmp_path):
+    write(tmp_path / "root.md")
+    write(tmp_path / "a" / "z.md")
+    write(tmp_path / "a" / "sub" / "deep" / "x.md")
+    write(tmp_path / "a" / "sub" / "y.md")
+    write(tmp_path / "a" / ".drafts" / "old.md")
+    write(tmp_path / "a" / "metadata.json", "{}")
+
+    files = walk_files(str(tmp_path))
+
+    assert [scene["path"] for scene in files] == [
+        "root.md",
+        "a/z.md",
+        "a/sub/y.md",
+        "a/sub/deep/x.md",
+    ]
+    with pytest.raises(FileNotFoundError):
+        walk_files(str(tmp_path / "missing"))
@@ -1,6 +1,12 @@
+import asyncio
+import errno
+import hashlib
 import os
 import json
 import tempfile
+import threading
+import time
+from contextlib import asynccontextmanager
 from unittest.mock import patch
 
 import pytest
@@ -9,8 +15,22 @@ from fastapi import UploadFile, HTTPException
 
 import pytest_asyncio
 
-from backend.app.domain.manuscript_manager import ManuscriptManager
-from backend.app.schemas.sections.manuscript_schemas import SaveStartRequest
+from backend.app.domain.manuscript_autosave import AutosaveQueue
+from backend.app.domain.manuscript_compression import compress_file, is_compressed
+from backend.app.domain.manuscript_index import count_words
+from backend.app.domain.manuscript_manager import ManuscriptManager, copy_buffer_size
+from backend.app.domain.manuscript_sessions import MemorySessionStore
+from backend.app.domain.manuscript_upload_files import (
+    add_received_range,
+    check_fsync_policy,
+    commit_upload_file,
+    missing_ranges,
+)
+from backend.app.schemas.sections.manuscript_schemas import (
+    SaveCheckRequest,
+    SavePatchRequest,
+    SaveStartRequest,
+)
 
 
 @pytest_asyncio.fixture
@@ -19,16 +39,19 @@ async def manager(tmp_path, monkeypatch):
     os.makedirs(ManuscriptManager.UPLOAD_DIR, exist_ok=True)
     m = ManuscriptManager()
     yield m
+    await m.upload_files.close_all()
     m.sessions.clear()
+    m.patch_locks.clear()
 
 
 def make_upload_file(content: bytes, filename="chunk.txt"):
     return UploadFile(file=BytesIO(content), filename=filename)
 
 
-def test_start_manuscript_save_session_creates_session(manager):
+@pytest.mark.asyncio
+async def test_start_manuscript_save_session_creates_session(manager):
     req = SaveStartRequest(project_id=1, relative_path="docs", filename="file.txt")
-    session_id = manager.start_manuscript_save_session(req)
+    session_id = await manager.start_manuscript_save_session(req)
 
     assert session_id in manager.sessions
     data = manager.sessions[session_id]
@@ -39,7 +62,7 @@ def test_start_manuscript_save_session_creates_session(manager):
 @pytest.mark.asyncio
 async def test_save_chunk_and_finish(manager):
     req = SaveStartRequest(project_id=1, relative_path="docs", filename="file.txt")
-    session_id = manager.start_manuscript_save_session(req)
+    session_id = await manager.start_manuscript_save_session(req)
 
     upload = make_upload_file(b"Hello world")
     await manager.save_manuscript_chunk(session_id, upload)
@@ -51,11 +74,1338 @@ async def test_save_chunk_and_finish(manager):
     with open(result["saved"], "rb") as f:
         assert f.read() == b"Hello world"
 
-    # metadata.json debe existir
-    assert os.path.exists(result["metadata_location"])
-    with open(result["metadata_location"], "r") as f:
-        metadata = json.load(f)
+    # La metadata del archivo queda en el índice
+    assert result["metadata"]["size"] == 11
+    assert result["metadata"]["word_count"] == 2
+    assert (
+        result["metadata"]["content_hash"] == hashlib.sha256(b"Hello world").hexdigest()
+    )
+    assert not os.path.exists(result["metadata_location"])
+
+    # metadata.json se genera a pedido
+    metadata = json.loads(
+        await manager.get_manuscript_file_content(1, "docs/metadata.json")
+    )
     assert "docs" in metadata
+    assert metadata["files"]["file.txt"] == result["metadata"]
+
+
+@pytest.mark.asyncio
+async def test_save_chunks_reuse_open_temp_file(manager):
+    req = SaveStartRequest(project_id=1, relative_path="docs", filename="file.txt")
+    session_id = await manager.start_manuscript_save_session(req)
+
+    await manager.save_manuscript_chunk(session_id, make_upload_file(b"Hello "))
+    assert session_id in manager.upload_files
+    await manager.save_manuscript_chunk(session_id, make_upload_file(b"world"))
+    assert len(manager.upload_files) == 1
+
+    result = await manager.finish_manuscript_save_session(session_id)
+
+    assert session_id not in manager.upload_files
+    with open(result["saved"], "rb") as f:
+        assert f.read() == b"Hello world"
+
+
+@pytest.mark.asyncio
+async def test_idle_temp_files_are_closed_and_reopened(manager, monkeypatch):
+    req = SaveStartRequest(project_id=1, relative_path="docs", filename="file.txt")
+    session_id = await manager.start_manuscript_save_session(req)
+    await manager.save_manuscript_chunk(session_id, make_upload_file(b"abc"))
+
+    await manager.upload_files.close_idle(-1)
+    assert session_id not in manager.upload_files
+
+    await manager.save_manuscript_chunk(session_id, make_upload_file(b"def"))
+    result = await manager.finish_manuscript_save_session(session_id)
+
+    with open(result["saved"], "rb") as f:
+        assert f.read() == b"abcdef"
+
+
+@pytest.mark.asyncio
+async def test_temp_file_is_closed_by_its_last_writer(manager, tmp_path):
+    path = str(tmp_path / "file.txt.part")
+
+    async with manager.upload_files.open("session", path) as upload_file:
+        await manager.upload_files.close("session")
+        assert "session" not in manager.upload_files
+        assert upload_file.closing
+        # Still open for the chunk writing to it
+        os.pwrite(upload_file.fd, b"abc", 0)
+
+    with pytest.raises(OSError):
+        os.fstat(upload_file.fd)
+    with open(path, "rb") as f:
+        assert f.read() == b"abc"
+
+
+@pytest.mark.asyncio
+async def test_chunk_of_a_session_closed_meanwhile_is_rejected(manager, monkeypatch):
+    req = SaveStartRequest(project_id=1, relative_path="docs", filename="file.txt")
+    session_id = await manager.start_manuscript_save_session(req)
+    temp_path = manager.sessions[session_id]["temp_path"]
+    open_upload_file = manager.upload_files.open
+
+    @asynccontextmanager
+    async def finished_while_opening(*args):
+        async with open_upload_file(*args) as upload_file:
+            manager.sessions.pop(session_id)
+            yield upload_file
+
+    monkeypatch.setattr(manager.upload_files, "open", finished_while_opening)
+    with pytest.raises(HTTPException) as exc:
+        await manager.save_manuscript_chunk(
+            session_id, make_upload_file(b"late"), offset=0
+        )
+
+    assert exc.value.status_code == 404
+    assert session_id not in manager.upload_files
+    with open(temp_path, "rb") as f:
+        assert f.read() == b""
+
+
+@pytest.mark.asyncio
+async def test_save_chunk_stream_writes_raw_body(manager, monkeypatch):
+    monkeypatch.setattr(ManuscriptManager, "COPY_BUFFER_MAX", 4)
+    req = SaveStartRequest(project_id=1, relative_path="docs", filename="file.txt")
+    session_id = await manager.start_manuscript_save_session(req)
+
+    async def body():
+        for piece in (b"He", b"llo", b" wor", b"ld"):
+            yield piece
+
+    await manager.save_manuscript_chunk_stream(session_id, body())
+    result = await manager.finish_manuscript_save_session(session_id)
+
+    with open(result["saved"], "rb") as f:
+        assert f.read() == b"Hello world"
+
+
+@pytest.mark.asyncio
+async def test_save_chunk_stream_invalid_session(manager):
+    async def body():
+        yield b"data"
+
+    with pytest.raises(HTTPException) as e:
+        await manager.save_manuscript_chunk_stream("invalid-id", body())
+    assert e.value.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_parallel_offset_chunks_with_preallocated_file(manager):
+    content = b"0123456789" * 10
+    req = SaveStartRequest(
+        project_id=1,
+        relative_path="docs",
+        filename="file.txt",
+        total_size=len(content),
+    )
+    session_id = await manager.start_manuscript_save_session(req)
+
+    offsets = list(range(0, len(content), 30))
+    await asyncio.gather(
+        *[
+            manager.save_manuscript_chunk(
+                session_id, make_upload_file(content[offset : offset + 30]), offset
+            )
+            for offset in reversed(offsets)
+        ]
+    )
+
+    status = await manager.get_manuscript_save_status(session_id)
+    assert status["received"] == [[0, len(content)]]
+    assert status["missing"] == []
+
+    result = await manager.finish_manuscript_save_session(session_id)
+    with open(result["saved"], "rb") as f:
+        assert f.read() == content
+
+
+@pytest.mark.asyncio
+async def test_finish_incomplete_upload_keeps_session(manager):
+    req = SaveStartRequest(
+        project_id=1, relative_path="docs", filename="file.txt", total_size=10
+    )
+    session_id = await manager.start_manuscript_save_session(req)
+    await manager.save_manuscript_chunk(session_id, make_upload_file(b"56789"), 5)
+
+    with pytest.raises(HTTPException) as e:
+        await manager.finish_manuscript_save_session(session_id)
+    assert e.value.status_code == 409
+    assert "[[0, 5]]" in e.value.detail
+    assert (await manager.get_manuscript_save_status(session_id))["missing"] == [[0, 5]]
+
+    # Retry only the missing chunk
+    await manager.save_manuscript_chunk(session_id, make_upload_file(b"01234"), 0)
+    result = await manager.finish_manuscript_save_session(session_id)
+    with open(result["saved"], "rb") as f:
+        assert f.read() == b"0123456789"
+
+
+@pytest.mark.asyncio
+async def test_retried_chunk_is_idempotent(manager):
+    req = SaveStartRequest(project_id=1, relative_path="docs", filename="file.txt")
+    session_id = await manager.start_manuscript_save_session(req)
+
+    await manager.save_manuscript_chunk(session_id, make_upload_file(b"abc"), 0)
+    await manager.save_manuscript_chunk(session_id, make_upload_file(b"def"), 3)
+    await manager.save_manuscript_chunk(session_id, make_upload_file(b"abc"), 0)
+
+    assert (await manager.get_manuscript_save_status(session_id))["received"] == [
+        [0, 6]
+    ]
+    result = await manager.finish_manuscript_save_session(session_id)
+    with open(result["saved"], "rb") as f:
+        assert f.read() == b"abcdef"
+
+
+@pytest.mark.asyncio
+async def test_chunk_outside_declared_size_is_rejected(manager):
+    req = SaveStartRequest(
+        project_id=1, relative_path="docs", filename="file.txt", total_size=4
+    )
+    session_id = await manager.start_manuscript_save_session(req)
+
+    with pytest.raises(HTTPException) as e:
+        await manager.save_manuscript_chunk(session_id, make_upload_file(b"x"), 5)
+    assert e.value.status_code == 416
+
+    with pytest.raises(HTTPException) as e:
+        await manager.save_manuscript_chunk(session_id, make_upload_file(b"xyz"), 2)
+    assert e.value.status_code == 416
+    assert (await manager.get_manuscript_save_status(session_id))["received"] == []
+
+
+@pytest.mark.asyncio
+async def test_overrunning_chunk_is_not_written(manager):
+    req = SaveStartRequest(
+        project_id=1, relative_path="docs", filename="file.txt", total_size=10
+    )
+    session_id = await manager.start_manuscript_save_session(req)
+    await manager.save_manuscript_chunk(session_id, make_upload_file(b"0123456789"), 0)
+
+    with pytest.raises(HTTPException) as e:
+        await manager.save_manuscript_chunk(
+            session_id, make_upload_file(b"XXXXXXXXXX"), 5
+        )
+    assert e.value.status_code == 416
+
+    async def body():
+        yield b"YYYY"
+        yield b"YYYY"
+
+    with pytest.raises(HTTPException) as e:
+        await manager.save_manuscript_chunk_stream(session_id, body(), 4)
+    assert e.value.status_code == 416
+
+    result = await manager.finish_manuscript_save_session(session_id)
+    with open(result["saved"], "rb") as f:
+        assert f.read() == b"0123456789"
+
+
+@pytest.mark.asyncio
+async def test_finish_truncates_to_the_declared_size(manager):
+    req = SaveStartRequest(
+        project_id=1, relative_path="docs", filename="file.txt", total_size=4
+    )
+    session_id = await manager.start_manuscript_save_session(req)
+    await manager.save_manuscript_chunk(session_id, make_upload_file(b"abcd"), 0)
+    with open(manager.sessions[session_id]["temp_path"], "ab") as f:
+        f.write(b"stray bytes")
+
+    result = await manager.finish_manuscript_save_session(session_id)
+
+    with open(result["saved"], "rb") as f:
+        assert f.read() == b"abcd"
+    assert result["metadata"]["size"] == 4
+
+
+@pytest.mark.asyncio
+async def test_save_status_invalid_session(manager):
+    with pytest.raises(HTTPException) as e:
+        await manager.get_manuscript_save_status("invalid-id")
+    assert e.value.status_code == 404
+
+
+def test_received_ranges_helpers():
+    ranges = add_received_range([], 10, 20)
+    ranges = add_received_range(ranges, 0, 5)
+    assert ranges == [[0, 5], [10, 20]]
+    assert missing_ranges(ranges, None) == [[5, 10]]
+    assert missing_ranges(ranges, 30) == [[5, 10], [20, 30]]
+
+    ranges = add_received_range(ranges, 5, 10)
+    assert ranges == [[0, 20]]
+    assert missing_ranges(ranges, 20) == []
+    assert missing_ranges([], None) == []
+
+
+async def save_file(manager, content: bytes, content_hash=None) -> dict:
+    req = SaveStartRequest(
+        project_id=1,
+        relative_path="docs",
+        filename="file.txt",
+        content_hash=content_hash,
+    )
+    session_id = await manager.start_manuscript_save_session(req)
+    await manager.save_manuscript_chunk(session_id, make_upload_file(content))
+    result = await manager.finish_manuscript_save_session(session_id)
+    assert session_id not in manager.sessions
+    return result
+
+
+@pytest.mark.asyncio
+async def test_finish_skips_write_when_content_is_identical(manager):
+    first = await save_file(manager, b"Same scene")
+    assert first["unchanged"] is False
+    file_mtime = os.stat(first["saved"]).st_mtime_ns
+
+    second = await save_file(manager, b"Same scene")
+
+    assert second["unchanged"] is True
+    assert second["saved"] == first["saved"]
+    assert second["metadata"] == first["metadata"]
+    assert os.stat(first["saved"]).st_mtime_ns == file_mtime
+
+
+@pytest.mark.asyncio
+async def test_finish_writes_same_size_different_content(manager):
+    await save_file(manager, b"Scene AAAA")
+
+    result = await save_file(manager, b"Scene BBBB")
+
+    assert result["unchanged"] is False
+    with open(result["saved"], "rb") as f:
+        assert f.read() == b"Scene BBBB"
+
+
+@pytest.mark.asyncio
+async def test_finish_uses_client_content_hash(manager):
+    await save_file(manager, b"Stored scene")
+
+    unchanged = await save_file(
+        manager, b"Stored scene", hashlib.sha256(b"Stored scene").hexdigest()
+    )
+    changed = await save_file(
+        manager, b"New scene", hashlib.sha256(b"New scene").hexdigest()
+    )
+
+    assert unchanged["unchanged"] is True
+    assert changed["unchanged"] is False
+    with open(changed["saved"], "rb") as f:
+        assert f.read() == b"New scene"
+
+
+@pytest.mark.asyncio
+async def test_finish_rejects_a_wrong_client_content_hash(manager):
+    await save_file(manager, b"Stored scene")
+    req = SaveStartRequest(
+        project_id=1,
+        relative_path="docs",
+        filename="file.txt",
+        content_hash=hashlib.sha256(b"Stored scene").hexdigest(),
+    )
+    session_id = await manager.start_manuscript_save_session(req)
+    await manager.save_manuscript_chunk(session_id, make_upload_file(b"Edited scene"))
+
+    with pytest.raises(HTTPException) as e:
+        await manager.finish_manuscript_save_session(session_id)
+
+    assert e.value.status_code == 422
+    with open(os.path.join(manager.UPLOAD_DIR, "1", "docs", "file.txt"), "rb") as f:
+        assert f.read() == b"Stored scene"
+
+
+@pytest.mark.asyncio
+async def test_check_manuscript_unchanged(manager):
+    stored = await save_file(manager, b"Stored scene")
+    check = SaveCheckRequest(
+        project_id=1,
+        relative_path="/docs",
+        filename="file.txt",
+        content_hash=hashlib.sha256(b"Stored scene").hexdigest(),
+    )
+
+    result = await manager.check_manuscript_unchanged(check)
+
+    assert result["unchanged"] is True
+    assert result["saved"] == stored["saved"]
+    assert result["metadata"] == stored["metadata"]
+
+    check.content_hash = hashlib.sha256(b"Edited scene").hexdigest()
+    assert await manager.check_manuscript_unchanged(check) == {"unchanged": False}
+
+    check.filename = "missing.txt"
+    assert await manager.check_manuscript_unchanged(check) == {"unchanged": False}
+
+
+class ThreadRecordingStore(MemorySessionStore):
+    def __init__(self):
+        super().__init__()
+        self.threads = set()
+
+    def __getitem__(self, session_id: str) -> dict:
+        self.threads.add(threading.current_thread().name)
+        return super().__getitem__(session_id)
+
+    def __setitem__(self, session_id: str, data: dict):
+        self.threads.add(threading.current_thread().name)
+        super().__setitem__(session_id, data)
+
+
+@pytest.mark.asyncio
+async def test_session_store_is_used_off_the_event_loop(manager, monkeypatch):
+    store = ThreadRecordingStore()
+    monkeypatch.setattr(ManuscriptManager, "sessions", store)
+
+    req = SaveStartRequest(project_id=1, relative_path="docs", filename="file.txt")
+    session_id = await manager.start_manuscript_save_session(req)
+    await manager.save_manuscript_chunk(session_id, make_upload_file(b"draft"))
+    await manager.get_manuscript_save_status(session_id)
+    await manager.finish_manuscript_save_session(session_id)
+
+    assert store.threads
+    assert all(name.startswith("manuscript-fs") for name in store.threads)
+
+
+@pytest.mark.asyncio
+async def test_cleanup_expires_inactive_sessions(manager, monkeypatch):
+    req = SaveStartRequest(project_id=1, relative_path="docs", filename="file.txt")
+    session_id = await manager.start_manuscript_save_session(req)
+    await manager.save_manuscript_chunk(session_id, make_upload_file(b"draft"))
+    temp_path = manager.sessions[session_id]["temp_path"]
+    assert session_id in manager.upload_files
+
+    monkeypatch.setattr(ManuscriptManager, "SESSION_TTL", -1)
+    result = await manager.cleanup_expired_sessions()
+
+    assert result["expired_sessions"] == 1
+    assert session_id not in manager.sessions
+    assert session_id not in manager.upload_files
+    assert not os.path.exists(temp_path)
+
+
+@pytest.mark.asyncio
+async def test_cleanup_removes_orphaned_part_files(manager, tmp_path, monkeypatch):
+    legacy_dir = tmp_path / "tmp"
+    legacy_dir.mkdir()
+    monkeypatch.setattr(
+        "backend.app.domain.manuscript_manager.tempfile.gettempdir",
+        lambda: str(legacy_dir),
+    )
+    req = SaveStartRequest(project_id=1, relative_path="docs", filename="file.txt")
+    session_id = await manager.start_manuscript_save_session(req)
+    await manager.save_manuscript_chunk(session_id, make_upload_file(b"live"))
+
+    staging_dir = tmp_path / "1" / ".staging"
+    orphan = staging_dir / "scene.md.0b4e7a0e-5d8f-4c1a-9a53-1f2d3c4b5a69.part"
+    orphan.write_bytes(b"left by a crashed worker")
+    legacy_orphan = legacy_dir / "scene.md.1c5f8b1f-6e9a-4d2b-8b64-2a3e4d5c6b7a.part"
+    legacy_orphan.write_bytes(b"staged by an earlier version")
+    unrelated = staging_dir / "notes.txt"
+    unrelated.write_bytes(b"keep")
+    old = time.time() - 3600
+    live = staging_dir / f"file.txt.{session_id}.part"
+    for path in (orphan, legacy_orphan, unrelated, live):
+        os.utime(path, (old, old))
+
+    monkeypatch.setattr(ManuscriptManager, "SESSION_TTL", 60)
+    result = await manager.cleanup_expired_sessions()
+
+    assert result == {"expired_sessions": 0, "removed_files": 2}
+    assert not orphan.exists()
+    assert not legacy_orphan.exists()
+    assert unrelated.exists()
+    assert os.path.exists(manager.sessions[session_id]["temp_path"])
+
+
+@pytest.mark.asyncio
+async def test_chunk_for_expired_session_is_rejected(manager, monkeypatch):
+    req = SaveStartRequest(project_id=1, relative_path="docs", filename="file.txt")
+    session_id = await manager.start_manuscript_save_session(req)
+
+    async def expire_while_writing(upload_file, start, limit):
+        manager.sessions.pop(session_id)
+        return 0
+
+    with pytest.raises(HTTPException) as exc:
+        await manager._write_chunk(session_id, None, expire_while_writing)
+    assert exc.value.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_run_session_cleanup_repeats(manager, monkeypatch):
+    calls = []
+
+    async def cleanup():
+        calls.append(1)
+        if len(calls) == 2:
+            raise asyncio.CancelledError
+
+    monkeypatch.setattr(manager, "cleanup_expired_sessions", cleanup)
+    monkeypatch.setattr(ManuscriptManager, "SESSION_CLEANUP_INTERVAL", 0)
+
+    with pytest.raises(asyncio.CancelledError):
+        await manager.run_session_cleanup()
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_run_session_cleanup_closes_idle_files(manager, monkeypatch):
+    req = SaveStartRequest(project_id=1, relative_path="docs", filename="file.txt")
+    session_id = await manager.start_manuscript_save_session(req)
+    await manager.save_manuscript_chunk(session_id, make_upload_file(b"abc"))
+    assert session_id in manager.upload_files
+
+    async def stop():
+        raise asyncio.CancelledError
+
+    monkeypatch.setattr(ManuscriptManager, "UPLOAD_IDLE_TIMEOUT", -1)
+    monkeypatch.setattr(manager, "collect_history", stop)
+    with pytest.raises(asyncio.CancelledError):
+        await manager.run_session_cleanup()
+
+    # Abandoned, no other chunk came to close it
+    assert session_id not in manager.upload_files
+    assert session_id in manager.sessions
+
+
+@pytest.mark.asyncio
+async def test_delete_path_removes_index_entries(manager):
+    stored = await save_file(manager, b"Indexed scene")
+    index = manager.metadata_index
+    assert index.get(1, "docs/file.txt")["size"] == len(b"Indexed scene")
+
+    await manager.delete_path(1, "docs")
+
+    assert index.get(1, "docs/file.txt") is None
+    assert not os.path.exists(stored["saved"])
+
+
+@pytest.mark.asyncio
+async def test_directory_metadata_indexes_files_saved_outside_the_manager(
+    manager, tmp_path
+):
+    await save_file(manager, b"one two three")
+    (tmp_path / "1" / "docs" / "copied.md").write_text("four five")
+    (tmp_path / "1" / "docs" / "metadata.json").write_text('{"legacy": true}')
+
+    metadata = await manager.get_directory_metadata(1, "/docs")
+
+    assert set(metadata["files"]) == {"file.txt", "copied.md"}
+    assert metadata["files"]["copied.md"]["word_count"] == 2
+    assert metadata["docs"]["modified_at"] == max(
+        entry["modified_at"] for entry in metadata["files"].values()
+    )
+
+    os.remove(tmp_path / "1" / "docs" / "copied.md")
+    metadata = await manager.get_directory_metadata(1, "docs")
+    assert set(metadata["files"]) == {"file.txt"}
+    assert manager.metadata_index.get(1, "docs/copied.md") is None
+
+    assert await manager.get_directory_metadata(1, "missing") == {}
+
+
+@pytest.mark.asyncio
+async def test_directory_listing_is_cached_until_the_tree_changes(manager):
+    await save_file(manager, b"First scene")
+    listing, etag = await manager.get_directory_listing(1)
+    assert [scene["title"] for scene in listing["chapters"][0]["scenes"]] == [
+        "file.txt"
+    ]
+
+    with patch("backend.app.domain.manuscript_listing.os.scandir") as mock_scandir:
+        assert await manager.get_directory_listing(1) == (listing, etag)
+        mock_scandir.assert_not_called()
+
+    req = SaveStartRequest(project_id=1, relative_path="docs", filename="other.txt")
+    session_id = await manager.start_manuscript_save_session(req)
+    await manager.save_manuscript_chunk(session_id, make_upload_file(b"Second"))
+    await manager.finish_manuscript_save_session(session_id)
+
+    listing, new_etag = await manager.get_directory_listing(1)
+    assert new_etag != etag
+    assert len(listing["chapters"][0]["scenes"]) == 2
+
+    await manager.delete_path(1, "docs/other.txt")
+    # Back to the first tree, so back to the first ETag
+    assert (await manager.get_directory_listing(1))[1] == etag
+
+
+@pytest.mark.asyncio
+async def test_directory_listing_sees_new_directories(manager):
+    await save_file(manager, b"Scene")
+    _, etag = await manager.get_directory_listing(1)
+
+    req = SaveStartRequest(project_id=1, relative_path="notes", filename="a.txt")
+    await manager.start_manuscript_save_session(req)
+
+    listing, new_etag = await manager.get_directory_listing(1)
+    assert new_etag != etag
+    assert [chapter["title"] for chapter in listing["chapters"]] == ["docs", "notes"]
+
+
+@pytest.mark.asyncio
+async def test_directory_listing_missing_project(manager):
+    with pytest.raises(HTTPException) as exc:
+        await manager.get_directory_listing(404)
+    assert exc.value.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_stream_manuscript_contents_in_request_order(manager, tmp_path):
+    chapter = tmp_path / "1" / "chapter"
+    chapter.mkdir(parents=True)
+    for name in ("a.md", "b.md", "c.md"):
+        (chapter / name).write_text(f"Scene {name}", encoding="utf-8")
+    (chapter / "binary.bin").write_bytes(b"\xff\xfe\x00")
+
+    paths = ["chapter/c.md", "/chapter/a.md", "chapter/missing.md", "chapter"]
+    paths += ["chapter/binary.bin", "chapter/b.md"]
+    results = [result async for result in manager.stream_manuscript_contents(1, paths)]
+
+    assert results == [
+        {"path": "chapter/c.md", "content": "Scene c.md"},
+        {"path": "/chapter/a.md", "content": "Scene a.md"},
+        {
+            "path": "chapter/missing.md",
+            "error": {
+                "status_code": 404,
+                "detail": "File not found: chapter/missing.md",
+            },
+        },
+        {
+            "path": "chapter",
+            "error": {"status_code": 404, "detail": "Path is not a file: chapter"},
+        },
+        {
+            "path": "chapter/binary.bin",
+            "error": {
+                "status_code": 500,
+                "detail": "File is not a valid text file: chapter/binary.bin",
+            },
+        },
+        {"path": "chapter/b.md", "content": "Scene b.md"},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_stream_manuscript_contents_bounds_concurrency(manager, monkeypatch):
+    monkeypatch.setattr(ManuscriptManager, "BULK_READ_CONCURRENCY", 2)
+    running = 0
+    peak = 0
+
+    async def slow_read(project_id, path):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return path.upper()
+
+    monkeypatch.setattr(manager, "_read_manuscript_text", slow_read)
+
+    paths = [f"scene-{i}.md" for i in range(7)]
+    results = [r async for r in manager.stream_manuscript_contents(1, paths)]
+
+    assert [result["content"] for result in results] == [p.upper() for p in paths]
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_stream_manuscript_contents_generates_metadata_json(manager):
+    await save_file(manager, b"Indexed scene")
+
+    results = [
+        r async for r in manager.stream_manuscript_contents(1, ["docs/metadata.json"])
+    ]
+
+    assert "file.txt" in json.loads(results[0]["content"])["files"]
+
+
+@pytest.mark.asyncio
+async def test_resolve_manuscript_content_paths(manager, tmp_path):
+    (tmp_path / "1" / "chapter" / "sub").mkdir(parents=True)
+    (tmp_path / "1" / "chapter" / "b.md").write_text("b")
+    (tmp_path / "1" / "chapter" / "sub" / "a.md").write_text("a")
+
+    assert await manager.resolve_manuscript_content_paths(1, paths=["x.md"]) == ["x.md"]
+    # The scenes of the chapter, as listed: files of "sub" are not scenes
+    assert await manager.resolve_manuscript_content_paths(1, directory="/chapter/") == [
+        "chapter/b.md"
+    ]
+
+    with pytest.raises(HTTPException) as exc:
+        await manager.resolve_manuscript_content_paths(1, directory="missing")
+    assert exc.value.status_code == 404
+
+    with patch(
+        "backend.app.domain.manuscript_manager.list_scenes",
+        side_effect=PermissionError("denied"),
+    ):
+        with pytest.raises(HTTPException) as exc:
+            await manager.resolve_manuscript_content_paths(1, directory="chapter")
+    assert exc.value.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_get_manuscript_file_page(manager, tmp_path):
+    chapter = tmp_path / "1" / "chapter"
+    chapter.mkdir(parents=True)
+    (chapter / "long.md").write_text("first\nsecond\nthird\n")
+    (chapter / "binary.bin").write_bytes(b"\xff\xfe")
+
+    page = await manager.get_manuscript_file_page(1, "chapter/long.md", length=6)
+    assert page["path"] == "chapter/long.md"
+    assert page["content"] == "first\n"
+
+    page = await manager.get_manuscript_file_page(
+        1, "/chapter/long.md", line=1, lines=1
+    )
+    assert page["content"] == "second\n"
+
+    for path, kwargs, status in [
+        ("chapter/missing.md", {}, 404),
+        ("chapter", {}, 404),
+        ("chapter/long.md", {"offset": 1000}, 416),
+        ("chapter/binary.bin", {}, 500),
+    ]:
+        with pytest.raises(HTTPException) as exc:
+            await manager.get_manuscript_file_page(1, path, **kwargs)
+        assert exc.value.status_code == status
+
+    with patch(
+        "backend.app.domain.manuscript_manager.read_byte_window",
+        side_effect=PermissionError("denied"),
+    ):
+        with pytest.raises(HTTPException) as exc:
+            await manager.get_manuscript_file_page(1, "chapter/long.md")
+    assert exc.value.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_search_manuscripts_streams_matches(manager, tmp_path):
+    for chapter in ("one", "two"):
+        (tmp_path / "1" / chapter).mkdir(parents=True)
+        (tmp_path / "1" / chapter / "scene.md").write_text(
+            f"Intro\nThe dragon of chapter {chapter}\n"
+        )
+    (tmp_path / "1" / "two" / "other.md").write_text("no match here")
+
+    results = await manager.search_manuscripts(1, "DRAGON")
+    matches = sorted([match async for match in results], key=lambda m: m["path"])
+
+    assert matches == [
+        {
+            "path": "one/scene.md",
+            "line": 2,
+            "match": "dragon",
+            "snippet": "The dragon of chapter one",
+        },
+        {
+            "path": "two/scene.md",
+            "line": 2,
+            "match": "dragon",
+            "snippet": "The dragon of chapter two",
+        },
+    ]
+
+    results = await manager.search_manuscripts(
+        1, "chapter (one|two)", regex=True, limit=1
+    )
+    assert len([match async for match in results]) == 1
+
+    results = await manager.search_manuscripts(1, "DRAGON", case_sensitive=True)
+    assert [match async for match in results] == []
+
+
+@pytest.mark.asyncio
+async def test_search_manuscripts_errors(manager, tmp_path):
+    (tmp_path / "1" / "one").mkdir(parents=True)
+
+    with pytest.raises(HTTPException) as exc:
+        await manager.search_manuscripts(1, "(unclosed", regex=True)
+    assert exc.value.status_code == 422
+
+    with pytest.raises(HTTPException) as exc:
+        await manager.search_manuscripts(99, "dragon")
+    assert exc.value.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_search_manuscripts_skips_files_removed_meanwhile(manager, tmp_path):
+    (tmp_path / "1" / "one").mkdir(parents=True)
+    (tmp_path / "1" / "one" / "scene.md").write_text("dragon")
+
+    results = await manager.search_manuscripts(1, "dragon")
+    os.remove(tmp_path / "1" / "one" / "scene.md")
+
+    assert [match async for match in results] == []
+
+
+@pytest.mark.asyncio
+async def test_finish_and_delete_update_full_text_index(manager):
+    req = SaveStartRequest(project_id=1, relative_path="docs", filename="file.txt")
+    session_id = await manager.start_manuscript_save_session(req)
+    await manager.save_manuscript_chunk(
+        session_id, make_upload_file(b"The dragon slept")
+    )
+    await manager.finish_manuscript_save_session(session_id)
+
+    results = await manager.search_manuscript_index(1, "drag")
+    assert [result["path"] for result in results] == ["docs/file.txt"]
+    assert "<mark>dragon</mark>" in results[0]["snippet"]
+    assert await manager.search_manuscript_index(1, "drag", prefix=False) == []
+
+    await manager.delete_path(1, "docs")
+    assert await manager.search_manuscript_index(1, "dragon") == []
+
+
+@pytest.mark.asyncio
+async def test_search_manuscript_index_without_words(manager):
+    with pytest.raises(HTTPException) as exc:
+        await manager.search_manuscript_index(1, "*-*")
+    assert exc.value.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_reindex_manuscripts(manager, tmp_path):
+    (tmp_path / "1" / "one").mkdir(parents=True)
+    (tmp_path / "1" / "one" / "scene.md").write_text("The dragon slept")
+    (tmp_path / "1" / "one" / "cover.png").write_bytes(b"\x89PNG\xff\xfe")
+    (tmp_path / "1" / "notes.md").write_text("castle notes")
+    (tmp_path / "2").mkdir()
+    manager.full_text_index.update(1, "gone.md", "dragon")
+
+    assert await manager.reindex_manuscripts() == {"1": 3, "2": 0}
+
+    results = await manager.search_manuscript_index(1, "dragon")
+    assert [result["path"] for result in results] == ["one/scene.md"]
+    assert [r["path"] for r in await manager.search_manuscript_index(1, "castle")] == [
+        "notes.md"
+    ]
+    assert manager.metadata_index.get(1, "one/scene.md")["word_count"] == 3
+
+    assert await manager.reindex_manuscripts(1) == {"1": 3}
+    with pytest.raises(HTTPException) as exc:
+        await manager.reindex_manuscripts(99)
+    assert exc.value.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_get_word_stats_per_chapter_and_project(manager, tmp_path):
+    for chapter, text in (("one", "a b c"), ("two", "d e")):
+        (tmp_path / "1" / chapter).mkdir(parents=True)
+        (tmp_path / "1" / chapter / "scene.md").write_text(text)
+    (tmp_path / "1" / "two" / "nested").mkdir()
+    (tmp_path / "1" / "two" / "nested" / "scene.md").write_text("f g h i")
+    (tmp_path / "1" / "notes.md").write_text("root notes")
+
+    stats = await manager.get_word_stats(1)
+
+    assert stats == {
+        "words": 11,
+        "chapters": [
+            {"path": "one", "words": 3, "files": 1},
+            {"path": "two", "words": 6, "files": 2},
+        ],
+    }
+
+    # Only the changed file is counted again, removed files drop out
+    os.remove(tmp_path / "1" / "notes.md")
+    (tmp_path / "1" / "one" / "scene.md").write_text("a b c d e")
+    with patch(
+        "backend.app.domain.manuscript_manager.count_words", wraps=count_words
+    ) as counted:
+        stats = await manager.get_word_stats(1)
+    counted.assert_called_once()
+    assert stats["words"] == 11
+    assert manager.metadata_index.get(1, "notes.md") is None
+
+
+@pytest.mark.asyncio
+async def test_get_word_stats_without_manuscripts(manager):
+    assert await manager.get_word_stats(7) == {"words": 0, "chapters": []}
+
+
+@pytest.mark.asyncio
+async def test_word_counts_are_cached_by_content_hash(manager, tmp_path):
+    (tmp_path / "1" / "one").mkdir(parents=True)
+    (tmp_path / "1" / "one" / "scene.md").write_text("the same words")
+    (tmp_path / "1" / "one" / "copy.md").write_text("the same words")
+
+    with patch(
+        "backend.app.domain.manuscript_manager.count_words", wraps=count_words
+    ) as counted:
+        stats = await manager.get_word_stats(1)
+
+    counted.assert_called_once()
+    assert stats["words"] == 6
+
+
+@pytest.mark.asyncio
+async def test_saves_and_deletes_are_recorded_in_word_history(manager):
+    req = SaveStartRequest(project_id=1, relative_path="docs", filename="file.txt")
+    for content in (b"one two", b"one two three"):
+        session_id = await manager.start_manuscript_save_session(req)
+        await manager.save_manuscript_chunk(session_id, make_upload_file(content))
+        await manager.finish_manuscript_save_session(session_id)
+
+    now = time.time()
+    history = await manager.get_word_history(1, now - 3600, now + 60, "minute")
+    assert history["resolution"] == "minute"
+    assert history["baseline"] == 0
+    assert history["points"][-1]["words"] == 3
+
+    file_history = await manager.get_word_history(
+        1, now - 3600, now + 60, path="/docs/file.txt"
+    )
+    assert file_history["points"][-1]["words"] == 3
+
+    await manager.delete_path(1, "docs")
+    history = await manager.get_word_history(1, now - 3600, now + 60)
+    assert history["points"][-1]["words"] == 0
+
+
+@pytest.mark.asyncio
+async def test_get_word_history_validation(manager):
+    with pytest.raises(HTTPException) as exc:
+        await manager.get_word_history(1, 0, 10, "week")
+    assert exc.value.status_code == 422
+
+    with pytest.raises(HTTPException) as exc:
+        await manager.get_word_history(1, 10, 0)
+    assert exc.value.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_finish_compresses_when_enabled(manager, monkeypatch):
+    monkeypatch.setattr(ManuscriptManager, "COMPRESSION", True)
+    monkeypatch.setattr(ManuscriptManager, "COMPRESSION_MIN_SIZE", 64)
+    text = "The dragon slept under the castle. " * 200
+    req = SaveStartRequest(project_id=1, relative_path="one", filename="scene.md")
+    session_id = await manager.start_manuscript_save_session(req)
+    await manager.save_manuscript_chunk(session_id, make_upload_file(text.encode()))
+
+    result = await manager.finish_manuscript_save_session(session_id)
+
+    assert is_compressed(result["saved"])
+    assert os.path.getsize(result["saved"]) < len(text)
+    assert (
+        result["metadata"]["content_hash"] == hashlib.sha256(text.encode()).hexdigest()
+    )
+    assert result["metadata"]["word_count"] == 1200
+    # Metadata and listings report the size of the content, not of the file
+    assert result["metadata"]["size"] == len(text)
+    listing = await manager.list_directory_contents(1)
+    assert listing["chapters"][0]["scenes"][0]["size"] == len(text)
+    assert await manager.get_manuscript_file_content(1, "one/scene.md") == text
+    assert os.listdir(os.path.join(manager.UPLOAD_DIR, "1", ".staging")) == []
+
+    # Same content again, found unchanged without a client hash
+    session_id = await manager.start_manuscript_save_session(req)
+    await manager.save_manuscript_chunk(session_id, make_upload_file(text.encode()))
+    assert (await manager.finish_manuscript_save_session(session_id))["unchanged"]
+
+
+@pytest.mark.asyncio
+async def test_finish_stores_small_and_incompressible_files_as_is(manager, monkeypatch):
+    monkeypatch.setattr(ManuscriptManager, "COMPRESSION", True)
+    monkeypatch.setattr(ManuscriptManager, "COMPRESSION_MIN_SIZE", 64)
+    for filename, content in (("note.md", b"short"), ("cover.png", os.urandom(4096))):
+        req = SaveStartRequest(project_id=1, relative_path="one", filename=filename)
+        session_id = await manager.start_manuscript_save_session(req)
+        await manager.save_manuscript_chunk(session_id, make_upload_file(content))
+
+        result = await manager.finish_manuscript_save_session(session_id)
+
+        with open(result["saved"], "rb") as f:
+            assert f.read() == content
+
+
+@pytest.mark.asyncio
+async def test_stream_compressed_file(manager, monkeypatch, tmp_path):
+    monkeypatch.setattr(ManuscriptManager, "COPY_BUFFER_MAX", 1000)
+    plain = tmp_path / "scene.md"
+    plain.write_text("dragon " * 1000)
+    compressed = tmp_path / "scene.md.gz"
+    compress_file(str(plain), str(compressed), "gzip")
+
+    assert await manager.stream_compressed_file(str(plain)) is None
+    size, stat, blocks = await manager.stream_compressed_file(str(compressed))
+
+    assert size == 7000
+    assert stat.st_size == os.path.getsize(compressed)
+    assert b"".join([block async for block in blocks()]) == plain.read_bytes()
+    window = b"".join([block async for block in blocks(2500, 4600)])
+    assert window == plain.read_bytes()[2500:4600]
+    assert b"".join([block async for block in blocks(6990)]) == b"on dragon "
+
+
+@pytest.mark.asyncio
+async def test_compress_manuscripts_migrates_existing_tree(
+    manager, monkeypatch, tmp_path
+):
+    monkeypatch.setattr(ManuscriptManager, "COMPRESSION_MIN_SIZE", 64)
+    text = "The dragon slept under the castle. " * 200
+    (tmp_path / "1" / "one").mkdir(parents=True)
+    scene = tmp_path / "1" / "one" / "scene.md"
+    scene.write_text(text)
+    (tmp_path / "1" / "one" / "note.md").write_text("short")
+    modified = os.stat(scene).st_mtime_ns
+
+    migrated = await manager.compress_manuscripts(1)
+
+    totals = migrated["1"]
+    assert (totals["files"], totals["rewritten"]) == (2, 1)
+    assert totals["size_after"] < totals["size_before"] == len(text) + 5
+    assert is_compressed(str(scene))
+    assert os.stat(scene).st_mtime_ns == modified
+    assert await manager.get_manuscript_file_content(1, "one/scene.md") == text
+    entry = manager.metadata_index.get(1, "one/scene.md")
+    assert entry["size"] == len(text)
+    manager.metadata_index.forget(1, ["one/scene.md"])
+    listing = await manager.list_directory_contents(1)
+    # Not indexed, the size is read from the header of the file
+    assert [scene["size"] for scene in listing["chapters"][0]["scenes"]] == [5, 7000]
+    assert entry["content_hash"] == hashlib.sha256(text.encode()).hexdigest()
+
+    assert (await manager.compress_manuscripts(1))["1"]["rewritten"] == 0
+    assert (await manager.compress_manuscripts(decompress=True))["1"]["rewritten"] == 1
+    assert scene.read_text() == text
+    with pytest.raises(HTTPException) as exc:
+        await manager.compress_manuscripts(99)
+    assert exc.value.status_code == 404
+
+
+async def save_scene(manager, content: bytes) -> dict:
+    req = SaveStartRequest(project_id=1, relative_path="one", filename="scene.md")
+    session_id = await manager.start_manuscript_save_session(req)
+    await manager.save_manuscript_chunk(session_id, make_upload_file(content))
+    return await manager.finish_manuscript_save_session(session_id)
+
+
+@pytest.mark.asyncio
+async def test_saves_are_kept_in_the_history(manager):
+    await save_scene(manager, b"The dragon slept.\n")
+    await save_scene(manager, b"The dragon slept.\n")
+    await save_scene(manager, b"The dragon woke up.\n")
+
+    revisions = await manager.list_manuscript_revisions(1, "/one/scene.md")
+
+    assert [r["content_hash"] for r in revisions] == [
+        hashlib.sha256(b"The dragon woke up.\n").hexdigest(),
+        hashlib.sha256(b"The dragon slept.\n").hexdigest(),
+    ]
+    revision = await manager.get_manuscript_revision(1, revisions[1]["id"])
+    assert revision["content"] == "The dragon slept.\n"
+    assert revision["path"] == "one/scene.md"
+
+    diff = await manager.diff_manuscript_revision(1, revisions[1]["id"])
+    assert "-The dragon slept." in diff["diff"]
+    assert "+The dragon woke up." in diff["diff"]
+    assert diff["to"] is None
+    same = await manager.diff_manuscript_revision(
+        1, revisions[0]["id"], revisions[0]["id"]
+    )
+    assert same["diff"] == ""
+
+    # Deleted files keep their history and compare as empty
+    await manager.delete_path(1, "one/scene.md")
+    diff = await manager.diff_manuscript_revision(1, revisions[0]["id"])
+    assert "-The dragon woke up." in diff["diff"]
+
+
+@pytest.mark.asyncio
+async def test_revisions_of_crlf_files(manager):
+    await save_scene(manager, b"one\r\ntwo\r\n")
+    await save_scene(manager, b"one\r\nthree\r\n")
+    newest, oldest = await manager.list_manuscript_revisions(1, "one/scene.md")
+
+    # The same text as /content
+    revision = await manager.get_manuscript_revision(1, newest["id"])
+    assert revision["content"] == "one\nthree\n"
+    assert revision["content"] == await manager.get_manuscript_file_content(
+        1, "one/scene.md"
+    )
+
+    assert (await manager.diff_manuscript_revision(1, newest["id"]))["diff"] == ""
+    diff = (await manager.diff_manuscript_revision(1, oldest["id"]))["diff"]
+    assert "-two\n" in diff and "+three\n" in diff
+    assert " one\n" in diff and "\r" not in diff
+
+
+@pytest.mark.asyncio
+async def test_missing_revision(manager):
+    with pytest.raises(HTTPException) as exc:
+        await manager.get_manuscript_revision(1, 42)
+    assert exc.value.status_code == 404
+
+    with pytest.raises(HTTPException) as exc:
+        await manager.diff_manuscript_revision(1, 42)
+    assert exc.value.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_collect_history_applies_retention(manager, monkeypatch):
+    monkeypatch.setattr(ManuscriptManager, "HISTORY_KEEP", 2)
+    for n in range(4):
+        await save_scene(manager, f"draft {n}\n".encode())
+
+    assert await manager.collect_history() == {"revisions": 2, "chunks": 2}
+    assert len(await manager.list_manuscript_revisions(1, "one/scene.md")) == 2
+
+
+def patch_request(base: bytes, **kwargs) -> SavePatchRequest:
+    return SavePatchRequest(
+        project_id=1,
+        relative_path="one",
+        filename="scene.md",
+        base_hash=hashlib.sha256(base).hexdigest(),
+        **kwargs,
+    )
+
+
+@pytest.mark.asyncio
+async def test_patch_manuscript_applies_a_diff(manager):
+    base = b"The dragon slept.\nThe castle was quiet.\n"
+    await save_scene(manager, base)
+    new = b"The dragon woke up.\nThe castle was quiet.\n"
+    diff = "@@ -1 +1 @@\n-The dragon slept.\n+The dragon woke up.\n"
+
+    result = await manager.patch_manuscript(
+        patch_request(base, diff=diff, content_hash=hashlib.sha256(new).hexdigest())
+    )
+
+    assert not result["unchanged"]
+    with open(result["saved"], "rb") as f:
+        assert f.read() == new
+    assert result["metadata"]["content_hash"] == hashlib.sha256(new).hexdigest()
+    assert result["metadata"]["word_count"] == 8
+    assert len(await manager.list_manuscript_revisions(1, "one/scene.md")) == 2
+    assert os.listdir(os.path.join(manager.UPLOAD_DIR, "1", ".staging")) == []
+
+    # The old base no longer applies
+    with pytest.raises(HTTPException) as exc:
+        await manager.patch_manuscript(patch_request(base, diff=diff))
+    assert exc.value.status_code == 409
+
+
+@pytest.mark.asyncio
+async def test_patch_manuscript_applies_operations(manager):
+    base = b"The dragon slept."
+    await save_scene(manager, base)
+
+    result = await manager.patch_manuscript(
+        patch_request(base, ops=[{"retain": 11}, {"delete": 5}, {"insert": "dreamt"}])
+    )
+
+    with open(result["saved"], "rb") as f:
+        assert f.read() == b"The dragon dreamt."
+
+    result = await manager.patch_manuscript(
+        patch_request(b"The dragon dreamt.", ops=[])
+    )
+    assert result["unchanged"]
+
+
+@pytest.mark.asyncio
+async def test_patch_manuscript_of_the_text_read_from_content(manager):
+    base = b"The dragon slept.\r\nThe castle was quiet.\r\n"
+    await save_scene(manager, base)
+    text = await manager.get_manuscript_file_content(1, "one/scene.md")
+    assert text == "The dragon slept.\nThe castle was quiet.\n"
+    new = "The dragon woke up.\nThe castle was quiet.\n"
+    diff = "@@ -1 +1 @@\n-The dragon slept.\n+The dragon woke up.\n"
+
+    result = await manager.patch_manuscript(
+        patch_request(
+            text.encode(),
+            diff=diff,
+            content_hash=hashlib.sha256(new.encode()).hexdigest(),
+        )
+    )
+
+    # The file keeps its newlines
+    with open(result["saved"], "rb") as f:
+        assert f.read() == b"The dragon woke up.\r\nThe castle was quiet.\r\n"
+
+    # Both spellings of the new content are a base for the next patch
+    ops = [{"retain": 11}, {"delete": 7}, {"insert": "yawned"}]
+    await manager.patch_manuscript(patch_request(new.encode(), ops=ops))
+    with open(result["saved"], "rb") as f:
+        stored = f.read()
+    assert stored == b"The dragon yawned.\r\nThe castle was quiet.\r\n"
+    await manager.patch_manuscript(patch_request(stored, ops=[{"insert": "Then "}]))
+    with open(result["saved"], "rb") as f:
+        assert f.read().startswith(b"Then The dragon yawned.\r\n")
+
+
+@pytest.mark.asyncio
+async def test_patches_of_a_file_share_one_lock(manager, monkeypatch):
+    base = b"The dragon slept."
+    await save_scene(manager, base)
+    held = []
+    stage_patch = manager._stage_patch
+
+    def record_lock(request, target):
+        held.append(list(manager.patch_locks))
+        return stage_patch(request, target)
+
+    monkeypatch.setattr(manager, "_stage_patch", record_lock)
+    await manager.patch_manuscript(patch_request(base, ops=[{"insert": "A "}]))
+    request = patch_request(b"A The dragon slept.", ops=[{"insert": "B "}])
+    request.relative_path = "one/../one/"
+    await manager.patch_manuscript(request)
+
+    # Keyed by the real path of the file, whatever its spelling
+    real_path = os.path.realpath(os.path.join(manager.UPLOAD_DIR, "1", "one"))
+    assert held == [[os.path.join(real_path, "scene.md")]] * 2
+    # and dropped once idle
+    assert len(manager.patch_locks) == 0
+
+
+@pytest.mark.asyncio
+async def test_patch_manuscript_errors(manager):
+    with pytest.raises(HTTPException) as exc:
+        await manager.patch_manuscript(patch_request(b"", diff=""))
+    assert exc.value.status_code == 409
+
+    base = b"The dragon slept.\n"
+    await save_scene(manager, base)
+
+    with pytest.raises(HTTPException) as exc:
+        await manager.patch_manuscript(
+            patch_request(base, diff="@@ -1 +1 @@\n-The castle.\n+The keep.\n")
+        )
+    assert exc.value.status_code == 422
+    assert "Patch does not apply" in exc.value.detail
+
+    with pytest.raises(HTTPException) as exc:
+        await manager.patch_manuscript(
+            patch_request(base, ops=[{"insert": "x"}], content_hash="0" * 64)
+        )
+    assert exc.value.status_code == 422
+
+    with open(os.path.join(manager.UPLOAD_DIR, "1", "one", "scene.md"), "rb") as f:
+        assert f.read() == base
+
+
+async def body(*pieces: bytes):
+    for piece in pieces:
+        yield piece
+
+
+@pytest.mark.asyncio
+async def test_save_manuscript_file_in_one_request(manager):
+    content = b"The dragon slept."
+
+    result = await manager.save_manuscript_file(
+        1, "/one/scene.md", body(b"The dragon ", b"slept.")
+    )
+
+    assert not result["unchanged"]
+    with open(result["saved"], "rb") as f:
+        assert f.read() == content
+    assert result["saved"] == os.path.join(manager.UPLOAD_DIR, "1", "one", "scene.md")
+    assert result["metadata"]["content_hash"] == hashlib.sha256(content).hexdigest()
+    assert result["metadata"]["word_count"] == 3
+    assert os.listdir(os.path.join(manager.UPLOAD_DIR, "1", ".staging")) == []
+    results = await manager.search_manuscript_index(1, "dragon")
+    assert [r["path"] for r in results] == ["one/scene.md"]
+
+    result = await manager.save_manuscript_file(
+        1,
+        "one/scene.md",
+        body(content),
+        hashlib.sha256(content).hexdigest().upper(),
+    )
+    assert result["unchanged"]
+
+
+@pytest.mark.asyncio
+async def test_save_manuscript_file_errors(manager, monkeypatch):
+    monkeypatch.setattr(ManuscriptManager, "SMALL_SAVE_MAX_SIZE", 8)
+
+    with pytest.raises(HTTPException) as exc:
+        await manager.save_manuscript_file(1, "scene.md", body(b"12345", b"67890"))
+    assert exc.value.status_code == 413
+
+    with pytest.raises(HTTPException) as exc:
+        await manager.save_manuscript_file(1, "one/", body(b"text"))
+    assert exc.value.status_code == 422
+
+    with pytest.raises(HTTPException) as exc:
+        await manager.save_manuscript_file(1, "scene.md", body(b"text"), "0" * 64)
+    assert exc.value.status_code == 422
+    assert not os.path.exists(os.path.join(manager.UPLOAD_DIR, "1", "scene.md"))
+
+
+@pytest.fixture
+def autosave(monkeypatch):
+    queue = AutosaveQueue(delay=60, max_delay=60)
+    monkeypatch.setattr(ManuscriptManager, "autosave", queue)
+    return queue
+
+
+@pytest.mark.asyncio
+async def test_autosaves_are_coalesced(manager, autosave):
+    for n in range(3):
+        status = await manager.autosave_manuscript_file(
+            1, "one/scene.md", body(f"Draft {n}.".encode())
+        )
+    assert status["path"] == "one/scene.md"
+    assert status["coalesced"] == 2
+    assert status["content_hash"] == hashlib.sha256(b"Draft 2.").hexdigest()
+    assert not os.path.exists(os.path.join(manager.UPLOAD_DIR, "1", "one", "scene.md"))
+
+    # Reading the file writes the pending autosave first
+    assert await manager.get_manuscript_file_content(1, "one/scene.md") == "Draft 2."
+    assert len(autosave) == 0
+    assert len(await manager.list_manuscript_revisions(1, "one/scene.md")) == 1
+
+
+@pytest.mark.asyncio
+async def test_flush_manuscript_autosaves(manager, autosave):
+    await manager.autosave_manuscript_file(1, "one/scene.md", body(b"Scene."))
+    await manager.autosave_manuscript_file(2, "other.md", body(b"Other."))
+    # "one.md" is a file, the scene can't be written
+    await manager.autosave_manuscript_file(1, "one.md/scene.md", body(b"Nope."))
+    os.makedirs(os.path.join(manager.UPLOAD_DIR, "1"))
+    with open(os.path.join(manager.UPLOAD_DIR, "1", "one.md"), "w") as f:
+        f.write("file")
+
+    result = await manager.flush_manuscript_autosaves(1)
+
+    assert [r["saved"] for r in result["flushed"]] == [
+        os.path.join(manager.UPLOAD_DIR, "1", "one", "scene.md")
+    ]
+    assert [r["saved"] for r in result["failed"]] == [
+        os.path.join(manager.UPLOAD_DIR, "1", "one.md", "scene.md")
+    ]
+    assert len(autosave) == 2
+    result = await manager.flush_manuscript_autosaves()
+    assert [r["metadata"]["size"] for r in result["flushed"]] == [6]
+
+
+@pytest.mark.asyncio
+async def test_saves_and_deletes_drop_pending_autosaves(manager, autosave):
+    await manager.autosave_manuscript_file(1, "one/scene.md", body(b"Autosaved."))
+    await manager.save_manuscript_file(1, "one/scene.md", body(b"Saved."))
+    await manager.autosave_manuscript_file(1, "one/other.md", body(b"Autosaved."))
+    await manager.delete_path(1, "one")
+
+    assert len(autosave) == 0
+    assert await manager.flush_manuscript_autosaves() == {"flushed": [], "failed": []}
+    assert not os.path.exists(os.path.join(manager.UPLOAD_DIR, "1", "one"))
+
+
+def test_copy_buffer_size_is_bounded():
+    assert copy_buffer_size(None, 64, 1024) == 1024
+    assert copy_buffer_size(10, 64, 1024) == 64
+    assert copy_buffer_size(500, 64, 1024) == 500
+    assert copy_buffer_size(5000, 64, 1024) == 1024
 
 
 @pytest.mark.asyncio
@@ -77,7 +1427,7 @@ async def test_finish_invalid_session(manager):
 async def test_update_metadata_existing_file(manager):
     # Crear sesión y archivo final
     req = SaveStartRequest(project_id=1, relative_path="docs", filename="file.txt")
-    session_id = manager.start_manuscript_save_session(req)
+    session_id = await manager.start_manuscript_save_session(req)
     data = manager.sessions[session_id]
     final_path = os.path.join(
         data["project_path"], data["relative_path"], data["filename"]
@@ -113,15 +1463,81 @@ async def test_move_temp_file_failure(manager, monkeypatch):
         "temp_path": temp_file.name,
     }
 
-    # Forzar error en shutil.move
-    def fake_move(src, dst):
+    # Forzar error en os.replace
+    def fake_replace(src, dst):
         raise OSError("cannot move")
 
-    monkeypatch.setattr("backend.app.domain.manuscript_manager.shutil.move", fake_move)
+    monkeypatch.setattr(
+        "backend.app.domain.manuscript_upload_files.os.replace", fake_replace
+    )
 
     with pytest.raises(HTTPException) as e:
         await ManuscriptManager._move_temp_file_to_final_destination(data)
     assert e.value.status_code == 500
+    assert not os.path.exists(temp_file.name)
+
+
+@pytest.mark.asyncio
+async def test_upload_is_staged_next_to_the_project(manager, tmp_path, monkeypatch):
+    # Only the fsyncs of the upload itself
+    monkeypatch.setattr(ManuscriptManager, "HISTORY", False)
+    req = SaveStartRequest(project_id=1, relative_path="docs", filename="file.txt")
+    session_id = await manager.start_manuscript_save_session(req)
+    temp_path = manager.sessions[session_id]["temp_path"]
+    await manager.save_manuscript_chunk(session_id, make_upload_file(b"Hello"))
+
+    assert os.path.dirname(temp_path) == str(tmp_path / "1" / ".staging")
+
+    with (
+        patch("backend.app.domain.manuscript_upload_files.shutil.move") as move,
+        patch("backend.app.domain.manuscript_upload_files.os.fsync") as fsync,
+    ):
+        result = await manager.finish_manuscript_save_session(session_id)
+
+    move.assert_not_called()
+    # The file before the rename and its directory after it
+    assert fsync.call_count == 2
+    assert not os.path.exists(temp_path)
+    with open(result["saved"], "rb") as f:
+        assert f.read() == b"Hello"
+
+    listing = await manager.list_directory_contents(1)
+    assert [chapter["path"] for chapter in listing["chapters"]] == ["docs"]
+
+
+@pytest.mark.parametrize("policy, fsyncs", [("full", 2), ("file", 1), ("none", 0)])
+def test_commit_upload_file_fsync_policy(tmp_path, policy, fsyncs):
+    temp_path = tmp_path / "file.txt.part"
+    temp_path.write_bytes(b"new")
+    final_path = tmp_path / "file.txt"
+    final_path.write_bytes(b"old")
+
+    with patch("backend.app.domain.manuscript_upload_files.os.fsync") as fsync:
+        commit_upload_file(str(temp_path), str(final_path), policy)
+
+    assert fsync.call_count == fsyncs
+    assert final_path.read_bytes() == b"new"
+    assert not temp_path.exists()
+
+
+def test_commit_upload_file_across_devices(tmp_path):
+    temp_path = tmp_path / "file.txt.part"
+    temp_path.write_bytes(b"new")
+    final_path = tmp_path / "file.txt"
+
+    with patch(
+        "backend.app.domain.manuscript_upload_files.os.replace",
+        side_effect=OSError(errno.EXDEV, "Invalid cross-device link"),
+    ):
+        commit_upload_file(str(temp_path), str(final_path), "none")
+
+    assert final_path.read_bytes() == b"new"
+
+
+def test_check_fsync_policy():
+    assert check_fsync_policy("file") == "file"
+    with pytest.raises(ValueError):
+        check_fsync_policy("sometimes")
 
 
 class TestDeletePath:
@@ -368,15 +1784,17 @@ class TestGetManuscriptFileContent:
         assert relative_path in exc.value.detail
 
     @pytest.mark.asyncio
-    @patch("backend.app.domain.manuscript_manager.aiofiles.open")
-    async def test_get_file_content_permission_error(self, mock_aiofiles_open, manager):
+    @patch("backend.app.domain.manuscript_manager.read_stored_text")
+    async def test_get_file_content_permission_error(
+        self, mock_read_stored_text, manager
+    ):
         """Test permission error handling"""
         # Arrange
         project_id = 8
         relative_path = "protected/file.txt"
 
         # Mock file operations to simulate permission error
-        mock_aiofiles_open.side_effect = PermissionError("Access denied")
+        mock_read_stored_text.side_effect = PermissionError("Access denied")
 
         with patch(
             "backend.app.domain.manuscript_manager.os.path.exists",
@@ -395,9 +1813,9 @@ class TestGetManuscriptFileContent:
                 assert relative_path in exc.value.detail
 
     @pytest.mark.asyncio
-    @patch("backend.app.domain.manuscript_manager.aiofiles.open")
+    @patch("backend.app.domain.manuscript_manager.read_stored_text")
     async def test_get_file_content_unicode_decode_error(
-        self, mock_aiofiles_open, manager
+        self, mock_read_stored_text, manager
     ):
         """Test handling of binary/non-text files"""
         # Arrange
@@ -405,7 +1823,7 @@ class TestGetManuscriptFileContent:
         relative_path = "binary_file.exe"
 
         # Mock file operations to simulate unicode decode error
-        mock_aiofiles_open.side_effect = UnicodeDecodeError(
+        mock_read_stored_text.side_effect = UnicodeDecodeError(
             "utf-8", b"\x80\x81", 0, 1, "invalid start byte"
         )
 
@@ -426,8 +1844,8 @@ class TestGetManuscriptFileContent:
                 assert relative_path in exc.value.detail
 
     @pytest.mark.asyncio
-    @patch("backend.app.domain.manuscript_manager.aiofiles.open")
-    async def test_get_file_content_os_error(self, mock_aiofiles_open, manager):
+    @patch("backend.app.domain.manuscript_manager.read_stored_text")
+    async def test_get_file_content_os_error(self, mock_read_stored_text, manager):
         """Test handling of generic OS errors"""
         # Arrange
         project_id = 10
@@ -436,7 +1854,7 @@ class TestGetManuscriptFileContent:
         # Mock file operations to simulate OS error
         mock_os_error = OSError("Disk I/O error")
         mock_os_error.strerror = "Disk I/O error"
-        mock_aiofiles_open.side_effect = mock_os_error
+        mock_read_stored_text.side_effect = mock_os_error
 
         with patch(
             "backend.app.domain.manuscript_manager.os.path.exists",
@@ -713,10 +2131,10 @@ class TestListDirectoryContents:
         project_dir.mkdir(parents=True)
 
         # Act & Assert
-        with patch("backend.app.domain.manuscript_manager.os.walk") as mock_walk:
+        with patch("backend.app.domain.manuscript_listing.os.scandir") as mock_scandir:
             mock_os_error = OSError("I/O error")
             mock_os_error.strerror = "I/O error"
-            mock_walk.side_effect = mock_os_error
+            mock_scandir.side_effect = mock_os_error
 
             with pytest.raises(HTTPException) as exc:
                 await manager.list_directory_contents(project_id)
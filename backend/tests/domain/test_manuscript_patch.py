@@ -0,0 +1,84 @@
+import difflib
+
+import pytest
+
+from backend.app.domain.manuscript_patch import apply_operations, apply_unified_diff
+
+SCENE = "The dragon slept.\nThe castle was quiet.\n\nMorning came.\n"
+
+
+def unified_diff(old: str, new: str, context: int = 3) -> str:
+    return "".join(
+        difflib.unified_diff(
+            old.splitlines(keepends=True),
+            new.splitlines(keepends=True),
+            "a/scene.md",
+            "b/scene.md",
+            n=context,
+        )
+    )
+
+
+@pytest.mark.parametrize("context", [0, 1, 3])
+def test_apply_unified_diff(context):
+    new = "The dragon woke up.\nThe castle was quiet.\n\nMorning came.\nThe end.\n"
+
+    assert apply_unified_diff(SCENE, unified_diff(SCENE, new, context)) == new
+
+
+def test_apply_unified_diff_without_final_newline():
+    diff = (
+        "--- a/scene.md\n"
+        "+++ b/scene.md\n"
+        "@@ -4 +4,2 @@\n"
+        " Morning came.\n"
+        "+Night fell.\n"
+        "\\ No newline at end of file\n"
+    )
+
+    assert apply_unified_diff(SCENE, diff) == SCENE + "Night fell."
+
+
+def test_apply_unified_diff_keeps_crlf_lines():
+    old = "one\r\ntwo\r\n"
+    diff = "@@ -2 +2 @@\n-two\r\n+three\r\n"
+
+    assert apply_unified_diff(old, diff) == "one\r\nthree\r\n"
+
+
+def test_apply_unified_diff_with_trimmed_blank_context_line():
+    diff = "@@ -2,3 +2,3 @@\n The castle was quiet.\n\n-Morning came.\n+Dawn.\n"
+
+    assert apply_unified_diff(SCENE, diff) == SCENE.replace("Morning came.", "Dawn.")
+
+
+@pytest.mark.parametrize(
+    "diff",
+    [
+        "@@ -1 +1 @@\n-The dragon is awake.\n+The dragon woke up.\n",
+        "@@ -1,2 +1 @@\n-The dragon slept.\n",
+        "@@ -9 +9 @@\n-x\n+y\n",
+        "@@ nonsense @@\n",
+        "@@ -1 +1 @@\n*The dragon slept.\n",
+    ],
+)
+def test_apply_unified_diff_rejects_diffs_that_do_not_apply(diff):
+    with pytest.raises(ValueError):
+        apply_unified_diff(SCENE, diff)
+
+
+def test_apply_operations():
+    operations = [
+        {"retain": 11},
+        {"delete": 5},
+        {"insert": "woke up"},
+    ]
+
+    assert apply_operations(SCENE, operations) == SCENE.replace("slept", "woke up")
+    assert apply_operations("ñandú", [{"retain": 4}, {"insert": "!"}]) == "ñand!ú"
+    assert apply_operations(SCENE, []) == SCENE
+
+
+def test_apply_operations_past_the_end():
+    with pytest.raises(ValueError):
+        apply_operations("short", [{"retain": 3}, {"delete": 3}])
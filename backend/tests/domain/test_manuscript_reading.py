@@ -0,0 +1,76 @@
+import pytest
+
+from backend.app.domain import manuscript_reading
+from backend.app.domain.manuscript_reading import read_byte_window, read_line_window
+
+
+@pytest.fixture
+def text_file(tmp_path):
+    path = tmp_path / "novel.md"
+    path.write_text("línea uno\nlínea dos\nlínea tres\n", encoding="utf-8")
+    return str(path)
+
+
+def test_byte_window_pages_through_the_file(text_file):
+    data = open(text_file, "rb").read()
+    content = ""
+    offset = 0
+    while True:
+        page = read_byte_window(text_file, offset, 4)
+        assert page["offset"] == offset
+        content += page["content"]
+        offset = page["next_offset"]
+        if page["eof"]:
+            break
+
+    assert content == data.decode("utf-8")
+    assert page["size"] == len(data)
+
+
+def test_byte_window_aligns_to_characters(text_file):
+    # "í" takes bytes 1 and 2, offset 2 is inside it
+    page = read_byte_window(text_file, 2, 3)
+    assert page["offset"] == 3
+    assert page["content"] == "ne"
+
+    # A window ending inside "í" is completed instead of cut
+    page = read_byte_window(text_file, 0, 2)
+    assert page["content"] == "lí"
+    assert page["next_offset"] == 3
+
+
+def test_byte_window_past_the_end(text_file):
+    size = len(open(text_file, "rb").read())
+
+    assert read_byte_window(text_file, size, 10)["content"] == ""
+    assert read_byte_window(text_file, size, 10)["eof"] is True
+    with pytest.raises(ValueError):
+        read_byte_window(text_file, size + 1, 10)
+
+
+def test_line_window(text_file, monkeypatch):
+    monkeypatch.setattr(manuscript_reading, "READ_BLOCK_SIZE", 5)
+
+    page = read_line_window(text_file, 1, 1)
+    assert page["content"] == "línea dos\n"
+    assert page["line"] == 1
+    assert page["next_line"] == 2
+    assert page["eof"] is False
+
+    following = read_line_window(text_file, page["next_line"], 10)
+    assert following["content"] == "línea tres\n"
+    assert following["offset"] == page["next_offset"]
+    assert following["next_line"] == 3
+    assert following["eof"] is True
+
+    assert read_line_window(text_file, 10, 5)["content"] == ""
+
+
+def test_line_window_without_trailing_newline(tmp_path):
+    path = tmp_path / "scene.md"
+    path.write_text("one\ntwo")
+
+    page = read_line_window(str(path), 0, 5)
+    assert page["content"] == "one\ntwo"
+    assert page["next_line"] == 2
+    assert page["eof"] is True
@@ -0,0 +1,67 @@
+import re
+
+import pytest
+
+from backend.app.domain.manuscript_search import (
+    SNIPPET_CONTEXT,
+    compile_search_pattern,
+    search_file,
+)
+
+
+def test_compile_search_pattern():
+    assert compile_search_pattern("a.b", False, True).search(b"a.b")
+    assert not compile_search_pattern("a.b", False, True).search(b"axb")
+    assert compile_search_pattern("a.b", True, True).search(b"axb")
+    assert compile_search_pattern("Dragon", False, False).search(b"DRAGON")
+    assert not compile_search_pattern("Dragon", False, True).search(b"dragon")
+    with pytest.raises(re.error):
+        compile_search_pattern("(unclosed", True, False)
+
+
+def test_search_file_reports_lines_and_snippets(tmp_path):
+    path = tmp_path / "scene.md"
+    path.write_text(
+        "The dragon slept.\nNothing here.\nÉl vio al dragón y al dragon.\n",
+        encoding="utf-8",
+    )
+    pattern = compile_search_pattern("dragon", False, False)
+
+    matches = search_file(str(path), pattern, 10)
+
+    assert [(m["line"], m["match"]) for m in matches] == [
+        (1, "dragon"),
+        (3, "dragon"),
+    ]
+    assert matches[0]["snippet"] == "The dragon slept."
+    assert matches[1]["snippet"] == "Él vio al dragón y al dragon."
+
+    assert len(search_file(str(path), pattern, 1)) == 1
+
+
+def test_search_file_utf8_query(tmp_path):
+    path = tmp_path / "scene.md"
+    path.write_text("uno\nÉl vio al dragón\n", encoding="utf-8")
+
+    matches = search_file(str(path), compile_search_pattern("dragón", False, True), 10)
+
+    assert matches == [{"line": 2, "match": "dragón", "snippet": "Él vio al dragón"}]
+
+
+def test_search_file_trims_long_lines(tmp_path):
+    path = tmp_path / "scene.md"
+    path.write_text("a" * 500 + "needle" + "b" * 500)
+
+    match = search_file(str(path), compile_search_pattern("needle", False, True), 10)[0]
+
+    assert match["snippet"] == "a" * SNIPPET_CONTEXT + "needle" + "b" * SNIPPET_CONTEXT
+
+
+def test_search_file_empty_file_and_empty_matches(tmp_path):
+    empty = tmp_path / "empty.md"
+    empty.write_text("")
+    assert search_file(str(empty), compile_search_pattern("x", False, True), 10) == []
+
+    path = tmp_path / "scene.md"
+    path.write_text("abc")
+    assert search_file(str(path), compile_search_pattern("x*", True, True), 10) == []
@@ -0,0 +1,107 @@
+import time
+
+import pytest
+
+from backend.app.domain.manuscript_sessions import (
+    MemorySessionStore,
+    SessionStore,
+    SQLiteSessionStore,
+    create_session_store,
+)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    store = create_session_store(request.param, str(tmp_path / "sessions.db"))
+    yield store
+    if isinstance(store, SQLiteSessionStore):
+        store.close()
+
+
+def test_store_behaves_like_a_dict(store):
+    store["a"] = {"filename": "scene.md", "received": []}
+
+    assert "a" in store
+    assert "b" not in store
+    assert store["a"]["filename"] == "scene.md"
+    assert store.get("b") is None
+    assert list(store) == ["a"]
+    assert len(store) == 1
+
+    del store["a"]
+    assert "a" not in store
+    with pytest.raises(KeyError):
+        del store["a"]
+
+    store["c"] = {}
+    store.clear()
+    assert len(store) == 0
+
+
+def test_modify_updates_session(store):
+    store["a"] = {"received": []}
+
+    result = store.modify("a", lambda data: data["received"].append([0, 10]))
+
+    assert result == {"received": [[0, 10]]}
+    assert store["a"] == {"received": [[0, 10]]}
+
+
+def test_modify_discards_change_on_error(store):
+    store["a"] = {"received": []}
+
+    def failing(data):
+        data["received"].append([0, 10])
+        raise ValueError("rejected")
+
+    with pytest.raises(ValueError):
+        store.modify("a", failing)
+
+    assert store["a"] == {"received": []}
+
+
+def test_modify_unknown_session(store):
+    with pytest.raises(KeyError):
+        store.modify("missing", lambda data: None)
+
+
+def test_expire_returns_inactive_sessions(store, monkeypatch):
+    store["old"] = {"temp_path": "old.part"}
+    now = time.time()
+    monkeypatch.setattr(
+        "backend.app.domain.manuscript_sessions.time.time", lambda: now + 100
+    )
+    store["recent"] = {"temp_path": "recent.part"}
+
+    expired = store.expire(50)
+
+    assert expired == {"old": {"temp_path": "old.part"}}
+    assert "old" not in store
+    assert "recent" in store
+
+
+def test_sqlite_store_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    first = SQLiteSessionStore(path)
+    second = SQLiteSessionStore(path)
+
+    first["a"] = {"received": []}
+    second.modify("a", lambda data: data["received"].append([0, 5]))
+
+    assert first["a"] == {"received": [[0, 5]]}
+    first.close()
+    second.close()
+
+
+def test_create_session_store():
+    assert isinstance(create_session_store("memory", ""), MemorySessionStore)
+    with pytest.raises(ValueError):
+        create_session_store("redis", "")
+
+
+def test_stores_must_implement_modify_and_expire():
+    class DictStore(SessionStore):
+        __getitem__ = __setitem__ = __delitem__ = __iter__ = __len__ = None
+
+    with pytest.raises(TypeError):
+        DictStore()
@@ -0,0 +1,61 @@
+from backend.app.domain.manuscript_tree_cache import (
+    ManuscriptTreeCache,
+    etag_matches,
+    listing_etag,
+)
+
+
+def test_listing_etag_depends_on_content():
+    listing = {"path": "", "chapters": [{"title": "one"}]}
+
+    assert listing_etag(listing) == listing_etag(dict(listing))
+    assert listing_etag(listing) != listing_etag({"path": "", "chapters": []})
+    assert listing_etag(listing).startswith('"')
+
+
+def test_etag_matches():
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('W/"abc"', '"abc"')
+    assert etag_matches('"x", "abc"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"x"', '"abc"')
+    assert not etag_matches(None, '"abc"')
+
+
+def test_cache_hit_until_invalidated(tmp_path):
+    cache = ManuscriptTreeCache()
+    project = str(tmp_path)
+    listing = {"path": "", "chapters": []}
+
+    version = cache.current_version(project)
+    assert version is not None
+    assert cache.current_version(project) == version
+    assert cache.get(project, version) is None
+
+    etag = cache.put(project, version, listing)
+    assert cache.get(project, cache.current_version(project)) == (listing, etag)
+
+    cache.invalidate(project)
+    assert cache.get(project, cache.current_version(project)) is None
+
+
+def test_cache_sees_changes_made_by_another_instance(tmp_path):
+    first = ManuscriptTreeCache()
+    second = ManuscriptTreeCache()
+    project = str(tmp_path)
+
+    version = first.current_version(project)
+    first.put(project, version, {"chapters": []})
+
+    second.invalidate(project)
+
+    assert first.get(project, first.current_version(project)) is None
+
+
+def test_missing_project_is_not_cached(tmp_path):
+    cache = ManuscriptTreeCache()
+    project = str(tmp_path / "missing")
+
+    assert cache.current_version(project) is None
+    cache.put(project, None, {"chapters": []})
+    assert cache.get(project, None) is None
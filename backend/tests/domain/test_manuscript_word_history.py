@@ -0,0 +1,105 @@
+from backend.app.domain.manuscript_word_history import (
+    DAY,
+    HOUR,
+    MINUTE,
+    WordCountHistory,
+    get_word_history,
+)
+
+# Midnight UTC
+T0 = 1_700_006_400
+
+
+def test_record_keeps_one_snapshot_per_minute_and_skips_unchanged(tmp_path):
+    history = WordCountHistory(str(tmp_path / "index.db"))
+
+    assert history.record(1, "one/scene.md", 10, T0)
+    assert history.record(1, "one/scene.md", 12, T0 + 5)
+    assert history.record(1, "one/scene.md", 15, T0 + 50)
+    assert not history.record(1, "one/scene.md", 15, T0 + 70)
+    assert history.record(1, "one/scene.md", 20, T0 + 130)
+
+    series = history.series(1, T0, T0 + DAY, MINUTE)
+
+    assert series == {
+        "baseline": 0,
+        "points": [{"time": T0, "words": 15}, {"time": T0 + 120, "words": 20}],
+    }
+    history.close()
+
+
+def test_series_sums_files_and_keeps_baseline(tmp_path):
+    history = WordCountHistory(str(tmp_path / "index.db"))
+    history.record(1, "one/a.md", 100, T0)
+    history.record(1, "two/b.md", 50, T0 + HOUR)
+    history.record(1, "one/a.md", 120, T0 + DAY)
+    history.record(1, "two/b.md", 80, T0 + DAY + HOUR)
+    history.record(2, "one/a.md", 999, T0 + DAY)
+
+    series = history.series(1, T0 + DAY, T0 + 3 * DAY, DAY)
+    assert series == {"baseline": 150, "points": [{"time": T0 + DAY, "words": 200}]}
+
+    series = history.series(1, T0, T0 + 3 * DAY, HOUR, path="two/b.md")
+    assert series["points"] == [
+        {"time": T0 + HOUR, "words": 50},
+        {"time": T0 + DAY + HOUR, "words": 80},
+    ]
+
+    assert history.series(1, T0, T0 + HOUR - 1, DAY)["points"] == [
+        {"time": T0, "words": 100}
+    ]
+    history.close()
+
+
+def test_record_removed_directory(tmp_path):
+    history = WordCountHistory(str(tmp_path / "index.db"))
+    history.record(1, "one/a.md", 100, T0)
+    history.record(1, "one/b.md", 10, T0)
+    history.record(1, "one_b/c.md", 5, T0)
+
+    assert history.record_removed(1, "one", T0 + HOUR) == 2
+    assert history.record_removed(1, "one", T0 + 2 * HOUR) == 0
+    assert history.series(1, T0, T0 + DAY, HOUR)["points"][-1] == {
+        "time": T0 + HOUR,
+        "words": 5,
+    }
+
+    assert history.record_removed(1, ".", T0 + 3 * HOUR) == 1
+    assert history.series(1, T0, T0 + DAY, DAY)["points"] == [{"time": T0, "words": 0}]
+    history.close()
+
+
+def test_compact_downsamples_minutes_to_hours_to_days(tmp_path):
+    history = WordCountHistory(str(tmp_path / "index.db"))
+    for minute in range(120):
+        history.record(1, "one/a.md", minute + 1, T0 + minute * MINUTE)
+
+    def rows():
+        return history._connection.execute(
+            "SELECT bucket, resolution, word_count FROM word_history ORDER BY bucket"
+        ).fetchall()
+
+    # Nothing old enough yet
+    assert history.compact(T0 + DAY) == 0
+
+    assert history.compact(T0 + 3 * DAY) == 118
+    assert rows() == [(T0, HOUR, 60), (T0 + HOUR, HOUR, 120)]
+
+    assert history.compact(T0 + 92 * DAY) == 1
+    assert rows() == [(T0, DAY, 120)]
+
+    # Snapshots survive the downsampling
+    history.record(1, "one/a.md", 130, T0 + 92 * DAY)
+    assert history.series(1, T0, T0 + 93 * DAY, DAY)["points"] == [
+        {"time": T0, "words": 120},
+        {"time": T0 + 92 * DAY, "words": 130},
+    ]
+    history.close()
+
+
+def test_get_word_history_is_cached(tmp_path):
+    upload_dir = str(tmp_path / "manuscripts")
+
+    history = get_word_history(upload_dir)
+
+    assert get_word_history(upload_dir) is history
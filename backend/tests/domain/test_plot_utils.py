@@ -6,6 +6,8 @@ from backend.app.domain.plot_utils import (
     delete_plot_steps_by_plot_id,
     plot_with_steps_factory,
     plot_list_with_steps_factory,
+    plot_list_from_project_aggregate,
+    CharacterLookup,
 )
 from backend.app.schemas.sections.character_schemas import CharacterSchema
 from backend.app.schemas.sections.plot_schemas import PlotSchemaWithSteps
@@ -68,7 +70,7 @@ async def test_plot_with_steps_factory_builds_schema():
 
     plot_repo.get_plot_step_list.return_value = steps
     plot_repo.get_plot.return_value = plot
-    char_repo.get_character.return_value = character
+    char_repo.get_characters_by_ids.return_value = [character]
 
     # Act
     result = await plot_with_steps_factory(plot_repo, char_repo, 10)
@@ -100,7 +102,7 @@ async def test_plot_with_steps_factory_raises_on_missing_character():
     )
     plot_repo.get_plot_step_list.return_value = []
     plot_repo.get_plot.return_value = plot
-    char_repo.get_character.return_value = None
+    char_repo.get_characters_by_ids.return_value = []
 
     with pytest.raises(HTTPException) as exc:
         await plot_with_steps_factory(plot_repo, char_repo, 10)
@@ -124,8 +126,9 @@ async def test_plot_list_with_steps_factory_builds_list(monkeypatch):
     plot_repo = AsyncMock()
     char_repo = AsyncMock()
 
-    plot1 = Dummy(id=1)
-    plot2 = Dummy(id=2)
+    plot1 = Dummy(id=1, characterReferencesIDs=[100])
+    plot2 = Dummy(id=2, characterReferencesIDs=[100, 101])
+    char_repo.get_characters_by_ids.return_value = []
     plot_repo.get_plots_by_project_id.return_value = [plot1, plot2]
 
     fake_result = PlotSchemaWithSteps(
@@ -151,3 +154,92 @@ async def test_plot_list_with_steps_factory_builds_list(monkeypatch):
 
     assert result == [fake_result, fake_result]
     plot_repo.get_plots_by_project_id.assert_awaited_once_with(5)
+    char_repo.get_characters_by_ids.assert_awaited_once_with([100, 101])
+
+
+async def test_plot_list_from_project_aggregate_uses_loaded_sections():
+    char_repo = AsyncMock()
+
+    character = Dummy(
+        id=100,
+        name="Alice",
+        importance=1,
+        characteristics="brave",
+        motivation="justice",
+        objetive="goal",
+        conflict="conflict",
+        epiphany="aha",
+        resumePhrase="phrase",
+        projectID=5,
+    )
+    step = Dummy(
+        id=1, plotID=10, name="s1", goal="g1", nextStepID=None, previousStepID=None
+    )
+    plot = Dummy(
+        id=10,
+        projectID=5,
+        title="My Plot",
+        description="desc",
+        plotStepsResume="resume",
+        result="success",
+        importance=3,
+        characterReferencesIDs=[100],
+        steps=[step],
+    )
+    project = Dummy(characters=[character], plots=[plot])
+
+    result = await plot_list_from_project_aggregate(project, char_repo)
+
+    assert len(result) == 1
+    assert result[0].plotSteps[0].id == 1
+    assert result[0].characters[0].name == "Alice"
+    char_repo.get_characters_by_ids.assert_not_awaited()
+
+
+async def test_plot_list_from_project_aggregate_raises_on_missing_character():
+    char_repo = AsyncMock()
+    char_repo.get_characters_by_ids.return_value = []
+
+    plot = Dummy(
+        id=10,
+        projectID=5,
+        title="My Plot",
+        description="desc",
+        plotStepsResume="resume",
+        result="success",
+        importance=3,
+        characterReferencesIDs=[999],
+        steps=[],
+    )
+    project = Dummy(characters=[], plots=[plot])
+
+    with pytest.raises(HTTPException) as exc:
+        await plot_list_from_project_aggregate(project, char_repo)
+
+    assert exc.value.status_code == 422
+    char_repo.get_characters_by_ids.assert_awaited_once_with([999])
+
+
+async def test_character_lookup_loads_each_character_once():
+    char_repo = AsyncMock()
+    alice = Dummy(id=1)
+    bob = Dummy(id=2)
+    char_repo.get_characters_by_ids.return_value = [alice, bob]
+
+    lookup = CharacterLookup(char_repo)
+    first = await lookup.resolve([1, 2, 1])
+    second = await lookup.resolve([2])
+
+    assert first == [alice, bob, alice]
+    assert second == [bob]
+    char_repo.get_characters_by_ids.assert_awaited_once_with([1, 2])
+
+
+async def test_character_lookup_seeded_characters_skip_queries():
+    char_repo = AsyncMock()
+    alice = Dummy(id=1)
+
+    lookup = CharacterLookup(char_repo, [alice])
+
+    assert await lookup.resolve([1]) == [alice]
+    char_repo.get_characters_by_ids.assert_not_awaited()
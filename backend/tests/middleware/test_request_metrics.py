@@ -0,0 +1,153 @@
+import pytest
+from fastapi import FastAPI, Depends
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend.app.domain.manuscript_manager import ManuscriptManager
+from backend.app.middleware.request_metrics import (
+    MetricsJSONResponse,
+    RequestMetrics,
+    RequestMetricsMiddleware,
+    RequestMetricsRegistry,
+    UNMATCHED_ROUTE,
+    current_request_metrics,
+    install_query_counter,
+    metrics_router,
+    request_metrics_registry,
+)
+
+
+@pytest.fixture
+def registry():
+    return RequestMetricsRegistry()
+
+
+@pytest.fixture
+def client(registry):
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    install_query_counter(engine.sync_engine)
+    session_factory = async_sessionmaker(engine)
+
+    async def get_session():
+        async with session_factory() as session:
+            yield session
+
+    app = FastAPI(default_response_class=MetricsJSONResponse)
+    app.add_middleware(RequestMetricsMiddleware, registry=registry)
+
+    @app.get("/queries/{count}")
+    async def run_queries(count: int, session=Depends(get_session)):
+        for _ in range(count):
+            await session.execute(text("SELECT 1"))
+        return {"count": count}
+
+    return TestClient(app)
+
+
+def parse_server_timing(header: str) -> dict:
+    metrics = {}
+    for entry in header.split(", "):
+        name, *params = entry.split(";")
+        metrics[name] = dict(param.split("=", 1) for param in params)
+    return metrics
+
+
+def test_server_timing_header_counts_queries(client):
+    response = client.get("/queries/3")
+
+    assert response.status_code == 200
+    timing = parse_server_timing(response.headers["server-timing"])
+    assert timing["db"]["desc"] == '"3 queries"'
+    assert float(timing["db"]["dur"]) >= 0
+    assert float(timing["serialization"]["dur"]) >= 0
+    assert float(timing["total"]["dur"]) >= float(timing["db"]["dur"])
+    assert response.headers["timing-allow-origin"] == "*"
+
+
+def test_metrics_are_scoped_per_request(client):
+    client.get("/queries/4")
+    response = client.get("/queries/1")
+
+    timing = parse_server_timing(response.headers["server-timing"])
+    assert timing["db"]["desc"] == '"1 queries"'
+
+
+def test_registry_aggregates_by_route_template(client, registry):
+    client.get("/queries/2")
+    client.get("/queries/4")
+
+    routes = registry.snapshot()
+
+    assert len(routes) == 1
+    assert routes[0]["route"] == "GET /queries/{count}"
+    assert routes[0]["requests"] == 2
+    assert routes[0]["queries"] == 6
+    assert routes[0]["max_queries"] == 4
+    assert routes[0]["avg_queries"] == 3
+
+
+def test_unmatched_requests_share_one_entry(client, registry):
+    for n in range(5):
+        client.get(f"/unknown/{n}")
+    client.post("/queries/2")
+    client.request("PURGE", "/queries/2")
+
+    routes = registry.snapshot()
+
+    assert [route["route"] for route in routes] == [UNMATCHED_ROUTE]
+    assert routes[0]["requests"] == 7
+
+
+def test_queries_outside_requests_are_not_counted():
+    assert current_request_metrics.get() is None
+
+
+def test_registry_snapshot_sorted_by_queries(registry):
+    light = RequestMetrics()
+    light.query_count = 1
+    heavy = RequestMetrics()
+    heavy.query_count = 50
+
+    registry.record("GET /light", light, 1.0)
+    registry.record("GET /heavy", heavy, 2.0)
+
+    assert [route["route"] for route in registry.snapshot()] == [
+        "GET /heavy",
+        "GET /light",
+    ]
+
+    registry.reset()
+    assert registry.snapshot() == []
+
+
+def test_metrics_endpoint():
+    app = FastAPI()
+    app.include_router(metrics_router)
+    test_client = TestClient(app)
+
+    request_metrics_registry.reset()
+    request_metrics_registry.record("GET /getProject", RequestMetrics(), 1.0)
+
+    response = test_client.get("/metrics/requests")
+    assert response.status_code == 200
+    assert response.json()["routes"][0]["route"] == "GET /getProject"
+
+    response = test_client.delete("/metrics/requests")
+    assert response.status_code == 200
+    assert request_metrics_registry.snapshot() == []
+
+
+def test_filesystem_metrics_endpoint():
+    app = FastAPI()
+    app.include_router(metrics_router)
+    test_client = TestClient(app)
+
+    response = test_client.get("/metrics/filesystem")
+    assert response.status_code == 200
+    assert response.json()["workers"] == ManuscriptManager.fs_executor.max_workers
+
+    response = test_client.delete("/metrics/filesystem")
+    assert response.status_code == 200
+    assert ManuscriptManager.fs_executor.stats()["calls"] == 0
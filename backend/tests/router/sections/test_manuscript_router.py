@@ -1,3 +1,5 @@
+import json
+import os
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
 from fastapi.testclient import TestClient
@@ -63,7 +65,9 @@ class TestStartSave:
     def test_start_save_success(self, mock_manager, client, sample_save_start_request):
         # Arrange
         expected_session_id = "test-session-id-123"
-        mock_manager.start_manuscript_save_session.return_value = expected_session_id
+        mock_manager.start_manuscript_save_session = AsyncMock(
+            return_value=expected_session_id
+        )
 
         # Act
         response = client.post("/manuscript/save/start", json=sample_save_start_request)
@@ -90,7 +94,9 @@ class TestStartSave:
             "filename": "simple_file.txt",
         }
         expected_session_id = "minimal-session-id"
-        mock_manager.start_manuscript_save_session.return_value = expected_session_id
+        mock_manager.start_manuscript_save_session = AsyncMock(
+            return_value=expected_session_id
+        )
 
         # Act
         response = client.post("/manuscript/save/start", json=minimal_request)
@@ -111,8 +117,8 @@ class TestStartSave:
         self, mock_manager, client, sample_save_start_request
     ):
         # Arrange
-        mock_manager.start_manuscript_save_session.side_effect = OSError(
-            "Directory creation failed"
+        mock_manager.start_manuscript_save_session = AsyncMock(
+            side_effect=OSError("Directory creation failed")
         )
 
         # Act & Assert
@@ -147,6 +153,48 @@ class TestStartSave:
         assert response.status_code == 422  # Validation error
 
 
+class TestSaveCheck:
+    """Test cases for the /save/check endpoint"""
+
+    @patch("backend.app.router.sections.manuscript_router.manuscript_manager")
+    def test_save_check_unchanged(self, mock_manager, client):
+        # Arrange
+        expected = {
+            "unchanged": True,
+            "saved": "manuscripts/1/docs/file.txt",
+            "metadata": {"created_at": 1.0, "modified_at": 2.0},
+            "metadata_location": "manuscripts/1/docs/metadata.json",
+        }
+        mock_manager.check_manuscript_unchanged = AsyncMock(return_value=expected)
+        request = {
+            "project_id": 1,
+            "relative_path": "docs",
+            "filename": "file.txt",
+            "content_hash": "a" * 64,
+        }
+
+        # Act
+        response = client.post("/manuscript/save/check", json=request)
+
+        # Assert
+        assert response.status_code == 200
+        assert response.json() == expected
+        call_args = mock_manager.check_manuscript_unchanged.call_args[0][0]
+        assert call_args.content_hash == "a" * 64
+
+    def test_save_check_invalid_hash(self, client):
+        request = {
+            "project_id": 1,
+            "relative_path": "docs",
+            "filename": "file.txt",
+            "content_hash": "not-a-sha256",
+        }
+
+        response = client.post("/manuscript/save/check", json=request)
+
+        assert response.status_code == 422
+
+
 class TestSaveChunk:
     """Test cases for the /save/chunk/{session_id} endpoint"""
 
@@ -260,6 +308,102 @@ class TestSaveChunk:
         )  # Validation error due to missing relative_path
 
 
+class TestSaveChunkWithOffset:
+    """Test cases for offset addressed chunks and upload status"""
+
+    @patch("backend.app.router.sections.manuscript_router.manuscript_manager")
+    def test_save_chunk_passes_offset(self, mock_manager, client):
+        # Arrange
+        mock_manager.save_manuscript_chunk = AsyncMock()
+        files = {"file": ("chunk.bin", BytesIO(b"data"), "application/octet-stream")}
+        data = {"relative_path": "chapters", "offset": "1024"}
+
+        # Act
+        response = client.post("/manuscript/save/chunk/s-1", files=files, data=data)
+
+        # Assert
+        assert response.status_code == 200
+        assert mock_manager.save_manuscript_chunk.call_args[0][2] == 1024
+
+    def test_save_chunk_negative_offset(self, client):
+        files = {"file": ("chunk.bin", BytesIO(b"data"), "application/octet-stream")}
+        data = {"relative_path": "chapters", "offset": "-1"}
+
+        response = client.post("/manuscript/save/chunk/s-1", files=files, data=data)
+
+        assert response.status_code == 422
+
+    @patch("backend.app.router.sections.manuscript_router.manuscript_manager")
+    def test_save_chunk_raw_passes_offset(self, mock_manager, client):
+        mock_manager.save_manuscript_chunk_stream = AsyncMock()
+
+        response = client.post(
+            "/manuscript/save/chunk/s-1/raw?offset=2048", content=b"data"
+        )
+
+        assert response.status_code == 200
+        assert mock_manager.save_manuscript_chunk_stream.call_args[0][2] == 2048
+
+    @patch("backend.app.router.sections.manuscript_router.manuscript_manager")
+    def test_save_status(self, mock_manager, client):
+        status = {
+            "session_id": "s-1",
+            "total_size": 10,
+            "received": [[0, 5]],
+            "missing": [[5, 10]],
+        }
+        mock_manager.get_manuscript_save_status = AsyncMock(return_value=status)
+
+        response = client.get("/manuscript/save/status/s-1")
+
+        assert response.status_code == 200
+        assert response.json() == status
+        mock_manager.get_manuscript_save_status.assert_awaited_once_with("s-1")
+
+
+class TestSaveChunkRaw:
+    """Test cases for the /save/chunk/{session_id}/raw endpoint"""
+
+    @patch("backend.app.router.sections.manuscript_router.manuscript_manager")
+    def test_save_chunk_raw_streams_body(self, mock_manager, client):
+        # Arrange
+        received = []
+
+        async def save_stream(session_id, stream, offset=None):
+            async for piece in stream:
+                received.append(piece)
+
+        mock_manager.save_manuscript_chunk_stream = AsyncMock(side_effect=save_stream)
+
+        # Act
+        response = client.post(
+            "/manuscript/save/chunk/session-1/raw",
+            content=b"raw chunk data",
+            headers={"Content-Type": "application/octet-stream"},
+        )
+
+        # Assert
+        assert response.status_code == 200
+        assert response.json() == {"ok": True}
+        assert b"".join(received) == b"raw chunk data"
+        assert mock_manager.save_manuscript_chunk_stream.call_args[0][0] == "session-1"
+
+    @patch("backend.app.router.sections.manuscript_router.manuscript_manager")
+    def test_save_chunk_raw_invalid_session(self, mock_manager, client):
+        # Arrange
+        from fastapi import HTTPException
+
+        mock_manager.save_manuscript_chunk_stream = AsyncMock(
+            side_effect=HTTPException(status_code=404, detail="Invalid session ID")
+        )
+
+        # Act
+        response = client.post("/manuscript/save/chunk/missing/raw", content=b"x")
+
+        # Assert
+        assert response.status_code == 404
+
+
 class TestFinishSave:
     """Test cases for the /save/finish/{session_id} endpoint"""
 
@@ -367,7 +511,7 @@ class TestManuscriptRouterIntegration:
         session_id = "workflow-session-123"
 
         # Mock all manager methods
-        mock_manager.start_manuscript_save_session.return_value = session_id
+        mock_manager.start_manuscript_save_session = AsyncMock(return_value=session_id)
         mock_manager.save_manuscript_chunk = AsyncMock()
         mock_manager.finish_manuscript_save_session = AsyncMock(
             return_value={
@@ -420,7 +564,7 @@ class TestManuscriptRouterIntegration:
         }
         session_id = "multi-chunk-session"
 
-        mock_manager.start_manuscript_save_session.return_value = session_id
+        mock_manager.start_manuscript_save_session = AsyncMock(return_value=session_id)
         mock_manager.save_manuscript_chunk = AsyncMock()
         mock_manager.finish_manuscript_save_session = AsyncMock(
             return_value={
@@ -515,8 +659,8 @@ class TestErrorHandling:
         self, mock_manager, client, sample_save_start_request
     ):
         # Arrange
-        mock_manager.start_manuscript_save_session.side_effect = Exception(
-            "Unexpected internal error"
+        mock_manager.start_manuscript_save_session = AsyncMock(
+            side_effect=Exception("Unexpected internal error")
         )
 
         # Act & Assert
@@ -611,7 +755,9 @@ class TestEdgeCases:
             "relative_path": "documents/with spaces/and-dashes/and_underscores",
             "filename": "file with spaces & special chars.txt",
         }
-        mock_manager.start_manuscript_save_session.return_value = "special-session"
+        mock_manager.start_manuscript_save_session = AsyncMock(
+            return_value="special-session"
+        )
 
         # Act
         response = client.post("/manuscript/save/start", json=special_char_request)
@@ -1252,6 +1398,468 @@ class TestGetFileContentEndpoint:
         mock_manager.get_manuscript_file_content.assert_called_once_with(14, "")
 
 
+class TestGetFilePage:
+    @patch("backend.app.router.sections.manuscript_router.manuscript_manager")
+    def test_page_by_lines(self, mock_manager, client):
+        page = {"path": "novel.md", "content": "line\n", "eof": False}
+        mock_manager.get_manuscript_file_page = AsyncMock(return_value=page)
+
+        response = client.post(
+            "/manuscript/content/page",
+            json={"project_id": 1, "path": "novel.md", "line": 10, "lines": 1},
+        )
+
+        assert response.status_code == 200
+        assert response.json() == page
+        mock_manager.get_manuscript_file_page.assert_called_once_with(
+            1, "novel.md", offset=None, length=65536, line=10, lines=1
+        )
+
+    def test_page_rejects_offset_and_line(self, client):
+        response = client.post(
+            "/manuscript/content/page",
+            json={"project_id": 1, "path": "novel.md", "offset": 0, "line": 0},
+        )
+
+        assert response.status_code == 422
+
+
+class TestDownloadFile:
+    @pytest.fixture
+    def stored_file(self, tmp_path):
+        path = tmp_path / "novel.md"
+        path.write_bytes(b"0123456789" * 10)
+        return str(path)
+
+    @patch("backend.app.router.sections.manuscript_router.manuscript_manager")
+    def test_download_whole_file(self, mock_manager, client, stored_file):
+        mock_manager.get_manuscript_file_path = AsyncMock(return_value=stored_file)
+        mock_manager.stream_compressed_file = AsyncMock(return_value=None)
+
+        response = client.get("/manuscript/project/1/file/chapters/novel.md")
+
+        assert response.status_code == 200
+        assert response.content == b"0123456789" * 10
+        assert response.headers["accept-ranges"] == "bytes"
+        assert "etag" in response.headers
+        mock_manager.get_manuscript_file_path.assert_called_once_with(
+            1, "chapters/novel.md"
+        )
+
+    @patch("backend.app.router.sections.manuscript_router.manuscript_manager")
+    def test_download_range(self, mock_manager, client, stored_file):
+        mock_manager.get_manuscript_file_path = AsyncMock(return_value=stored_file)
+        mock_manager.stream_compressed_file = AsyncMock(return_value=None)
+
+        response = client.get(
+            "/manuscript/project/1/file/novel.md", headers={"Range": "bytes=10-14"}
+        )
+
+        assert response.status_code == 206
+        assert response.content == b"01234"
+        assert response.headers["content-range"] == "bytes 10-14/100"
+
+        response = client.get(
+            "/manuscript/project/1/file/novel.md", headers={"Range": "bytes=500-"}
+        )
+        assert response.status_code == 416
+
+    @staticmethod
+    def compressed(stored_file, content: bytes):
+        async def blocks(start=0, end=None):
+            content_range = content[start:end]
+            yield content_range[:10]
+            yield content_range[10:]
+
+        return AsyncMock(return_value=(len(content), os.stat(stored_file), blocks))
+
+    @patch("backend.app.router.sections.manuscript_router.manuscript_manager")
+    def test_download_compressed_file(self, mock_manager, client, stored_file):
+        mock_manager.get_manuscript_file_path = AsyncMock(return_value=stored_file)
+        mock_manager.stream_compressed_file = self.compressed(
+            stored_file, b"Once upon a time"
+        )
+
+        response = client.get("/manuscript/project/1/file/novel.md")
+
+        assert response.status_code == 200
+        assert response.content == b"Once upon a time"
+        assert response.headers["content-length"] == "16"
+        assert response.headers["content-disposition"] == 'inline; filename="novel.md"'
+        assert response.headers["accept-ranges"] == "bytes"
+        mock_manager.stream_compressed_file.assert_called_once_with(stored_file)
+
+        # Same validators as the plain file
+        mock_manager.stream_compressed_file = AsyncMock(return_value=None)
+        plain = client.get("/manuscript/project/1/file/novel.md")
+        assert response.headers["etag"] == plain.headers["etag"]
+        assert response.headers["last-modified"] == plain.headers["last-modified"]
+
+    @patch("backend.app.router.sections.manuscript_router.manuscript_manager")
+    def test_download_compressed_file_range(self, mock_manager, client, stored_file):
+        mock_manager.get_manuscript_file_path = AsyncMock(return_value=stored_file)
+        mock_manager.stream_compressed_file = self.compressed(
+            stored_file, b"Once upon a time"
+        )
+        url = "/manuscript/project/1/file/novel.md"
+
+        response = client.get(url, headers={"Range": "bytes=5-8"})
+        assert response.status_code == 206
+        assert response.content == b"upon"
+        assert response.headers["content-range"] == "bytes 5-8/16"
+        assert response.headers["content-length"] == "4"
+
+        response = client.get(url, headers={"Range": "bytes=-4"})
+        assert (response.status_code, response.content) == (206, b"time")
+        response = client.get(url, headers={"Range": "bytes=10-99"})
+        assert (response.status_code, response.content) == (206, b"a time")
+
+        response = client.get(url, headers={"Range": "bytes=16-"})
+        assert response.status_code == 416
+        assert response.headers["content-range"] == "bytes */16"
+        assert client.get(url, headers={"Range": "lines=1-2"}).status_code == 400
+
+        # Several ranges, or an If-Range of an older version, get everything
+        response = client.get(url, headers={"Range": "bytes=0-1,5-6"})
+        assert (response.status_code, response.content) == (200, b"Once upon a time")
+        response = client.get(url, headers={"Range": "bytes=5-8", "If-Range": '"old"'})
+        assert response.status_code == 200
+        etag = response.headers["etag"]
+        response = client.get(url, headers={"Range": "bytes=5-8", "If-Range": etag})
+        assert response.status_code == 206
+
+    @patch("backend.app.router.sections.manuscript_router.manuscript_manager")
+    def test_download_not_found(self, mock_manager, client):
+        mock_manager.get_manuscript_file_path = AsyncMock(
+            side_effect=HTTPException(status_code=404, detail="File not found: x.md")
+        )
+
+        response = client.get("/manuscript/project/1/file/x.md")
+
+        assert response.status_code == 404
+
+
+class TestPatchSave:
+    @patch("backend.app.router.sections.manuscript_router.manuscript_manager")
+    def test_patch_save(self, mock_manager, client):
+        result = {"saved": "manuscripts/1/one/scene.md", "unchanged": False}
+        mock_manager.patch_manuscript = AsyncMock(return_value=result)
+        body = {
+            "project_id": 1,
+            "relative_path": "one",
+            "filename": "scene.md",
+            "base_hash": "a" * 64,
+            "ops": [{"retain": 3}, {"insert": "x"}],
+        }
+
+        response = client.post("/manuscript/save/patch", json=body)
+
+        assert response.status_code == 200
+        assert response.json() == result
+        request = mock_manager.patch_manuscript.call_args.args[0]
+        assert request.ops[1].insert == "x"
+
+    @pytest.mark.parametrize(
+        "changes",
+        [
+            {},
+            {"diff": "", "ops": []},
+            {"ops": [{"retain": 1, "insert": "x"}]},
+            {"ops": [{"delete": 0}]},
+        ],
+    )
+    def test_patch_save_validation(self, client, changes):
+        body = {
+            "project_id": 1,
+            "relative_path": "one",
+            "filename": "scene.md",
+            "base_hash": "a" * 64,
+            **changes,
+        }
+
+        response = client.post("/manuscript/save/patch", json=body)
+
+        assert response.status_code == 422
+
+    @patch("backend.app.router.sections.manuscript_router.manuscript_manager")
+    def test_patch_save_base_mismatch(self, mock_manager, client):
+        mock_manager.patch_manuscript = AsyncMock(
+            side_effect=HTTPException(status_code=409, detail="Not the patch base")
+        )
+        body = {
+            "project_id": 1,
+            "relative_path": "one",
+            "filename": "scene.md",
+            "base_hash": "a" * 64,
+            "diff": "@@ -1 +1 @@\n-a\n+b\n",
+        }
+
+        response = client.post("/manuscript/save/patch", json=body)
+
+        assert response.status_code == 409
+
+
+class TestSaveFile:
+    @patch("backend.app.router.sections.manuscript_router.manuscript_manager")
+    def test_save_file_streams_the_body(self, mock_manager, client):
+        received = []
+
+        async def save_manuscript_file(project_id, path, stream, content_hash):
+            received.append(b"".join([piece async for piece in stream]))
+            return {"saved": path, "unchanged": False}
+
+        mock_manager.save_manuscript_file = save_manuscript_file
+
+        response = client.put(
+            "/manuscript/project/1/file/one/scene.md", content=b"The dragon slept."
+        )
+
+        assert response.status_code == 200
+        assert response.json() == {"saved": "one/scene.md", "unchanged": False}
+        assert received == [b"The dragon slept."]
+
+    def test_save_file_rejects_invalid_hash(self, client):
+        response = client.put(
+            "/manuscript/project/1/file/scene.md?content_hash=xyz", content=b"text"
+        )
+
+        assert response.status_code == 422
+
+    @patch("backend.app.router.sections.manuscript_router.manuscript_manager")
+    def test_save_file_too_large(self, mock_manager, client):
+        mock_manager.save_manuscript_file = AsyncMock(
+            side_effect=HTTPException(status_code=413, detail="Too large")
+        )
+
+        response = client.put("/manuscript/project/1/file/scene.md", content=b"x")
+
+        assert response.status_code == 413
+
+
+class TestAutosave:
+    @patch("backend.app.router.sections.manuscript_router.manuscript_manager")
+    def test_autosave_file(self, mock_manager, client):
+        received = []
+
+        async def autosave_manuscript_file(project_id, path, stream, content_hash):
+            received.append(b"".join([piece async for piece in stream]))
+            return {"path": path, "coalesced": 0, "flush_in": 1.0}
+
+        mock_manager.autosave_manuscript_file = autosave_manuscript_file
+
+        response = client.put(
+            "/manuscript/project/1/autosave/one/scene.md", content=b"Draft."
+        )
+
+        assert response.status_code == 202
+        assert response.json()["path"] == "one/scene.md"
+        assert received == [b"Draft."]
+
+    @patch("backend.app.router.sections.manuscript_router.manuscript_manager")
+    def test_flush_autosaves(self, mock_manager, client):
+        mock_manager.flush_manuscript_autosaves = AsyncMock(
+            return_value={"flushed": [], "failed": []}
+        )
+
+        response = client.post("/manuscript/project/1/autosave/flush?path=one")
+
+        assert response.status_code == 200
+        assert response.json() == {"flushed": [], "failed": []}
+        mock_manager.flush_manuscript_autosaves.assert_awaited_once_with(1, "one")
+
+
+class TestRevisions:
+    @patch("backend.app.router.sections.manuscript_router.manuscript_manager")
+    def test_list_revisions(self, mock_manager, client):
+        revisions = [
+            {"id": 2, "path": "one/scene.md"},
+            {"id": 1, "path": "one/scene.md"},
+        ]
+        mock_manager.list_manuscript_revisions = AsyncMock(return_value=revisions)
+
+        response = client.get("/manuscript/project/1/history/one/scene.md")
+
+        assert response.status_code == 200
+        assert response.json() == {"revisions": revisions}
+        mock_manager.list_manuscript_revisions.assert_called_once_with(
+            1, "one/scene.md"
+        )
+
+    @patch("backend.app.router.sections.manuscript_router.manuscript_manager")
+    def test_get_revision(self, mock_manager, client):
+        revision = {"id": 7, "path": "one/scene.md", "content": "text"}
+        mock_manager.get_manuscript_revision = AsyncMock(return_value=revision)
+
+        response = client.get("/manuscript/project/1/revision/7")
+
+        assert response.status_code == 200
+        assert response.json() == revision
+        mock_manager.get_manuscript_revision.assert_called_once_with(1, 7)
+
+    @patch("backend.app.router.sections.manuscript_router.manuscript_manager")
+    def test_get_missing_revision(self, mock_manager, client):
+        mock_manager.get_manuscript_revision = AsyncMock(
+            side_effect=HTTPException(status_code=404, detail="Revision not found: 7")
+        )
+
+        response = client.get("/manuscript/project/1/revision/7")
+
+        assert response.status_code == 404
+
+    @patch("backend.app.router.sections.manuscript_router.manuscript_manager")
+    def test_diff_revision(self, mock_manager, client):
+        diff = {"path": "one/scene.md", "from": 7, "to": 9, "diff": "-a\n+b\n"}
+        mock_manager.diff_manuscript_revision = AsyncMock(return_value=diff)
+
+        response = client.get("/manuscript/project/1/revision/7/diff?against=9")
+
+        assert response.status_code == 200
+        assert response.json() == diff
+        mock_manager.diff_manuscript_revision.assert_called_once_with(1, 7, 9)
+
+        client.get("/manuscript/project/1/revision/7/diff")
+        mock_manager.diff_manuscript_revision.assert_called_with(1, 7, None)
+
+
+class TestSearchFiles:
+    @patch("backend.app.router.sections.manuscript_router.manuscript_manager")
+    def test_search_streams_ndjson(self, mock_manager, client):
+        matches = [
+            {"path": "one/scene.md", "line": 2, "match": "dragon", "snippet": "x"},
+            {"path": "two/scene.md", "line": 5, "match": "dragon", "snippet": "y"},
+        ]
+
+        async def results():
+            for match in matches:
+                yield match
+
+        mock_manager.search_manuscripts = AsyncMock(return_value=results())
+
+        response = client.get("/manuscript/search/1?q=dragon&regex=true&limit=5")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert [json.loads(line) for line in response.text.splitlines()] == matches
+        mock_manager.search_manuscripts.assert_called_once_with(
+            1, "dragon", regex=True, case_sensitive=False, limit=5
+        )
+
+    @patch("backend.app.router.sections.manuscript_router.manuscript_manager")
+    def test_search_invalid_regex(self, mock_manager, client):
+        mock_manager.search_manuscripts = AsyncMock(
+            side_effect=HTTPException(
+                status_code=422, detail="Invalid regular expression"
+            )
+        )
+
+        response = client.get("/manuscript/search/1?q=(&regex=true")
+
+        assert response.status_code == 422
+
+    def test_search_requires_query(self, client):
+        assert client.get("/manuscript/search/1").status_code == 422
+        assert client.get("/manuscript/search/1?q=").status_code == 422
+
+
+class TestSearchFilesRanked:
+    @patch("backend.app.router.sections.manuscript_router.manuscript_manager")
+    def test_ranked_search(self, mock_manager, client):
+        results = [
+            {"path": "one/scene.md", "rank": -1.5, "snippet": "The <mark>dragon</mark>"}
+        ]
+        mock_manager.search_manuscript_index = AsyncMock(return_value=results)
+
+        response = client.get("/manuscript/search/1/ranked?q=drag&prefix=false&limit=5")
+
+        assert response.status_code == 200
+        assert response.json() == {"results": results}
+        mock_manager.search_manuscript_index.assert_called_once_with(
+            1, "drag", prefix=False, limit=5
+        )
+
+    @patch("backend.app.router.sections.manuscript_router.manuscript_manager")
+    def test_ranked_search_without_words(self, mock_manager, client):
+        mock_manager.search_manuscript_index = AsyncMock(
+            side_effect=HTTPException(
+                status_code=422, detail="Search query has no words"
+            )
+        )
+
+        response = client.get("/manuscript/search/1/ranked?q=*")
+
+        assert response.status_code == 422
+        assert response.json()["detail"] == "Search query has no words"
+
+    def test_ranked_search_validation(self, client):
+        assert client.get("/manuscript/search/1/ranked").status_code == 422
+        assert client.get("/manuscript/search/1/ranked?q=a&limit=0").status_code == 422
+
+
+class TestGetFilesContentBatch:
+    @patch("backend.app.router.sections.manuscript_router.manuscript_manager")
+    def test_batch_streams_ndjson(self, mock_manager, client):
+        results = [
+            {"path": "chapter/a.md", "content": "First"},
+            {
+                "path": "chapter/b.md",
+                "error": {"status_code": 404, "detail": "File not found: chapter/b.md"},
+            },
+        ]
+
+        async def stream(project_id, paths):
+            for result in results:
+                yield result
+
+        mock_manager.resolve_manuscript_content_paths = AsyncMock(
+            return_value=["chapter/a.md", "chapter/b.md"]
+        )
+        mock_manager.stream_manuscript_contents = stream
+
+        response = client.post(
+            "/manuscript/content/batch",
+            json={"project_id": 1, "paths": ["chapter/a.md", "chapter/b.md"]},
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = response.text.splitlines()
+        assert [json.loads(line) for line in lines] == results
+        mock_manager.resolve_manuscript_content_paths.assert_called_once_with(
+            1, ["chapter/a.md", "chapter/b.md"], None
+        )
+
+    @patch("backend.app.router.sections.manuscript_router.manuscript_manager")
+    def test_batch_by_directory_not_found(self, mock_manager, client):
+        mock_manager.resolve_manuscript_content_paths = AsyncMock(
+            side_effect=HTTPException(
+                status_code=404, detail="Directory not found: chapter"
+            )
+        )
+
+        response = client.post(
+            "/manuscript/content/batch",
+            json={"project_id": 1, "directory": "chapter"},
+        )
+
+        assert response.status_code == 404
+        mock_manager.resolve_manuscript_content_paths.assert_called_once_with(
+            1, None, "chapter"
+        )
+
+    @pytest.mark.parametrize(
+        "body",
+        [
+            {"project_id": 1},
+            {"project_id": 1, "paths": ["a.md"], "directory": "chapter"},
+            {"project_id": 1, "paths": ["a.md"] * 1001},
+        ],
+    )
+    def test_batch_validation(self, client, body):
+        response = client.post("/manuscript/content/batch", json=body)
+
+        assert response.status_code == 422
+
+
 class TestListDirectoryEndpoint:
     """Tests for GET /manuscript/list/{project_id} endpoint"""
 
@@ -1290,7 +1898,9 @@ class TestListDirectoryEndpoint:
                 },
             ],
         }
-        mock_manager.list_directory_contents = AsyncMock(return_value=expected_result)
+        mock_manager.get_directory_listing = AsyncMock(
+            return_value=(expected_result, '"listing-etag"')
+        )
 
         # Act
         response = client.get("/manuscript/list/123")
@@ -1299,7 +1909,41 @@ class TestListDirectoryEndpoint:
         assert response.status_code == 200
         response_data = response.json()
         assert response_data == expected_result
-        mock_manager.list_directory_contents.assert_called_once_with(123)
+        mock_manager.get_directory_listing.assert_called_once_with(123)
+
+    @patch("backend.app.router.sections.manuscript_router.manuscript_manager")
+    def test_list_directory_returns_etag(self, mock_manager, client):
+        listing = {"path": "", "chapters": []}
+        mock_manager.get_directory_listing = AsyncMock(
+            return_value=(listing, '"listing-etag"')
+        )
+
+        response = client.get("/manuscript/list/123")
+
+        assert response.status_code == 200
+        assert response.headers["etag"] == '"listing-etag"'
+        assert response.headers["cache-control"] == "no-cache"
+
+    @patch("backend.app.router.sections.manuscript_router.manuscript_manager")
+    def test_list_directory_not_modified(self, mock_manager, client):
+        listing = {"path": "", "chapters": []}
+        mock_manager.get_directory_listing = AsyncMock(
+            return_value=(listing, '"listing-etag"')
+        )
+
+        response = client.get(
+            "/manuscript/list/123", headers={"If-None-Match": '"listing-etag"'}
+        )
+
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == '"listing-etag"'
+
+        response = client.get(
+            "/manuscript/list/123", headers={"If-None-Match": '"old-etag"'}
+        )
+        assert response.status_code == 200
+        assert response.json() == listing
 
     @patch("backend.app.router.sections.manuscript_router.manuscript_manager")
     def test_list_directory_empty_project(self, mock_manager, client):
@@ -1309,7 +1953,9 @@ class TestListDirectoryEndpoint:
             "path": "",
             "entries": [],
         }
-        mock_manager.list_directory_contents = AsyncMock(return_value=expected_result)
+        mock_manager.get_directory_listing = AsyncMock(
+            return_value=(expected_result, '"listing-etag"')
+        )
 
         # Act
         response = client.get("/manuscript/list/456")
@@ -1318,13 +1964,13 @@ class TestListDirectoryEndpoint:
         assert response.status_code == 200
         response_data = response.json()
         assert response_data == expected_result
-        mock_manager.list_directory_contents.assert_called_once_with(456)
+        mock_manager.get_directory_listing.assert_called_once_with(456)
 
     @patch("backend.app.router.sections.manuscript_router.manuscript_manager")
     def test_list_directory_project_not_found(self, mock_manager, client):
         """Test project directory not found error"""
         # Arrange
-        mock_manager.list_directory_contents = AsyncMock(
+        mock_manager.get_directory_listing = AsyncMock(
             side_effect=HTTPException(
                 status_code=404, detail="Project directory not found: 999"
             )
@@ -1342,7 +1988,7 @@ class TestListDirectoryEndpoint:
     def test_list_directory_permission_error(self, mock_manager, client):
         """Test permission error"""
         # Arrange
-        mock_manager.list_directory_contents = AsyncMock(
+        mock_manager.get_directory_listing = AsyncMock(
             side_effect=HTTPException(
                 status_code=403,
                 detail="Insufficient permission to read project directory: 101",
@@ -1415,7 +2061,9 @@ class TestListDirectoryEndpoint:
                 },
             ],
         }
-        mock_manager.list_directory_contents = AsyncMock(return_value=expected_result)
+        mock_manager.get_directory_listing = AsyncMock(
+            return_value=(expected_result, '"listing-etag"')
+        )
 
         # Act
         response = client.get("/manuscript/list/789")
@@ -1431,4 +2079,4 @@ class TestListDirectoryEndpoint:
         assert (
             len(response_data["entries"][1]["files"]) == 1
         )  # drafts directory has 1 file
-        mock_manager.list_directory_contents.assert_called_once_with(789)
+        mock_manager.get_directory_listing.assert_called_once_with(789)
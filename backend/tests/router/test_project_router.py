@@ -134,7 +134,7 @@ class TestGetProject:
     @patch("backend.app.router.project_router.ProjectRepository")
     @patch("backend.app.router.project_router.CharacterRepository")
     @patch("backend.app.router.project_router.WorldRepository")
-    @patch("backend.app.router.project_router.plot_list_with_steps_factory")
+    @patch("backend.app.router.project_router.plot_list_from_project_aggregate")
     @patch("backend.app.router.project_router.project_schema_factory")
     def test_get_project_success_with_world(
         self,
@@ -155,18 +155,16 @@ class TestGetProject:
         mock_char_repo_class.return_value = mock_char_repo
         mock_world_repo_class.return_value = mock_world_repo
 
-        mock_project = MagicMock()
         mock_world = MagicMock()
         mock_world.id = 1
-        mock_characters = []
-        mock_world_elements = []
+        mock_world.elements = []
+        mock_project = MagicMock()
+        mock_project.world = mock_world
+        mock_project.characters = []
         mock_plots_with_steps = []
 
         # Configurar correctamente los AsyncMocks
-        mock_proj_repo.get_project = AsyncMock(return_value=mock_project)
-        mock_char_repo.get_list_by_project_id = AsyncMock(return_value=mock_characters)
-        mock_world_repo.get_world_by_project_id = AsyncMock(return_value=mock_world)
-        mock_world_repo.get_world_elements = AsyncMock(return_value=mock_world_elements)
+        mock_proj_repo.get_project_aggregate = AsyncMock(return_value=mock_project)
         mock_plot_factory.return_value = mock_plots_with_steps
 
         # Mock que cumple con BaseProjectSchema
@@ -196,18 +194,21 @@ class TestGetProject:
         response_data = response.json()
         assert response_data["id"] == 1
         assert response_data["projectName"] == "Test Project"
-        mock_proj_repo.get_project.assert_called_once_with(1)
-        mock_char_repo.get_list_by_project_id.assert_called_once_with(1)
-        mock_world_repo.get_world_by_project_id.assert_called_once_with(1)
-        mock_world_repo.get_world_elements.assert_called_once_with(world_id=1)
-
-        # Verificar que se llamó sin verificar parámetros específicos
-        mock_schema_factory.assert_called_once()
+        mock_proj_repo.get_project_aggregate.assert_called_once_with(1)
+        mock_plot_factory.assert_awaited_once_with(mock_project, mock_char_repo)
+        mock_world_repo.create_world.assert_not_called()
+        mock_schema_factory.assert_called_once_with(
+            mock_project,
+            mock_world,
+            mock_world.elements,
+            characters=mock_project.characters,
+            plots_with_steps=mock_plots_with_steps,
+        )
 
     @patch("backend.app.router.project_router.ProjectRepository")
     @patch("backend.app.router.project_router.CharacterRepository")
     @patch("backend.app.router.project_router.WorldRepository")
-    @patch("backend.app.router.project_router.plot_list_with_steps_factory")
+    @patch("backend.app.router.project_router.plot_list_from_project_aggregate")
     def test_get_project_not_found(
         self,
         mock_plot_factory,
@@ -219,17 +220,11 @@ class TestGetProject:
     ):
         # Arrange
         mock_proj_repo = AsyncMock()
-        mock_char_repo = AsyncMock()
-        mock_world_repo = AsyncMock()
-
         mock_proj_repo_class.return_value = mock_proj_repo
-        mock_char_repo_class.return_value = mock_char_repo
-        mock_world_repo_class.return_value = mock_world_repo
+        mock_char_repo_class.return_value = AsyncMock()
+        mock_world_repo_class.return_value = AsyncMock()
 
-        # Configurar correctamente todos los AsyncMocks
-        mock_proj_repo.get_project = AsyncMock(return_value=None)
-        mock_char_repo.get_list_by_project_id = AsyncMock(return_value=[])
-        mock_plot_factory.return_value = []
+        mock_proj_repo.get_project_aggregate = AsyncMock(return_value=None)
 
         with patch(
             "backend.app.router.project_router.get_session", return_value=mock_session
@@ -240,18 +235,17 @@ class TestGetProject:
         # Assert
         assert response.status_code == 404
         assert response.json()["detail"] == "Project not found"
+        mock_plot_factory.assert_not_called()
 
     @patch("backend.app.router.project_router.ProjectRepository")
     @patch("backend.app.router.project_router.CharacterRepository")
     @patch("backend.app.router.project_router.WorldRepository")
-    @patch("backend.app.router.project_router.PlotRepository")
-    @patch("backend.app.router.project_router.plot_list_with_steps_factory")
+    @patch("backend.app.router.project_router.plot_list_from_project_aggregate")
     @patch("backend.app.router.project_router.project_schema_factory")
     def test_get_project_creates_world_if_none(
         self,
         mock_schema_factory,
         mock_plot_factory,
-        mock_plot_repo_class,
         mock_world_repo_class,
         mock_char_repo_class,
         mock_proj_repo_class,
@@ -262,22 +256,19 @@ class TestGetProject:
         mock_proj_repo = AsyncMock()
         mock_char_repo = AsyncMock()
         mock_world_repo = AsyncMock()
-        mock_plot_repo = AsyncMock()
 
         mock_proj_repo_class.return_value = mock_proj_repo
         mock_char_repo_class.return_value = mock_char_repo
         mock_world_repo_class.return_value = mock_world_repo
-        mock_plot_repo_class.return_value = mock_plot_repo
 
         mock_project = MagicMock()
+        mock_project.world = None
+        mock_project.characters = []
         mock_new_world = MagicMock()
-        mock_characters = []
         mock_plots_with_steps = []
 
         # Configurar correctamente los AsyncMocks
-        mock_proj_repo.get_project = AsyncMock(return_value=mock_project)
-        mock_char_repo.get_list_by_project_id = AsyncMock(return_value=mock_characters)
-        mock_world_repo.get_world_by_project_id = AsyncMock(return_value=None)
+        mock_proj_repo.get_project_aggregate = AsyncMock(return_value=mock_project)
         mock_world_repo.create_world = AsyncMock(return_value=mock_new_world)
         mock_plot_factory.return_value = mock_plots_with_steps
 
@@ -312,7 +303,7 @@ class TestGetProject:
         mock_schema_factory.assert_called_once_with(
             mock_project,
             mock_new_world,
-            characters=mock_characters,
+            characters=mock_project.characters,
             plots_with_steps=mock_plots_with_steps,
         )
 
@@ -378,9 +369,154 @@ class TestDeleteProject:
         assert response.json()["detail"] == "Project not found"
 
 
+WORD_STATS = {
+    "words": 1234,
+    "chapters": [{"path": "chapter-1", "words": 1234, "files": 2}],
+}
+
+
+class TestGetWordStats:
+    @patch("backend.app.router.project_router.manuscript_manager")
+    @patch("backend.app.router.project_router.ProjectRepository")
+    def test_get_word_stats_does_not_write_the_project(
+        self, mock_repo_class, mock_manager, client, mock_session
+    ):
+        # Arrange
+        mock_repo = AsyncMock()
+        mock_repo_class.return_value = mock_repo
+
+        mock_project = MagicMock()
+        mock_project.word_goal = 1000
+        mock_project.words = 500
+
+        mock_repo.get_project = AsyncMock(return_value=mock_project)
+        mock_repo.update_project = AsyncMock()
+        mock_manager.get_word_stats = AsyncMock(return_value=WORD_STATS)
+
+        with patch(
+            "backend.app.router.project_router.get_session", return_value=mock_session
+        ):
+            # Act
+            response = client.get("/projects/1/word-stats")
+
+        # Assert
+        assert response.status_code == 200
+        assert response.json() == {"wordGoal": 1000, **WORD_STATS}
+        assert mock_project.words == 500
+        mock_manager.get_word_stats.assert_called_once_with(1)
+        mock_repo.update_project.assert_not_called()
+
+    @patch("backend.app.router.project_router.ProjectRepository")
+    def test_get_word_stats_project_not_found(
+        self, mock_repo_class, client, mock_session
+    ):
+        # Arrange
+        mock_repo = AsyncMock()
+        mock_repo_class.return_value = mock_repo
+        mock_repo.get_project = AsyncMock(return_value=None)
+
+        with patch(
+            "backend.app.router.project_router.get_session", return_value=mock_session
+        ):
+            # Act
+            response = client.get("/projects/999/word-stats")
+
+        # Assert
+        assert response.status_code == 404
+        assert response.json()["detail"] == "Project not found"
+
+
+def test_word_stats_share_the_manuscript_manager():
+    from backend.app.router import project_router
+    from backend.app.router.sections import manuscript_router
+
+    assert project_router.manuscript_manager is manuscript_router.manuscript_manager
+
+
+class TestRecomputeWordStats:
+    @patch("backend.app.router.project_router.manuscript_manager")
+    @patch("backend.app.router.project_router.ProjectRepository")
+    def test_recompute_word_stats_syncs_project_words(
+        self, mock_repo_class, mock_manager, client, mock_session
+    ):
+        # Arrange
+        mock_repo = AsyncMock()
+        mock_repo_class.return_value = mock_repo
+
+        mock_project = MagicMock()
+        mock_project.word_goal = 1000
+        mock_project.words = 500
+
+        mock_repo.get_project = AsyncMock(return_value=mock_project)
+        mock_repo.update_project = AsyncMock()
+        mock_manager.get_word_stats = AsyncMock(return_value=WORD_STATS)
+
+        with patch(
+            "backend.app.router.project_router.get_session", return_value=mock_session
+        ):
+            # Act
+            response = client.post("/projects/1/word-stats/recompute")
+
+        # Assert
+        assert response.status_code == 200
+        assert response.json() == {"wordGoal": 1000, **WORD_STATS}
+        assert mock_project.words == 1234
+        mock_manager.get_word_stats.assert_called_once_with(1)
+        mock_repo.update_project.assert_called_once_with(mock_project)
+
+    @patch("backend.app.router.project_router.manuscript_manager")
+    @patch("backend.app.router.project_router.ProjectRepository")
+    def test_recompute_word_stats_unchanged_words_are_not_written(
+        self, mock_repo_class, mock_manager, client, mock_session
+    ):
+        # Arrange
+        mock_repo = AsyncMock()
+        mock_repo_class.return_value = mock_repo
+
+        mock_project = MagicMock()
+        mock_project.word_goal = 1000
+        mock_project.words = 1234
+
+        mock_repo.get_project = AsyncMock(return_value=mock_project)
+        mock_repo.update_project = AsyncMock()
+        mock_manager.get_word_stats = AsyncMock(return_value=WORD_STATS)
+
+        with patch(
+            "backend.app.router.project_router.get_session", return_value=mock_session
+        ):
+            # Act
+            response = client.post("/projects/1/word-stats/recompute")
+
+        # Assert
+        assert response.status_code == 200
+        mock_repo.update_project.assert_not_called()
+
+    @patch("backend.app.router.project_router.ProjectRepository")
+    def test_recompute_word_stats_project_not_found(
+        self, mock_repo_class, client, mock_session
+    ):
+        # Arrange
+        mock_repo = AsyncMock()
+        mock_repo_class.return_value = mock_repo
+        mock_repo.get_project = AsyncMock(return_value=None)
+
+        with patch(
+            "backend.app.router.project_router.get_session", return_value=mock_session
+        ):
+            # Act
+            response = client.post("/projects/999/word-stats/recompute")
+
+        # Assert
+        assert response.status_code == 404
+        assert response.json()["detail"] == "Project not found"
+
+
 class TestUpdateWordStats:
+    @patch("backend.app.router.project_router.manuscript_manager")
     @patch("backend.app.router.project_router.ProjectRepository")
-    def test_update_word_stats_success(self, mock_repo_class, client, mock_session):
+    def test_update_word_stats_success(
+        self, mock_repo_class, mock_manager, client, mock_session
+    ):
         # Arrange
         mock_repo = AsyncMock()
         mock_repo_class.return_value = mock_repo
@@ -392,6 +528,7 @@ class TestUpdateWordStats:
         # Configurar correctamente los AsyncMocks
         mock_repo.get_project = AsyncMock(return_value=mock_project)
         mock_repo.update_project = AsyncMock()
+        mock_manager.get_word_stats = AsyncMock(return_value=WORD_STATS)
 
         request_data = {"wordGoal": 2000, "words": 750}
 
@@ -404,13 +541,17 @@ class TestUpdateWordStats:
         # Assert
         assert response.status_code == 200
         assert response.json()["message"] == "Word stats updated successfully"
+        assert response.json()["wordGoal"] == 2000
+        assert response.json()["chapters"] == WORD_STATS["chapters"]
         assert mock_project.word_goal == 2000
-        assert mock_project.words == 750
+        # The words sent by the client are ignored
+        assert mock_project.words == 1234
         mock_repo.update_project.assert_called_once_with(mock_project)
 
+    @patch("backend.app.router.project_router.manuscript_manager")
     @patch("backend.app.router.project_router.ProjectRepository")
     def test_update_word_stats_partial_update(
-        self, mock_repo_class, client, mock_session
+        self, mock_repo_class, mock_manager, client, mock_session
     ):
         # Arrange
         mock_repo = AsyncMock()
@@ -423,11 +564,9 @@ class TestUpdateWordStats:
         # Configurar correctamente los AsyncMocks
         mock_repo.get_project = AsyncMock(return_value=mock_project)
         mock_repo.update_project = AsyncMock()
+        mock_manager.get_word_stats = AsyncMock(return_value=WORD_STATS)
 
-        request_data = {
-            "wordGoal": 2000
-            # No incluimos 'words' para probar actualización parcial
-        }
+        request_data = {"words": 750}
 
         with patch(
             "backend.app.router.project_router.get_session", return_value=mock_session
@@ -437,8 +576,8 @@ class TestUpdateWordStats:
 
         # Assert
         assert response.status_code == 200
-        assert mock_project.word_goal == 2000
-        assert mock_project.words == 500  # Should remain unchanged
+        assert mock_project.word_goal == 1000  # Should remain unchanged
+        assert mock_project.words == 1234
 
     @patch("backend.app.router.project_router.ProjectRepository")
     def test_update_word_stats_project_not_found(
@@ -464,6 +603,88 @@ class TestUpdateWordStats:
         assert response.json()["detail"] == "Project not found"
 
 
+class TestGetWordHistory:
+    @patch("backend.app.router.project_router.manuscript_manager")
+    @patch("backend.app.router.project_router.ProjectRepository")
+    def test_get_word_history(
+        self, mock_repo_class, mock_manager, client, mock_session
+    ):
+        # Arrange
+        mock_repo = AsyncMock()
+        mock_repo_class.return_value = mock_repo
+        mock_repo.get_project = AsyncMock(return_value=MagicMock())
+        history = {
+            "resolution": "hour",
+            "baseline": 10,
+            "points": [{"time": 3600, "words": 20}],
+        }
+        mock_manager.get_word_history = AsyncMock(return_value=history)
+
+        with patch(
+            "backend.app.router.project_router.get_session", return_value=mock_session
+        ):
+            # Act
+            response = client.get(
+                "/projects/1/word-history?start=0&end=7200&resolution=hour&path=a.md"
+            )
+
+        # Assert
+        assert response.status_code == 200
+        assert response.json() == history
+        mock_manager.get_word_history.assert_called_once_with(
+            1, 0, 7200, resolution="hour", path="a.md"
+        )
+
+    @patch("backend.app.router.project_router.manuscript_manager")
+    @patch("backend.app.router.project_router.ProjectRepository")
+    def test_get_word_history_defaults_to_last_30_days(
+        self, mock_repo_class, mock_manager, client, mock_session
+    ):
+        # Arrange
+        mock_repo = AsyncMock()
+        mock_repo_class.return_value = mock_repo
+        mock_repo.get_project = AsyncMock(return_value=MagicMock())
+        mock_manager.get_word_history = AsyncMock(
+            return_value={"resolution": "day", "baseline": 0, "points": []}
+        )
+
+        with patch(
+            "backend.app.router.project_router.get_session", return_value=mock_session
+        ):
+            # Act
+            response = client.get("/projects/1/word-history")
+
+        # Assert
+        assert response.status_code == 200
+        _, start, end = mock_manager.get_word_history.call_args.args
+        assert end - start == 30 * 24 * 60 * 60
+        assert mock_manager.get_word_history.call_args.kwargs == {
+            "resolution": "day",
+            "path": None,
+        }
+
+    @patch("backend.app.router.project_router.ProjectRepository")
+    def test_get_word_history_project_not_found(
+        self, mock_repo_class, client, mock_session
+    ):
+        # Arrange
+        mock_repo = AsyncMock()
+        mock_repo_class.return_value = mock_repo
+        mock_repo.get_project = AsyncMock(return_value=None)
+
+        with patch(
+            "backend.app.router.project_router.get_session", return_value=mock_session
+        ):
+            # Act
+            response = client.get("/projects/999/word-history")
+
+        # Assert
+        assert response.status_code == 404
+
+    def test_get_word_history_invalid_resolution(self, client):
+        assert client.get("/projects/1/word-history?resolution=week").status_code == 422
+
+
 class TestUpdateGeneralInfo:
     @patch("backend.app.router.project_router.ProjectRepository")
     def test_update_general_info_success(self, mock_repo_class, client, mock_session):
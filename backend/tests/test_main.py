@@ -0,0 +1,44 @@
+import logging
+import os
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from backend.app.main import flush_autosaves, manuscript_manager
+
+
+def failure(path: str) -> dict:
+    return {
+        "saved": os.path.join(manuscript_manager.UPLOAD_DIR, "1", path),
+        "detail": "disk full",
+    }
+
+
+@pytest.mark.asyncio
+async def test_flush_autosaves_retries_and_logs_failures(caplog):
+    results = [
+        {"flushed": [], "failed": [failure("a.md"), failure("b.md")]},
+        {"flushed": [{"saved": "a.md"}], "failed": [failure("b.md")]},
+    ]
+    flush = AsyncMock(side_effect=results)
+
+    with patch.object(manuscript_manager, "flush_manuscript_autosaves", flush):
+        with caplog.at_level(logging.ERROR, logger="backend.app.main"):
+            await flush_autosaves()
+
+    assert flush.await_count == 2
+    assert [record.getMessage() for record in caplog.records] == [
+        "Autosave of 1/b.md could not be written: disk full"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_flush_autosaves_without_failures(caplog):
+    flush = AsyncMock(return_value={"flushed": [], "failed": []})
+
+    with patch.object(manuscript_manager, "flush_manuscript_autosaves", flush):
+        with caplog.at_level(logging.ERROR, logger="backend.app.main"):
+            await flush_autosaves()
+
+    flush.assert_awaited_once()
+    assert caplog.records == []
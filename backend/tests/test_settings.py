@@ -0,0 +1,33 @@
+import pytest
+from pydantic import ValidationError
+
+from backend.app.settings import Settings
+
+
+def test_settings_defaults():
+    settings = Settings.from_env({})
+
+    assert settings.database_url == "sqlite+aiosqlite:///./schemas.db"
+    assert settings.database_profile == "tuned"
+
+
+def test_settings_reads_prefixed_environment_variables():
+    settings = Settings.from_env(
+        {
+            "ELEUTERIA_DATABASE_URL": "sqlite+aiosqlite:///./other.db",
+            "ELEUTERIA_DATABASE_PROFILE": "compat",
+            "DATABASE_PROFILE": "ignored",
+        }
+    )
+
+    assert settings.database_url == "sqlite+aiosqlite:///./other.db"
+    assert settings.database_profile == "compat"
+
+
+def test_settings_validates_values():
+    class IntSettings(Settings):
+        retries: int = 1
+
+    assert IntSettings.from_env({"ELEUTERIA_RETRIES": "3"}).retries == 3
+    with pytest.raises(ValidationError):
+        IntSettings.from_env({"ELEUTERIA_RETRIES": "many"})